@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from PIL import ImageFont
+
+from ad_video_generator.backend.fonts import resolve_font_path
+
+Color = Tuple[int, int, int]
+Palette = Tuple[Color, Color]
+
+DEFAULT_PALETTE: Palette = ((20, 20, 60), (70, 40, 150))
+
+
+# -----------------------------
+# Backgrounds
+# -----------------------------
+@lru_cache(maxsize=32)
+def gradient_bg(width: int, height: int, palette: Palette = DEFAULT_PALETTE) -> np.ndarray:
+    """
+    Vertical gradient as a read-only (H, W, 3) uint8 array, built once per
+    (size, palette) with NumPy. Callers copy it before drawing.
+    """
+    top = np.array(palette[0], dtype=np.float32)
+    bottom = np.array(palette[1], dtype=np.float32)
+
+    t = (np.arange(height, dtype=np.float32) / max(height - 1, 1))[:, None]
+    rows = (top * (1 - t) + bottom * t).astype(np.uint8)  # (H, 3)
+
+    img = np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (height, width, 3)))
+    img.flags.writeable = False
+    return img
+
+
+# -----------------------------
+# Fonts
+# -----------------------------
+@lru_cache(maxsize=64)
+def get_font(size: int, path: Optional[str] = None) -> ImageFont.ImageFont:
+    """Parsed font keyed by (path, size); path defaults to resolve_font_path()."""
+    fp = path or resolve_font_path()
+    if fp:
+        try:
+            return ImageFont.truetype(fp, size=size)
+        except Exception:
+            pass
+    return ImageFont.load_default()
+
+
+# -----------------------------
+# Warm-up
+# -----------------------------
+def warm_assets(
+    sizes: Iterable[Tuple[int, int]] = ((1080, 1920),),
+    font_sizes: Iterable[int] = (74, 44, 48),
+) -> None:
+    """Build the default backgrounds and fonts up front (call at worker startup)."""
+    for w, h in sizes:
+        gradient_bg(w, h)
+    for size in font_sizes:
+        get_font(size)
@@ -0,0 +1,196 @@
+"""
+Audio stage: one pre-mixed soundtrack per job.
+
+Each voiceover is decoded once into int16 PCM (video_maker.voiceover), then
+mix_soundtrack() lays the voiceovers on the scene timeline, padding or
+trimming each to exactly the frames its scene owns, and adds the script's
+sfx cue at the start of every scene. The encoders mux the result as-is.
+"""
+from __future__ import annotations
+
+import subprocess
+import wave
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.encoder import ffmpeg_binary
+
+AUDIO_RATE = 44100
+
+# Cue peak relative to full scale at SFX_VOLUME=100, so cues sit under the voice
+SFX_HEADROOM = 0.5
+
+
+# -----------------------------
+# Decode
+# -----------------------------
+def decode_pcm(path: Path) -> np.ndarray:
+    """Decode any audio file to int16 stereo PCM at AUDIO_RATE, shape (samples, 2)."""
+    cmd = [
+        ffmpeg_binary(), "-loglevel", "error", "-i", str(path),
+        "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "2", "-ar", str(AUDIO_RATE), "-",
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg audio decode failed: {err[-2000:]}")
+    return np.frombuffer(proc.stdout, dtype=np.int16).reshape(-1, 2)
+
+
+def change_tempo(pcm: np.ndarray, tempo: float) -> np.ndarray:
+    """Speed speech up (tempo > 1) or down without changing its pitch (ffmpeg atempo)."""
+    if tempo == 1.0 or not len(pcm):
+        return pcm
+    cmd = [
+        ffmpeg_binary(), "-loglevel", "error",
+        "-f", "s16le", "-ac", "2", "-ar", str(AUDIO_RATE), "-i", "-",
+        "-filter:a", f"atempo={tempo:.4f}",
+        "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "2", "-ar", str(AUDIO_RATE), "-",
+    ]
+    proc = subprocess.run(cmd, input=np.ascontiguousarray(pcm).tobytes(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg tempo change failed: {err[-2000:]}")
+    return np.frombuffer(proc.stdout, dtype=np.int16).reshape(-1, 2)
+
+
+# -----------------------------
+# Sound effects (synthesized, no asset files)
+# -----------------------------
+def _t(seconds: float) -> np.ndarray:
+    return np.arange(int(seconds * AUDIO_RATE)) / AUDIO_RATE
+
+
+def _band_noise(seconds: float, low: float, high: float, seed: int) -> np.ndarray:
+    n = int(seconds * AUDIO_RATE)
+    spectrum = np.fft.rfft(np.random.default_rng(seed).standard_normal(n))
+    freqs = np.fft.rfftfreq(n, 1 / AUDIO_RATE)
+    spectrum[(freqs < low) | (freqs > high)] = 0
+    noise = np.fft.irfft(spectrum, n)
+    return noise / (np.abs(noise).max() or 1.0)
+
+
+def _sweep(t: np.ndarray, f0: float, f1: float) -> np.ndarray:
+    """Sine whose pitch glides exponentially from f0 to f1 over t."""
+    k = np.log(f1 / f0) / t[-1]
+    return np.sin(2 * np.pi * f0 * np.expm1(k * t) / k)
+
+
+def _whoosh() -> np.ndarray:
+    t = _t(0.45)
+    env = np.sin(np.pi * t / t[-1]) ** 2
+    return _band_noise(0.45, 400, 3500, seed=1) * env
+
+
+def _swipe() -> np.ndarray:
+    t = _t(0.22)
+    env = np.minimum(t / 0.02, 1.0) * np.exp(-t / 0.07)
+    return _band_noise(0.22, 2000, 7000, seed=2) * env
+
+
+def _boom() -> np.ndarray:
+    t = _t(0.9)
+    body = _sweep(t, 90, 38) * np.exp(-t / 0.3)
+    hit = _band_noise(0.9, 60, 800, seed=3) * np.exp(-t / 0.03)
+    return 0.85 * body + 0.3 * hit
+
+
+def _click() -> np.ndarray:
+    t = _t(0.05)
+    return 0.6 * np.sin(2 * np.pi * 2200 * t) * np.exp(-t / 0.006) + 0.4 * _band_noise(0.05, 3000, 9000, seed=4) * np.exp(-t / 0.003)
+
+
+def _tap() -> np.ndarray:
+    t = _t(0.08)
+    return np.sin(2 * np.pi * 1200 * t) * np.exp(-t / 0.015)
+
+
+def _soft_pop() -> np.ndarray:
+    t = _t(0.14)
+    return _sweep(t, 620, 280) * np.minimum(t / 0.004, 1.0) * np.exp(-t / 0.04)
+
+
+SFX = {
+    "whoosh": _whoosh,
+    "swipe": _swipe,
+    "boom": _boom,
+    "click": _click,
+    "tap": _tap,
+    "soft_pop": _soft_pop,
+}
+
+
+@lru_cache(maxsize=None)
+def sfx(name: str) -> Optional[np.ndarray]:
+    """Mono float cue in [-1, 1] for a script sfx name; None for unknown cues."""
+    make = SFX.get((name or "").strip().lower())
+    if make is None:
+        return None
+    cue = make().astype(np.float32)
+    cue.flags.writeable = False
+    return cue
+
+
+# -----------------------------
+# Mix + write
+# -----------------------------
+def scene_bounds(frames: Sequence[int], fps: int) -> np.ndarray:
+    """Sample offsets of every scene boundary for scenes of `frames` frames."""
+    return np.rint(np.cumsum([0] + list(frames)) * AUDIO_RATE / fps).astype(np.int64)
+
+
+def mix_soundtrack(
+    tracks: Sequence[np.ndarray],
+    frames: Sequence[int],
+    fps: int,
+    cues: Sequence[Optional[str]] = (),
+) -> np.ndarray:
+    """
+    Lay per-scene int16 voiceovers back to back, each padded or trimmed to
+    exactly its scene's frame span so audio never drifts from the video, and
+    mix each scene's sfx cue in at its start. Returns int16 stereo PCM.
+    """
+    bounds = scene_bounds(frames, fps)
+    out = np.zeros((int(bounds[-1]), 2), dtype=np.int32)
+    for i, pcm in enumerate(tracks):
+        pcm = pcm.reshape(len(pcm), -1)
+        if pcm.shape[1] == 1:
+            pcm = np.repeat(pcm, 2, axis=1)
+        n = min(len(pcm), int(bounds[i + 1] - bounds[i]))
+        out[bounds[i]:bounds[i] + n] = pcm[:n, :2]
+
+    gain = 32767 * SFX_HEADROOM * settings.SFX_VOLUME / 100
+    for i, name in enumerate(cues):
+        cue = sfx(name) if gain > 0 and i < len(tracks) else None
+        if cue is None:
+            continue
+        # Cues may ring into the next scene, but not past the end of the ad
+        n = min(len(cue), len(out) - int(bounds[i]))
+        out[bounds[i]:bounds[i] + n] += np.rint(cue[:n, None] * gain).astype(np.int32)
+
+    return np.clip(out, -32768, 32767).astype(np.int16)
+
+
+def write_audio(pcm: np.ndarray, out_path: Path) -> None:
+    """Write int16 stereo PCM as WAV, or as AAC when out_path is .m4a (MoviePy muxes it by copy)."""
+    if out_path.suffix.lower() != ".m4a":
+        with wave.open(str(out_path), "wb") as wf:
+            wf.setnchannels(2)
+            wf.setsampwidth(2)
+            wf.setframerate(AUDIO_RATE)
+            wf.writeframes(pcm.tobytes())
+        return
+
+    cmd = [
+        ffmpeg_binary(), "-y", "-loglevel", "error",
+        "-f", "s16le", "-ac", "2", "-ar", str(AUDIO_RATE), "-i", "-",
+        "-c:a", "aac", str(out_path),
+    ]
+    proc = subprocess.run(cmd, input=pcm.tobytes(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg audio encode failed: {err[-2000:]}")
@@ -0,0 +1,187 @@
+"""
+Batch rendering: many products / language x hook variants in one call.
+
+Used by POST /generate/batch and from the command line:
+
+    python -m ad_video_generator.backend.batch items.jsonl \\
+        [--languages Hinglish,English] [--hooks hook_a,hook_c] [--workers 4] > results.jsonl
+
+Each input line is an AdRequest JSON object; results stream out as NDJSON,
+one line per item as it finishes, then a summary line with videos/minute.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.jobs import FINISHED, Job, JobQueue, JobStatus, QueueFull
+from ad_video_generator.backend.models import AdRequest, BatchRequest, VariantSpec
+from ad_video_generator.backend.render_cache import RenderCache, render_key
+
+
+def expand_batch(batch: BatchRequest) -> List[Dict[str, Any]]:
+    """Flatten explicit requests plus the product x language x hook cartesian spec."""
+    items = [r.model_dump() for r in batch.requests]
+    spec = batch.variants
+    if spec is not None:
+        for product in spec.products:
+            base = product.model_dump()
+            for language in spec.languages:
+                for hook in spec.hooks:
+                    items.append(dict(base, language=language, hook=hook))
+    return items
+
+
+def _row(index: int, meta: Dict[str, Any], job_id: str, status: str, cached: bool, error: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "job_id": job_id,
+        "status": status,
+        "cached": cached,
+        "error": error,
+        "download_url": f"/download/{job_id}" if status == JobStatus.DONE.value else None,
+        "product": meta.get("product"),
+        "language": meta.get("language"),
+        "hook": meta.get("hook"),
+    }
+
+
+def _poll(queue: JobQueue, job_ids: List[str]) -> Dict[str, Optional[Job]]:
+    return {job_id: queue.get(job_id) for job_id in job_ids}
+
+
+async def run_batch(
+    queue: JobQueue,
+    items: List[Dict[str, Any]],
+    out_dir: Path,
+    renders: Optional[RenderCache] = None,
+    limit: Optional[int] = None,
+    poll_sec: float = 0.5,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Feed `items` through the shared render queue and yield one result per item
+    as it finishes, then {"summary": ...}. At most `limit` jobs are in flight so
+    a big batch leaves room for interactive /generate calls. With `renders`,
+    items already in the render cache return immediately and duplicates share
+    one render; without it every item renders on its own. Queue calls run in
+    a thread: a StoreQueue (farm mode) blocks on SQLite.
+    """
+    limit = max(1, limit or await asyncio.to_thread(lambda: queue.workers * 2))
+    started = time.perf_counter()
+    pending: Dict[str, List[int]] = {}  # job_id -> item indices
+    counts = {"done": 0, "failed": 0, "cancelled": 0, "cached": 0}
+    next_i = 0
+
+    while next_i < len(items) or pending:
+        while next_i < len(items) and len(pending) < limit:
+            meta = items[next_i]
+            # Without a render cache there is nothing to key on: no dedup, nothing recorded
+            key = render_key(meta) if renders is not None else None
+            hit = renders.lookup(key) if renders is not None else None
+            if hit is not None:
+                counts["done"] += 1
+                counts["cached"] += 1
+                yield _row(next_i, meta, hit["job_id"], JobStatus.DONE.value, cached=True)
+                next_i += 1
+                continue
+            try:
+                job = await asyncio.to_thread(queue.submit, meta, out_dir, key=key)
+            except QueueFull:
+                break
+            pending.setdefault(job.id, []).append(next_i)
+            next_i += 1
+
+        current = await asyncio.to_thread(_poll, queue, list(pending))
+        for job_id, indices in list(pending.items()):
+            job = current[job_id]
+            if job is not None and job.status not in FINISHED:
+                continue
+            status = job.status.value if job is not None else JobStatus.FAILED.value
+            error = job.error if job is not None else "job record lost"
+            for i in indices:
+                counts[status] += 1
+                yield _row(i, items[i], job_id, status, cached=False, error=error)
+            del pending[job_id]
+
+        if pending or next_i < len(items):
+            await asyncio.sleep(poll_sec)
+
+    wall = time.perf_counter() - started
+    yield {
+        "summary": dict(
+            counts,
+            items=len(items),
+            wall_sec=round(wall, 2),
+            videos_per_minute=round(counts["done"] * 60.0 / wall, 2) if wall > 0 else 0.0,
+        )
+    }
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def _read_items(path: str, languages: List[str], hooks: List[str]) -> List[Dict[str, Any]]:
+    src = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with src:
+        requests = [AdRequest(**json.loads(line)) for line in src if line.strip()]
+
+    if not languages and not hooks:
+        return expand_batch(BatchRequest(requests=requests))
+
+    axes: Dict[str, List[str]] = {}
+    if languages:
+        axes["languages"] = languages
+    if hooks:
+        axes["hooks"] = hooks
+    return expand_batch(BatchRequest(variants=VariantSpec(products=requests, **axes)))
+
+
+async def _main(args: argparse.Namespace) -> None:
+    items = _read_items(
+        args.items,
+        [x.strip() for x in args.languages.split(",") if x.strip()],
+        [x.strip() for x in args.hooks.split(",") if x.strip()],
+    )
+    queue = JobQueue(workers=args.workers, max_queue=args.workers * 2)
+    renders = RenderCache(
+        index_path=settings.RENDER_CACHE_INDEX,
+        max_bytes=settings.RENDER_CACHE_BYTES,
+        max_age_sec=settings.RENDER_CACHE_TTL_SEC,
+    ) if settings.RENDER_CACHE else None
+
+    def remember(job) -> None:
+        if renders is not None and job.key and job.status == JobStatus.DONE:
+            renders.record(job.key, job.id, job.out_path)
+
+    queue.on_done = remember
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    queue.start()
+    try:
+        async for row in run_batch(queue, items, out_dir, renders=renders, limit=args.workers * 2):
+            print(json.dumps(row, ensure_ascii=False), flush=True)
+    finally:
+        queue.shutdown()
+        if renders is not None:
+            renders.flush()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Render many ad videos from a JSONL file of AdRequests.")
+    ap.add_argument("items", help="JSONL file with one AdRequest per line ('-' for stdin)")
+    ap.add_argument("--languages", default="", help="comma-separated languages to expand each row into")
+    ap.add_argument("--hooks", default="", help="comma-separated hook ids from the templates (default: all)")
+    ap.add_argument("--workers", type=int, default=settings.RENDER_WORKERS)
+    ap.add_argument("--out", default=str(settings.OUT_DIR))
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.metrics import peak, peak_rss_mb
+
+# moov atom at the front: players start before the whole file has arrived
+FASTSTART_ARGS = ("-movflags", "+faststart")
+
+# Fragmented MP4 (~1 s fragments) that is playable while still being written
+FRAGMENTED_ARGS = ("-movflags", "+empty_moov+default_base_moof", "-frag_duration", "1000000")
+
+# x264 keeps ~rc-lookahead frames (40 by default) in flight, which dominates its memory at 1080x1920
+LOW_MEMORY_X264_ARGS = ("-rc-lookahead", "10", "-x264-params", "sync-lookahead=0")
+
+
+# -----------------------------
+# Thread sizing
+# -----------------------------
+# Jobs rendering side by side on this host; render pools set it from their size (jobs._init_worker)
+_concurrent_jobs = 0
+
+
+def set_concurrent_jobs(jobs: int) -> None:
+    global _concurrent_jobs
+    _concurrent_jobs = max(0, jobs)
+
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity / cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def job_cores() -> int:
+    """This job's share of the host: available cores split over the jobs rendering at once."""
+    return max(1, available_cores() // max(1, _concurrent_jobs or settings.RENDER_WORKERS))
+
+
+def encoder_threads(parallel: int = 1) -> int:
+    """x264 threads for one of `parallel` encoders a job runs at once (AD_ENCODE_THREADS overrides)."""
+    if settings.ENCODE_THREADS > 0:
+        return settings.ENCODE_THREADS
+    return max(1, job_cores() // max(1, parallel))
+
+
+@lru_cache(maxsize=1)
+def ffmpeg_binary() -> str:
+    """Same ffmpeg binary MoviePy uses, so both engines encode identically."""
+    try:
+        from moviepy.config import get_setting
+        return get_setting("FFMPEG_BINARY")
+    except Exception:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def remux_faststart(src: Path, dst: Path) -> None:
+    """Rewrite an MP4 (e.g. a fragmented live file) as a faststart MP4 without re-encoding."""
+    cmd = [ffmpeg_binary(), "-y", "-loglevel", "error", "-i", str(src), "-c", "copy", *FASTSTART_ARGS, str(dst)]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg remux failed: {err[-2000:]}")
+
+
+class FFmpegWriter:
+    """
+    Pipe raw RGB frames into an ffmpeg subprocess.
+
+    Encoder settings mirror MoviePy's write_videofile defaults (libx264,
+    yuv420p, AAC audio) so output matches the MoviePy engine. The optional
+    audio track is muxed once, from a finished file, at the end of the stream.
+    """
+
+    def __init__(
+        self,
+        out_path: Path,
+        width: int,
+        height: int,
+        fps: int,
+        audio_path: Optional[Path] = None,
+        codec: str = "libx264",
+        preset: str = "medium",
+        threads: Optional[int] = None,
+        audio_codec: str = "aac",
+        extra_args: Sequence[str] = (),
+    ):
+        self.out_path = Path(out_path)
+        self.width = width
+        self.height = height
+        self.frames = 0
+        self.peak_rss_mb: Optional[float] = None
+
+        cmd: List[str] = [
+            ffmpeg_binary(), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-vcodec", "rawvideo",
+            "-s", f"{width}x{height}", "-pix_fmt", "rgb24", "-r", str(fps),
+            "-i", "-",
+        ]
+        if audio_path is not None:
+            cmd += ["-i", str(audio_path), "-map", "0:v:0", "-map", "1:a:0", "-c:a", audio_codec]
+        cmd += ["-c:v", codec, "-preset", preset]
+        if codec == "libx264" and width % 2 == 0 and height % 2 == 0:
+            cmd += ["-pix_fmt", "yuv420p"]
+        if threads:
+            cmd += ["-threads", str(threads)]
+        cmd += list(extra_args)
+        cmd += [str(self.out_path)]
+
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame.shape != (self.height, self.width, 3) or frame.dtype != np.uint8:
+            raise ValueError(f"Expected uint8 frame {(self.height, self.width, 3)}, got {frame.dtype} {frame.shape}")
+        try:
+            self._proc.stdin.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        except BrokenPipeError:
+            self._fail()
+        self.frames += 1
+
+    def _fail(self) -> None:
+        self._proc.kill()
+        err = self._proc.stderr.read().decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg encode failed: {err[-2000:] or 'broken pipe'}")
+
+    def close(self) -> None:
+        if self._proc.stdin and not self._proc.stdin.closed:
+            # Sample while ffmpeg is still alive: its high-water mark is gone once it exits
+            self.peak_rss_mb = peak_rss_mb(self._proc.pid)
+            if self.peak_rss_mb is not None:
+                peak("ffmpeg_rss_mb", self.peak_rss_mb)
+            self._proc.stdin.close()
+        err = self._proc.stderr.read().decode("utf-8", "replace").strip()
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {err[-2000:]}")
+
+    def abort(self) -> None:
+        self._proc.kill()
+        self._proc.wait()
+
+    def __enter__(self) -> "FFmpegWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,65 @@
+"""
+Font file lookup. Kept apart from assets.py (which needs NumPy and Pillow) so
+the API process can resolve the font for render keys without importing them.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from ad_video_generator.backend import settings
+
+# Preferred font files, in order (bold first: ad text is big and punchy)
+FONT_FILES = [
+    "arialbd.ttf",
+    "arial.ttf",
+    "calibri.ttf",
+    "segoeui.ttf",
+    "DejaVuSans-Bold.ttf",
+    "LiberationSans-Bold.ttf",
+    "NotoSans-Bold.ttf",
+    "DejaVuSans.ttf",
+    "LiberationSans-Regular.ttf",
+    "NotoSans-Regular.ttf",
+]
+
+# Windows fonts (local dev) first, then the usual Linux container locations
+DEFAULT_FONT_DIRS = [
+    r"C:\Windows\Fonts",
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/truetype/liberation",
+    "/usr/share/fonts/truetype/noto",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    str(Path.home() / ".fonts"),
+]
+
+
+def font_dirs() -> List[str]:
+    """AD_FONT_DIRS (os.pathsep separated) first, then the built-in locations."""
+    return list(settings.FONT_DIRS) + DEFAULT_FONT_DIRS
+
+
+@lru_cache(maxsize=1)
+def resolve_font_path() -> Optional[str]:
+    """
+    Locate the first usable font file once per process.
+    AD_FONT_PATH wins; then FONT_FILES are tried in order across font_dirs().
+    """
+    if settings.FONT_PATH:
+        return settings.FONT_PATH if Path(settings.FONT_PATH).exists() else None
+
+    dirs = [Path(d) for d in font_dirs() if d and Path(d).is_dir()]
+    for name in FONT_FILES:
+        for d in dirs:
+            fp = d / name
+            if fp.exists():
+                return str(fp)
+        # Distros nest fonts one level deeper (e.g. /usr/share/fonts/truetype/*/)
+        for d in dirs:
+            for fp in d.glob(f"*/{name}"):
+                return str(fp)
+    return None
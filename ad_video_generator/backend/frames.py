@@ -0,0 +1,104 @@
+"""
+Still-frame drawing: background, wrapped on-screen text, CTA footer, badge.
+
+Kept free of MoviePy so the API process can draw storyboard previews
+(preview.py) without loading the encoder stack; video_maker imports these.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from ad_video_generator.backend.assets import get_font, gradient_bg
+from ad_video_generator.backend.layout import badge_layer, footer_layer, paste_layer, text_size, wrap_lines
+from ad_video_generator.backend.profiles import PROFILES, RenderProfile
+
+# Reference (final) size; per-request sizes come from the render profile
+FINAL = PROFILES["final"]
+W, H = FINAL.width, FINAL.height
+
+
+# -----------------------------
+# Helpers: background + fonts
+# -----------------------------
+def make_gradient_bg() -> Image.Image:
+    # Cached read-only array; Pillow copies it the first time we draw on it
+    return Image.fromarray(gradient_bg(W, H))
+
+
+def load_font(size: int) -> ImageFont.FreeTypeFont:
+    # Font lookup + TrueType parsing happen once per size (see assets.py)
+    return get_font(size)
+
+
+def wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont, max_width: int) -> List[str]:
+    # Greedy wrap on cached word widths; finished layouts are memoized (see layout.py)
+    return wrap_lines(text, font, max_width)
+
+
+def draw_centered_text_block(
+    img: Image.Image,
+    lines: List[str],
+    y_center: int,
+    font: ImageFont.ImageFont,
+    fill=(255, 255, 255),
+    shadow=True,
+    line_gap=18,
+    shadow_offset=3,
+) -> None:
+    draw = ImageDraw.Draw(img)
+
+    sizes = [text_size(font, line) for line in lines]
+
+    total_h = sum(h for _, h in sizes) + line_gap * (len(lines) - 1)
+    y = y_center - total_h // 2
+
+    for (line, (w, h)) in zip(lines, sizes):
+        x = (img.width - w) // 2
+        if shadow:
+            draw.text((x + shadow_offset, y + shadow_offset), line, font=font, fill=(0, 0, 0))
+        draw.text((x, y), line, font=font, fill=fill)
+        y += h + line_gap
+
+
+def build_frame(
+    on_screen_lines: List[str],
+    footer: str = "Swipe up / Learn more",
+    badge: Optional[str] = None,
+    profile: RenderProfile = FINAL,
+) -> np.ndarray:
+    # ✅ Layout is designed at 1080 px on the short side; profile.px() scales every length
+    p = profile
+    width, height = p.size
+    bg = Image.fromarray(gradient_bg(width, height))
+    draw = ImageDraw.Draw(bg)
+
+    main_text = " ".join([t.strip() for t in on_screen_lines if t and t.strip()]) or " "
+    font_main = load_font(p.px(74))
+    max_width = width - p.px(140)
+
+    wrapped = wrap_text(draw, main_text, font_main, max_width=max_width)[:4]
+    draw_centered_text_block(
+        bg, wrapped, y_center=height // 2, font=font_main,
+        line_gap=p.px(18), shadow_offset=p.px(3),
+    )
+
+    # CTA footer (same on every frame: pre-rendered once, then pasted)
+    footer_img = footer_layer(footer, load_font(p.px(44)), width, max_width, line_step=p.px(54), shadow=p.px(2))
+    paste_layer(bg, footer_img, (0, height - p.px(220)))
+
+    # Badge
+    if badge:
+        badge_img = badge_layer(badge.strip(), load_font(p.px(48)), pad_x=p.px(30), pad_y=p.px(18), radius=p.px(24))
+        paste_layer(bg, badge_img, (p.px(60), p.px(90)))
+
+    return np.array(bg)
+
+
+def scene_badge(scene: Dict[str, Any]) -> Optional[str]:
+    for item in scene.get("overlay") or []:
+        if isinstance(item, str) and item.upper() in ("SALE", "NEW", "LIMITED TIME", "LIMITED"):
+            return item.upper()
+    return None
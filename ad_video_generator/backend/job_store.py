@@ -0,0 +1,461 @@
+"""
+Durable job store for running the API and the renderers on several machines.
+
+Single-node mode keeps jobs in JobQueue's memory and renders them in the API's
+own process pool. In farm mode (settings.JOB_STORE) every API node writes jobs
+to one shared SQLite database and render workers (backend/worker.py) lease
+them from it:
+
+    API node --submit--> jobs table <--claim / heartbeat / finish-- workers
+                                                  |
+                     /download <-- object store <-+ finished MP4
+
+A claimed job carries a lease that the worker extends on every heartbeat. If
+a worker dies, its lease runs out and the next claim() hands the job to
+another worker, until JOB_MAX_ATTEMPTS is reached. Any API node answers
+/jobs/{id} from the table and /download from the object store, whichever node
+accepted the job.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ad_video_generator.backend.jobs import FINISHED, Job, JobStatus, QueueFull
+from ad_video_generator.backend.object_store import ObjectStore, output_key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    key         TEXT,
+    meta        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    stage       TEXT NOT NULL,
+    progress    REAL NOT NULL DEFAULT 0,
+    error       TEXT,
+    result      TEXT,
+    origin      TEXT,
+    worker      TEXT,
+    lease_until REAL,
+    render_path TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    cancel      INTEGER NOT NULL DEFAULT 0,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (origin, finished_at);
+CREATE TABLE IF NOT EXISTS workers (
+    id      TEXT PRIMARY KEY,
+    slots   INTEGER NOT NULL,
+    seen_at REAL NOT NULL
+);
+"""
+
+# Columns added after the first release, with their definitions (see JobStore._migrate)
+_ADDED_COLUMNS = {"render_path": "TEXT"}
+
+_ACTIVE = (JobStatus.QUEUED.value, JobStatus.RENDERING.value)
+_DONE_STATES = tuple(s.value for s in FINISHED)
+
+
+def node_id() -> str:
+    """Identifier of this process in the farm (host, pid and a random suffix)."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+
+
+class JobStore:
+    """
+    Jobs and workers in one SQLite database (WAL mode, safe across processes).
+
+    Every state change is a single short transaction, so the database can sit
+    on a volume shared by all nodes. Rows come back as plain dicts.
+    """
+
+    def __init__(self, path: str, lease_sec: float = 30, max_attempts: int = 3):
+        self.path = str(path)
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+        self._migrate()
+
+    # ---- connection ----
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay on the thread that opened them
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self) -> None:
+        """Add columns that a database created by an older release is missing."""
+        with self._tx() as conn:
+            have = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, decl in _ADDED_COLUMNS.items():
+                if name not in have:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {decl}")
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; BEGIN IMMEDIATE takes the write lock up front so claims never race."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        out = dict(row)
+        out["meta"] = json.loads(out["meta"])
+        out["result"] = json.loads(out["result"]) if out["result"] else {}
+        return out
+
+    # ---- workers ----
+    def register(self, worker: str, slots: int) -> None:
+        """Announce (or keep announcing) a worker and its render slots."""
+        with self._tx() as conn:
+            conn.execute(
+                "INSERT INTO workers (id, slots, seen_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET slots = excluded.slots, seen_at = excluded.seen_at",
+                (worker, slots, time.time()),
+            )
+
+    def unregister(self, worker: str) -> None:
+        with self._tx() as conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker,))
+
+    def live_slots(self) -> int:
+        """Render slots of workers seen within one lease period."""
+        row = self._conn().execute(
+            "SELECT COALESCE(SUM(slots), 0) FROM workers WHERE seen_at > ?", (time.time() - self.lease_sec,)
+        ).fetchone()
+        return int(row[0])
+
+    # ---- API side ----
+    def submit(self, meta: Dict[str, Any], key: Optional[str], origin: str, max_queue: int) -> Dict[str, Any]:
+        """
+        Queue a render. With a `key`, an identical job that is still queued or
+        rendering is returned instead. Raises QueueFull once every live slot is
+        busy and `max_queue` more jobs are waiting.
+        """
+        now = time.time()
+        with self._tx() as conn:
+            if key is not None:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                    (key, *_ACTIVE),
+                ).fetchone()
+                if row is not None:
+                    return self._row(row)
+
+            active = conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", _ACTIVE).fetchone()[0]
+            slots = conn.execute(
+                "SELECT COALESCE(SUM(slots), 0) FROM workers WHERE seen_at > ?", (now - self.lease_sec,)
+            ).fetchone()[0]
+            if active >= slots + max_queue:
+                raise QueueFull(f"{active} jobs in flight")
+
+            job_id = uuid.uuid4().hex[:8]
+            conn.execute(
+                "INSERT INTO jobs (id, key, meta, status, stage, origin, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, key, json.dumps(meta, ensure_ascii=False), JobStatus.QUEUED.value, "queued", origin, now),
+            )
+            return self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._row(self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Queued jobs are cancelled at once; rendering ones at their worker's next heartbeat."""
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = 'cancelled', finished_at = ? WHERE id = ? AND status = ?",
+                (JobStatus.CANCELLED.value, time.time(), job_id, JobStatus.QUEUED.value),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel = 1, stage = 'cancelling' WHERE id = ? AND status = ?",
+                (job_id, JobStatus.RENDERING.value),
+            )
+        return self.get(job_id)
+
+    def active_ids(self) -> List[str]:
+        rows = self._conn().execute("SELECT id FROM jobs WHERE status IN (?, ?)", _ACTIVE).fetchall()
+        return [r[0] for r in rows]
+
+    def finished_since(self, origin: str, since: float) -> List[Dict[str, Any]]:
+        """Jobs submitted by `origin` that finished after `since`, oldest first."""
+        rows = self._conn().execute(
+            "SELECT * FROM jobs WHERE origin = ? AND finished_at > ? ORDER BY finished_at",
+            (origin, since),
+        ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def stats(self) -> Dict[str, int]:
+        counts = dict(self._conn().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE status IN (?, ?) GROUP BY status", _ACTIVE
+        ).fetchall())
+        return {
+            "workers": self.live_slots(),
+            "rendering": counts.get(JobStatus.RENDERING.value, 0),
+            "queued": counts.get(JobStatus.QUEUED.value, 0),
+        }
+
+    def prune(self, keep: int) -> int:
+        """Drop all but the `keep` most recently finished job records."""
+        with self._tx() as conn:
+            cur = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(_DONE_STATES))}) AND id NOT IN ("
+                f"SELECT id FROM jobs WHERE status IN ({', '.join('?' * len(_DONE_STATES))}) "
+                "ORDER BY finished_at DESC LIMIT ?)",
+                (*_DONE_STATES, *_DONE_STATES, keep),
+            )
+            conn.execute("DELETE FROM workers WHERE seen_at < ?", (time.time() - 10 * self.lease_sec,))
+            return cur.rowcount
+
+    # ---- worker side ----
+    def _requeue(self, conn: sqlite3.Connection, job_id: str, error: str, now: float) -> None:
+        """Give a job back to the queue, or fail it once it has used up its attempts."""
+        conn.execute(
+            "UPDATE jobs SET "
+            "status = CASE WHEN cancel = 1 THEN ? WHEN attempts >= ? THEN ? ELSE ? END, "
+            "stage = CASE WHEN cancel = 1 THEN 'cancelled' WHEN attempts >= ? THEN 'failed' ELSE 'requeued' END, "
+            "error = CASE WHEN cancel = 0 AND attempts >= ? THEN ? ELSE error END, "
+            "finished_at = CASE WHEN cancel = 1 OR attempts >= ? THEN ? ELSE NULL END, "
+            "progress = 0, worker = NULL, lease_until = NULL, render_path = NULL "
+            "WHERE id = ?",
+            (
+                JobStatus.CANCELLED.value, self.max_attempts, JobStatus.FAILED.value, JobStatus.QUEUED.value,
+                self.max_attempts,
+                self.max_attempts, f"{error} (gave up after {self.max_attempts} attempt(s))",
+                self.max_attempts, now,
+                job_id,
+            ),
+        )
+
+    def claim(self, worker: str, path_for: Optional[Callable[[str, int], str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest queued job to `worker`. Jobs whose lease ran out
+        (their worker died) are put back in the queue first. `path_for(job_id,
+        attempt)` names the file this attempt renders to; it is recorded as
+        render_path so /jobs/{id}/live can find the render of the current lease.
+        """
+        now = time.time()
+        with self._tx() as conn:
+            expired = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND lease_until < ?", (JobStatus.RENDERING.value, now)
+            ).fetchall()
+            for (job_id,) in expired:
+                self._requeue(conn, job_id, "render worker stopped responding", now)
+
+            row = conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (JobStatus.QUEUED.value,)
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, attempt = row[0], row[1] + 1
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = 'starting', progress = 0, worker = ?, lease_until = ?, "
+                "attempts = ?, render_path = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (
+                    JobStatus.RENDERING.value, worker, now + self.lease_sec, attempt,
+                    path_for(job_id, attempt) if path_for is not None else None, now, job_id,
+                ),
+            )
+            return self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def heartbeat(self, job_id: str, worker: str, stage: str, progress: float) -> Optional[bool]:
+        """
+        Extend the lease and record progress. Returns the job's cancel flag,
+        or None when `worker` no longer holds the job (lease lost).
+        """
+        with self._tx() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET stage = CASE WHEN cancel = 1 THEN 'cancelling' ELSE ? END, progress = ?, lease_until = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (stage, progress, time.time() + self.lease_sec, job_id, worker, JobStatus.RENDERING.value),
+            )
+            if cur.rowcount == 0:
+                return None
+            return bool(conn.execute("SELECT cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()[0])
+
+    def _close(self, job_id: str, worker: str, status: JobStatus, **fields: Any) -> bool:
+        sets = ", ".join(f"{k} = ?" for k in fields)
+        with self._tx() as conn:
+            cur = conn.execute(
+                f"UPDATE jobs SET status = ?, stage = ?, finished_at = ?, worker = NULL, lease_until = NULL, "
+                f"render_path = NULL, {sets} "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (status.value, status.value, time.time(), *fields.values(), job_id, worker, JobStatus.RENDERING.value),
+            )
+            return cur.rowcount > 0
+
+    def finish(self, job_id: str, worker: str, result: Dict[str, Any]) -> bool:
+        """Mark a job done; False when the lease was lost meanwhile."""
+        return self._close(job_id, worker, JobStatus.DONE, progress=1.0, result=json.dumps(result, default=str))
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        return self._close(job_id, worker, JobStatus.FAILED, error=error)
+
+    def cancelled(self, job_id: str, worker: str) -> bool:
+        return self._close(job_id, worker, JobStatus.CANCELLED, error=None)
+
+    def release(self, job_id: str, worker: str, error: Optional[str] = None) -> None:
+        """
+        Hand a job back. Without `error` (worker shutting down) the attempt is
+        not counted; with one (render process crashed) it is.
+        """
+        with self._tx() as conn:
+            if error is None:
+                conn.execute(
+                    "UPDATE jobs SET attempts = MAX(attempts - 1, 0) WHERE id = ? AND worker = ?", (job_id, worker)
+                )
+            if conn.execute("SELECT 1 FROM jobs WHERE id = ? AND worker = ?", (job_id, worker)).fetchone():
+                self._requeue(conn, job_id, error or "released", time.time())
+
+
+# -----------------------------
+# API side: JobQueue over the store
+# -----------------------------
+class StoreQueue:
+    """
+    JobQueue's interface on top of a JobStore, for API nodes in farm mode.
+
+    Renders happen on workers, so start() only launches a watcher thread that
+    fires `on_done` for the jobs this node submitted (render cache, metrics).
+    Job objects are cached and refreshed in place by get(). Every method may
+    wait up to the store's busy timeout for the SQLite write lock, so async
+    callers run them through asyncio.to_thread().
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        objects: ObjectStore,
+        max_queue: int,
+        history: int = 500,
+        on_done: Optional[Callable[[Job], None]] = None,
+        poll_sec: float = 1.0,
+    ):
+        self.store = store
+        self.objects = objects
+        self.max_queue = max_queue
+        self.history = history
+        self.on_done = on_done
+        self.poll_sec = poll_sec
+        self.origin = node_id()
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def workers(self) -> int:
+        return max(1, self.store.live_slots())
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="job-store-watcher", daemon=True)
+        self._watcher.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        since = time.time()
+        last_prune = 0.0
+        while not self._stop.wait(self.poll_sec):
+            try:
+                for row in self.store.finished_since(self.origin, since):
+                    since = max(since, row["finished_at"])
+                    job = self._update(row)
+                    if self.on_done is not None:
+                        try:
+                            self.on_done(job)
+                        except Exception:
+                            pass  # bookkeeping hooks must never break the queue
+                if time.monotonic() - last_prune > 60:
+                    self.store.prune(self.history)
+                    last_prune = time.monotonic()
+            except sqlite3.Error:
+                continue  # database busy or briefly unavailable: try again next tick
+
+    # ---- bookkeeping ----
+    def _update(self, row: Dict[str, Any]) -> Job:
+        with self._lock:
+            job = self._jobs.get(row["id"])
+            if job is None:
+                job = Job(
+                    id=row["id"],
+                    meta=row["meta"],
+                    out_path=self.objects.local_path(output_key(row["id"])),
+                    key=row["key"],
+                    created_at=row["created_at"],
+                )
+                self._jobs[job.id] = job
+            job.status = JobStatus(row["status"])
+            job.stage = row["stage"]
+            job.progress = row["progress"]
+            job.error = row["error"]
+            job.result = row["result"]
+            job.started_at = row["started_at"]
+            job.finished_at = row["finished_at"]
+            job.render_path = Path(row["render_path"]) if row["render_path"] else None
+            if len(self._jobs) > self.history:
+                for jid in [j.id for j in self._jobs.values() if j.status in FINISHED][: len(self._jobs) - self.history]:
+                    self._jobs.pop(jid, None)
+            return job
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.store.stats(), max_queue=self.max_queue)
+
+    def readiness(self) -> Dict[str, Any]:
+        """Ready while some farm worker is live; workers only register once their pool is warm."""
+        try:
+            slots = self.store.live_slots()
+        except sqlite3.Error:
+            slots = 0
+        return {"ready": slots > 0, "workers": slots, "warm": slots, "warmup_sec": None}
+
+    def active_outputs(self) -> List[Path]:
+        return [self.objects.local_path(output_key(jid)) for jid in self.store.active_ids()]
+
+    # ---- public API ----
+    def submit(self, meta: Dict[str, Any], out_dir: Path, key: Optional[str] = None) -> Job:
+        """Queue a render for the farm; `out_dir` is ignored (outputs go to the object store)."""
+        return self._update(self.store.submit(meta, key, self.origin, self.max_queue))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self.store.get(job_id)
+        return self._update(row) if row is not None else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        row = self.store.cancel(job_id)
+        return self._update(row) if row is not None else None
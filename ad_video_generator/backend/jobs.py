@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RENDERING = "rendering"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED = (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+# Shared-dict entries written by render processes once warm, one per pid
+WARM_KEY = "warm:"
+
+
+def cancel_key(job_id: str) -> str:
+    """
+    Shared-dict key of a job's cancel flag. It lives apart from the progress
+    entry, which the render process rewrites on every report: a flag stored
+    inside it could be overwritten between the worker's read and write.
+    """
+    return f"cancel:{job_id}"
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when every worker is busy and the wait queue is full."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a render worker when the job was cancelled mid-render."""
+
+
+@dataclass
+class Job:
+    id: str
+    meta: Dict[str, Any]
+    out_path: Path
+    key: Optional[str] = None  # render-cache key; identical in-flight requests share the job
+    render_path: Optional[Path] = None  # farm mode: the current attempt's file on its worker (else out_path)
+    status: JobStatus = JobStatus.QUEUED
+    stage: str = "queued"
+    progress: float = 0.0
+    error: Optional[str] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "download_url": f"/download/{self.id}" if self.status == JobStatus.DONE else None,
+            "stats": self.result,
+        }
+
+
+# -----------------------------
+# Worker side (runs in the pool)
+# -----------------------------
+def _init_worker(slots: int = 0, shared: Any = None) -> None:
+    """
+    Pool initializer: warm the process up before the first job arrives (see warmup.py)
+    and, given the pool's shared dict, announce it there for readiness checks.
+    `slots` (the pool size) lets encoders size their threads to a job's share of the cores.
+    """
+    from ad_video_generator.backend import settings
+    from ad_video_generator.backend.assets import warm_assets
+    from ad_video_generator.backend.encoder import set_concurrent_jobs
+    from ad_video_generator.backend.warmup import warm_worker
+
+    set_concurrent_jobs(slots)
+    if settings.WORKER_WARMUP:
+        report = warm_worker()
+    else:
+        t0 = time.perf_counter()
+        warm_assets()
+        report = {"seconds": {"total": round(time.perf_counter() - t0, 4)}, "errors": {}}
+    if shared is not None:
+        try:
+            shared[f"{WARM_KEY}{os.getpid()}"] = dict(report, pid=os.getpid(), warm_at=time.time())
+        except Exception:
+            pass  # readiness bookkeeping must never keep the worker from starting
+
+
+def prewarm(pool: ProcessPoolExecutor, workers: int) -> None:
+    """Start every process of `pool` now; spawn-context pools otherwise start them on first submit."""
+    for _ in range(workers):
+        pool.submit(os.getpid)
+
+
+def warm_workers(shared: Any) -> List[Dict[str, Any]]:
+    """Warm-up reports of the render processes announced in `shared`."""
+    try:
+        items = shared.items()
+    except Exception:
+        return []
+    return [v for k, v in items if isinstance(k, str) and k.startswith(WARM_KEY)]
+
+
+def _render_job(job_id: str, meta: Dict[str, Any], out_path: str, shared: Any) -> Dict[str, Any]:
+    """
+    Entry point executed inside a render process.
+    `shared` is a Manager dict used for progress reports and cancel flags (see cancel_key).
+    Returns per-job stats that end up on the job record.
+    """
+    # Imported here so the API process never pays for MoviePy/NumPy/Pillow.
+    from ad_video_generator.backend import settings
+    from ad_video_generator.backend.metrics import peak_rss_mb, reset_peak_rss, trace_job
+    from ad_video_generator.backend.video_maker import make_ad_video
+    from ad_video_generator.backend.voice import get_cache
+
+    def report(stage: str, fraction: float) -> None:
+        if shared.get(cancel_key(job_id)):
+            raise JobCancelled(job_id)
+        state = shared.get(job_id) or {}
+        shared[job_id] = {
+            "stage": stage,
+            "progress": float(fraction),
+            "started_at": state.get("started_at") or time.time(),
+        }
+
+    report("starting", 0.0)
+    tts_before = get_cache().stats()
+    # Workers are reused across jobs; without a reset the peak would be the worker's lifetime peak
+    per_job_peak = reset_peak_rss()
+    profiler = cProfile.Profile() if settings.PROFILE_DIR else None
+    try:
+        with trace_job(job_id) as trace:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                timings = asyncio.run(make_ad_video(meta, Path(out_path), progress=report))
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+    except JobCancelled:
+        Path(out_path).unlink(missing_ok=True)
+        raise
+    except Exception as e:
+        Path(out_path).unlink(missing_ok=True)
+        # ✅ re-raise as a plain error: library exceptions may not pickle back to the API
+        raise RuntimeError(f"Video generation failed: {e}") from None
+    finally:
+        if profiler is not None:
+            Path(settings.PROFILE_DIR).mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(Path(settings.PROFILE_DIR) / f"{job_id}.prof"))
+
+    # Cache counters are per worker process; report this job's share
+    tts_after = get_cache().stats()
+    for name in ("hits", "misses", "coalesced"):
+        trace.count(f"tts_cache_{name}", tts_after[name] - tts_before[name])
+
+    trace_data = trace.to_dict()
+    memory = {
+        "worker_peak_mb": peak_rss_mb(),
+        "worker_peak_scope": "job" if per_job_peak else "process",
+        "ffmpeg_peak_mb": trace_data["peaks"].get("ffmpeg_rss_mb"),
+        "low_memory": settings.LOW_MEMORY,
+    }
+    result = {"timings": timings, "tts_cache": tts_after, "trace": trace_data, "memory": memory}
+    if profiler is not None:
+        result["profile_path"] = str(Path(settings.PROFILE_DIR) / f"{job_id}.prof")
+    return result
+
+
+# -----------------------------
+# API side
+# -----------------------------
+class JobQueue:
+    """
+    Bounded render queue backed by a process pool.
+
+    At most `workers` jobs render at once and at most `max_queue` more may wait;
+    anything beyond that is rejected with QueueFull so the API can answer 429.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        history: int = 500,
+        on_done: Optional[Callable[[Job], None]] = None,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.history = history
+        self.on_done = on_done
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._shared: Any = None
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        ctx = mp.get_context("spawn")
+        self._manager = ctx.Manager()
+        self._shared = self._manager.dict()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self.workers, self._shared),
+        )
+        prewarm(self._pool, self.workers)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+            self._shared = None
+
+    # ---- bookkeeping ----
+    def _active(self) -> List[Job]:
+        return [j for j in self._jobs.values() if j.status not in FINISHED]
+
+    def _sync(self, job: Job) -> None:
+        """Pull the latest progress report from the worker into the job record."""
+        if job.status in FINISHED or self._shared is None:
+            return
+        try:
+            state = self._shared.get(job.id)
+        except Exception:
+            return
+        if not state:
+            return
+        job.status = JobStatus.RENDERING
+        if job.stage != "cancelling":  # cancel() set the flag; the render keeps reporting until it stops
+            job.stage = state.get("stage", job.stage)
+        job.progress = state.get("progress", job.progress)
+        job.started_at = job.started_at or state.get("started_at")
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status in FINISHED]
+        extra = len(finished) - self.history
+        if extra <= 0:
+            return
+        finished.sort(key=lambda j: j.finished_at or j.created_at)
+        for job in finished[:extra]:
+            self._jobs.pop(job.id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            for job in self._active():
+                self._sync(job)
+            active = self._active()
+            rendering = sum(1 for j in active if j.status == JobStatus.RENDERING)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "rendering": rendering,
+                "queued": len(active) - rendering,
+            }
+
+    def readiness(self) -> Dict[str, Any]:
+        """Ready once every render process has finished its warm-up."""
+        warm = warm_workers(self._shared) if self._shared is not None else []
+        broken = self._pool is None or getattr(self._pool, "_broken", False)
+        return {
+            "ready": not broken and len(warm) >= self.workers,
+            "workers": self.workers,
+            "warm": min(len(warm), self.workers),
+            "warmup_sec": max((w["seconds"]["total"] for w in warm), default=None),
+        }
+
+    def active_outputs(self) -> List[Path]:
+        """Output paths of jobs that are still queued or rendering."""
+        with self._lock:
+            return [j.out_path for j in self._active()]
+
+    # ---- public API ----
+    def submit(self, meta: Dict[str, Any], out_dir: Path, key: Optional[str] = None) -> Job:
+        """
+        Queue a render. With a `key`, an identical job that is still queued or
+        rendering is returned instead of starting a second render.
+        """
+        if self._pool is None:
+            raise RuntimeError("JobQueue.start() must be called before submit()")
+
+        with self._lock:
+            if key is not None:
+                for job in self._active():
+                    if job.key == key:
+                        return job
+
+            if len(self._active()) >= self.workers + self.max_queue:
+                raise QueueFull(f"{len(self._active())} jobs in flight")
+
+            job_id = uuid.uuid4().hex[:8]
+            job = Job(id=job_id, meta=meta, out_path=out_dir / f"ad_{job_id}.mp4", key=key)
+            self._jobs[job_id] = job
+            job.future = self._pool.submit(_render_job, job_id, meta, str(job.out_path), self._shared)
+
+        job.future.add_done_callback(lambda fut, jid=job_id: self._finish(jid, fut))
+        return job
+
+    def _finish(self, job_id: str, fut: Future) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            self._sync(job)
+            job.finished_at = time.time()
+
+            if fut.cancelled():
+                job.status, job.stage = JobStatus.CANCELLED, "cancelled"
+            else:
+                err = fut.exception()
+                if err is None:
+                    job.status, job.stage, job.progress = JobStatus.DONE, "done", 1.0
+                    job.result = fut.result() or {}
+                elif isinstance(err, JobCancelled):
+                    job.status, job.stage = JobStatus.CANCELLED, "cancelled"
+                else:
+                    job.status, job.stage = JobStatus.FAILED, "failed"
+                    job.error = str(err) or err.__class__.__name__
+
+            if self._shared is not None:
+                self._shared.pop(job_id, None)
+                self._shared.pop(cancel_key(job_id), None)
+            self._prune()
+
+        if self.on_done is not None:
+            try:
+                self.on_done(job)
+            except Exception:
+                pass  # bookkeeping hooks must never break the queue
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._sync(job)
+            return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job. Queued jobs are dropped immediately; rendering jobs stop
+        at their next progress report.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+
+        if job.future is not None and job.future.cancel():
+            return job  # done-callback marks it cancelled
+
+        with self._lock:
+            if self._shared is not None:
+                self._shared[cancel_key(job_id)] = True
+            job.stage = "cancelling"
+        return job
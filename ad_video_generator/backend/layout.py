@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Fonts come from assets.get_font, which hands out one object per (path, size),
+# so font objects themselves are stable cache keys.
+Font = ImageFont.ImageFont
+
+
+# -----------------------------
+# Measurement caches
+# -----------------------------
+@lru_cache(maxsize=65536)
+def word_width(font: Font, word: str) -> float:
+    """Advance width of a single word (or the space), measured once per font."""
+    return font.getlength(word)
+
+
+@lru_cache(maxsize=4096)
+def text_size(font: Font, text: str) -> Tuple[int, int]:
+    """Ink bbox (w, h) of one line, same numbers as draw.textbbox((0, 0), ...)."""
+    bbox = font.getbbox(text)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+# -----------------------------
+# Wrapping
+# -----------------------------
+@lru_cache(maxsize=4096)
+def _wrap(font: Font, text: str, max_width: int) -> Tuple[str, ...]:
+    words = text.split()
+    space = word_width(font, " ")
+    lines: List[str] = []
+    cur: List[str] = []
+    cur_w = 0.0
+
+    # Greedy, linear in the number of words: each word is measured once and
+    # line widths are running sums of cached advances.
+    for w in words:
+        ww = word_width(font, w)
+        test_w = cur_w + space + ww if cur else ww
+        if test_w <= max_width:
+            cur.append(w)
+            cur_w = test_w
+        else:
+            if cur:
+                lines.append(" ".join(cur))
+            cur, cur_w = [w], ww
+
+    if cur:
+        lines.append(" ".join(cur))
+    return tuple(lines)
+
+
+def wrap_lines(text: str, font: Font, max_width: int) -> List[str]:
+    return list(_wrap(font, text, int(max_width)))
+
+
+# -----------------------------
+# Pre-rendered layers (constant elements)
+# -----------------------------
+@lru_cache(maxsize=64)
+def footer_layer(
+    text: str,
+    font: Font,
+    width: int,
+    max_width: int,
+    line_step: int = 54,
+    shadow: int = 2,
+) -> Image.Image:
+    """
+    RGBA strip with the footer CTA ("Swipe up / Learn more") centred across
+    `width`. Rendered once and alpha-pasted onto every frame.
+    """
+    lines = _wrap(font, text, int(max_width))[:2]
+    height = line_step * (max(len(lines), 1) + 1)  # spare line of room for descenders
+    layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+
+    for i, line in enumerate(lines):
+        fw, _ = text_size(font, line)
+        x = (width - fw) // 2
+        y = i * line_step
+        draw.text((x + shadow, y + shadow), line, font=font, fill=(0, 0, 0, 255))
+        draw.text((x, y), line, font=font, fill=(255, 255, 255, 255))
+    return layer
+
+
+@lru_cache(maxsize=64)
+def badge_layer(text: str, font: Font, pad_x: int = 30, pad_y: int = 18, radius: int = 24) -> Image.Image:
+    """RGBA pill badge ("SALE", "LIMITED TIME", ...) rendered once per text and font."""
+    tw, th = text_size(font, text)
+    bw, bh = tw + pad_x * 2, th + pad_y * 2
+
+    layer = Image.new("RGBA", (bw + 1, bh + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    draw.rounded_rectangle([0, 0, bw, bh], radius=radius, fill=(255, 255, 255, 255))
+    draw.text((pad_x, pad_y), text, font=font, fill=(0, 0, 0, 255))
+    return layer
+
+
+def paste_layer(img: Image.Image, layer: Image.Image, xy: Tuple[int, int]) -> None:
+    """Alpha-composite a cached RGBA layer onto an RGB frame in place."""
+    img.paste(layer, xy, layer)
+
+
+def clear_caches() -> None:
+    for fn in (word_width, text_size, _wrap, footer_layer, badge_layer):
+        fn.cache_clear()
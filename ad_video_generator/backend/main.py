@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import uuid
-from pathlib import Path
-from typing import Optional, List
+import asyncio
+import json
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 
 # ✅ IMPORTANT:
 # If your repo is structured like:
@@ -15,28 +15,97 @@ from pydantic import BaseModel, Field
 #     main.py
 #     video_maker.py
 # then use absolute import like below:
-from ad_video_generator.backend.video_maker import make_ad_video
-
-app = FastAPI(title="Text-to-Ad Video Generator")
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.models import AdRequest, BatchRequest
+from ad_video_generator.backend.batch import expand_batch, run_batch
+from ad_video_generator.backend.job_store import JobStore, StoreQueue
+from ad_video_generator.backend.jobs import FINISHED, Job, JobQueue, JobStatus, QueueFull
+from ad_video_generator.backend.metrics import MetricsRegistry
+from ad_video_generator.backend.object_store import get_object_store, output_key
+from ad_video_generator.backend.profiles import PROFILES
+from ad_video_generator.backend.render_cache import RenderCache, render_key
+from ad_video_generator.backend.scratch import live_path, sweep_outputs
+from ad_video_generator.backend.scripts_bulk import FORMATS as SCRIPT_FORMATS, stream_scripts
+from ad_video_generator.backend.templates import get_registry
 
 # ✅ Output folder relative to project (stable on Streamlit/GitHub/Windows)
-BASE_DIR = Path(__file__).resolve().parents[1]  # .../ad_video_generator
-OUT_DIR = BASE_DIR / "data" / "outputs"
+BASE_DIR = settings.BASE_DIR
+OUT_DIR = settings.OUT_DIR
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# ✅ Finished videos (a shared directory when several nodes serve the API)
+outputs = get_object_store()
+
+# ✅ Identical requests reuse the finished video instead of rendering again
+renders = RenderCache(
+    index_path=settings.RENDER_CACHE_INDEX,
+    max_bytes=settings.RENDER_CACHE_BYTES,
+    max_age_sec=settings.RENDER_CACHE_TTL_SEC,
+)
+
+
+# ✅ Aggregated job traces for /metrics
+metrics = MetricsRegistry()
+
+
+def _on_job_done(job: Job) -> None:
+    if job.key and job.status == JobStatus.DONE:
+        renders.record(job.key, job.id, job.out_path)
+    wait = job.started_at - job.created_at if job.started_at else None
+    metrics.record_job(job.status.value, job.result, queue_wait=wait)
+
+
+# ✅ Renders run in worker processes, never on the event loop:
+# the API's own pool (single node) or farm workers leasing jobs from AD_JOB_STORE
+if settings.JOB_STORE:
+    jobs = StoreQueue(
+        JobStore(settings.JOB_STORE, lease_sec=settings.JOB_LEASE_SEC, max_attempts=settings.JOB_MAX_ATTEMPTS),
+        outputs,
+        max_queue=settings.MAX_QUEUE,
+        history=settings.JOB_HISTORY,
+        on_done=_on_job_done,
+        poll_sec=settings.WORKER_POLL_SEC,
+    )
+else:
+    jobs = JobQueue(
+        workers=settings.RENDER_WORKERS,
+        max_queue=settings.MAX_QUEUE,
+        history=settings.JOB_HISTORY,
+        on_done=_on_job_done,
+    )
+
+
+async def _sweeper() -> None:
+    """Enforce the output TTL and disk quota in the background."""
+    while True:
+        keep = await asyncio.to_thread(jobs.active_outputs)
+        await asyncio.to_thread(
+            sweep_outputs,
+            outputs.root,
+            max_bytes=settings.OUTPUT_QUOTA_BYTES,
+            ttl_sec=settings.OUTPUT_TTL_SEC,
+            keep=keep,
+        )
+        await asyncio.to_thread(renders.evict)
+        await asyncio.sleep(settings.SWEEP_INTERVAL_SEC)
 
-class AdRequest(BaseModel):
-    brand: str = Field(default="Brand")
-    product: str = Field(default="Product")
-    benefits: List[str] = Field(default_factory=list)
 
-    audience: str = Field(default="India, 18-35")
-    offer: Optional[str] = None
-    cta: str = Field(default="Order Now")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    get_registry()  # ✅ load + validate script templates once, before the first request
+    jobs.start()
+    sweeper = asyncio.create_task(_sweeper())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper
+        jobs.shutdown()
+        renders.flush()
+
 
-    tone: str = Field(default="Relatable, punchy")
-    language: str = Field(default="Hinglish")   # Hinglish / Hindi / English
-    duration_sec: int = Field(default=15, ge=5, le=60)  # safe range
+app = FastAPI(title="Text-to-Ad Video Generator", lifespan=lifespan)
 
 
 @app.get("/")
@@ -44,32 +113,286 @@ def root():
     return {"status": "ok", "service": "Text-to-Ad Video Generator"}
 
 
-@app.post("/generate")
-async def generate(req: AdRequest):
-    job_id = uuid.uuid4().hex[:8]
-    out_path = OUT_DIR / f"ad_{job_id}.mp4"
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 200 once the render workers have warmed up (see warmup.py), 503 before.
+    "/" answers as soon as the process is up; route render traffic here only when this says ready.
+    """
+    state = jobs.readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
 
-    try:
-        await make_ad_video(req.model_dump(), out_path)
-    except Exception as e:
-        # show a clean error in API response
-        raise HTTPException(status_code=500, detail=f"Video generation failed: {e}")
 
+def _finished_record(job_id: str) -> Optional[dict]:
+    """Status for a video that exists on disk but is no longer tracked in memory."""
+    if not outputs.exists(output_key(job_id)):
+        return None
     return {
         "job_id": job_id,
-        "video_path": str(out_path),
+        "status": JobStatus.DONE.value,
+        "stage": "done",
+        "progress": 1.0,
+        "error": None,
         "download_url": f"/download/{job_id}",
     }
 
 
+@app.post("/generate", status_code=202)
+async def generate(req: AdRequest):
+    meta = req.model_dump()
+    key = render_key(meta) if settings.RENDER_CACHE else None
+
+    if key is not None:
+        hit = renders.lookup(key)
+        if hit is not None:
+            return {
+                "job_id": hit["job_id"],
+                "status": JobStatus.DONE.value,
+                "cached": True,
+                "status_url": f"/jobs/{hit['job_id']}",
+                "video_path": hit["path"],
+                "download_url": f"/download/{hit['job_id']}",
+            }
+
+    try:
+        # ✅ Farm mode submits through SQLite, which can wait on the write lock: keep it off the loop
+        job = await asyncio.to_thread(jobs.submit, meta, outputs.root, key=key)
+    except QueueFull:
+        raise HTTPException(
+            status_code=429,
+            detail="Render queue is full. Try again shortly.",
+            headers={"Retry-After": "10"},
+        )
+
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "cached": False,
+        "status_url": f"/jobs/{job.id}",
+        "video_path": str(job.out_path),
+        "download_url": f"/download/{job.id}",
+        "live_url": f"/jobs/{job.id}/live",
+    }
+
+
+@app.post("/preview")
+def preview(req: AdRequest, format: str = "json", width: int = 240, image: str = "jpeg"):
+    """
+    Storyboard without TTS or encoding: one still per scene at thumbnail size.
+    format=json -> scene timings + base64 thumbnails; format=sheet -> one contact-sheet image.
+    Runs in FastAPI's threadpool, so drawing never blocks the event loop.
+    """
+    # ✅ Imported on first use: NumPy/Pillow stay out of API startup
+    from ad_video_generator.backend.preview import IMAGE_FORMATS, contact_sheet, encode_image, storyboard, thumbnails
+
+    if format not in ("json", "sheet"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'sheet'.")
+    if image not in IMAGE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"image must be one of {sorted(IMAGE_FORMATS)}.")
+
+    board = storyboard(req.model_dump(), width=width)
+    if format == "json":
+        return thumbnails(board, image)
+    data = encode_image(contact_sheet(board), image, quality=85)
+    return Response(content=data, media_type=IMAGE_FORMATS[image][1], headers={"Cache-Control": "no-store"})
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body is produced while the request body is still being read.
+    Starlette's disconnect listener would compete with request.stream() for receive();
+    here a dropped client surfaces as ClientDisconnect from the request stream instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@app.post("/scripts/bulk")
+async def scripts_bulk(request: Request, output: Optional[str] = None):
+    """
+    Scripts (no rendering) for a whole catalog. Upload CSV (Content-Type: text/csv)
+    or JSONL rows; results stream back row by row as JSONL or, with output=csv, CSV.
+    """
+    input_format = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+    output = output or input_format
+    if output not in SCRIPT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"output must be one of {sorted(SCRIPT_FORMATS)}.")
+    return DuplexStreamingResponse(
+        stream_scripts(request.stream(), input_format, output), media_type=SCRIPT_FORMATS[output]
+    )
+
+
+@app.get("/templates")
+def list_templates():
+    """Script templates, hook ids and render profiles a request may name (all loaded from data)."""
+    registry = get_registry()
+    return {
+        "templates": [
+            {"id": t.id, "description": t.description, "durations": list(t.durations), "scenes": len(t.times)}
+            for t in registry.templates.values()
+        ],
+        "hooks": list(registry.hook_ids),
+        "profiles": list(PROFILES),
+    }
+
+
+@app.post("/generate/batch")
+async def generate_batch(batch: BatchRequest):
+    items = expand_batch(batch)
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty.")
+    if len(items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {settings.BATCH_MAX_ITEMS} items).")
+
+    # ✅ Leave half of the wait queue free for interactive /generate calls
+    limit = settings.RENDER_WORKERS + max(1, settings.MAX_QUEUE // 2)
+
+    async def stream():
+        async for row in run_batch(jobs, items, outputs.root, renders=renders if settings.RENDER_CACHE else None, limit=limit):
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        record = _finished_record(job_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Job not found.")
+        return record
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/progress")
+def job_progress(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        record = _finished_record(job_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Job not found.")
+        return {k: record[k] for k in ("job_id", "status", "stage", "progress")}
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "stage": job.stage,
+        "progress": round(job.progress, 3),
+    }
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
+
+
+@app.get("/queue")
+def queue_stats():
+    return dict(jobs.stats(), render_cache=renders.stats())
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus text format: job/stage/frame histograms, cache counters, live queue gauges."""
+    queue = jobs.stats()
+    cache = renders.stats()
+    gauges = {
+        "queue_workers": queue["workers"],
+        "queue_workers_warm": jobs.readiness()["warm"],
+        "queue_max": queue["max_queue"],
+        "queue_rendering": queue["rendering"],
+        "queue_waiting": queue["queued"],
+        "render_cache_entries": cache["entries"],
+        "render_cache_bytes": cache["bytes"],
+        "render_cache_hits": cache["hits"],
+        "render_cache_misses": cache["misses"],
+        "render_cache_hit_ratio": cache["hit_rate"],
+    }
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)."""
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
 @app.get("/download/{job_id}")
-def download(job_id: str):
-    video_path = OUT_DIR / f"ad_{job_id}.mp4"
-    if not video_path.exists():
+def download(job_id: str, request: Request):
+    """
+    Finished video. Outputs never change once written, so responses carry a
+    strong ETag and long-lived cache headers; Range / If-Range requests (video
+    seeking) are answered by FileResponse, If-None-Match here with a 304.
+    """
+    video_path = outputs.local_path(output_key(job_id))
+    try:
+        st = video_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Video not found. Generate first.")
 
+    etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.OUTPUT_TTL_SEC or 86400}, immutable",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
     return FileResponse(
         path=str(video_path),
         media_type="video/mp4",
         filename=video_path.name,
+        headers=headers,
+        content_disposition_type="inline",
+        stat_result=st,
     )
+
+
+@app.get("/jobs/{job_id}/live")
+async def live(job_id: str, request: Request):
+    """
+    Fragmented MP4 of a render in progress, streamed as the encoder writes it
+    (ffmpeg engine with AD_LIVE_STREAM on). Finished jobs get the final file.
+    """
+    job = await asyncio.to_thread(jobs.get, job_id)
+    if job is None or job.status == JobStatus.DONE:
+        return download(job_id, request)
+
+    # ✅ Wait for the encoder to start (scenes are prepared first)
+    path = live_path((job.render_path or job.out_path).stem)
+    while path is None and job.status not in FINISHED:
+        await asyncio.sleep(0.25)
+        job = await asyncio.to_thread(jobs.get, job_id) or job  # farm mode: refresh from the job store
+        path = live_path((job.render_path or job.out_path).stem)
+
+    try:
+        f = open(path, "rb") if path is not None else None
+    except FileNotFoundError:  # encode finished and scratch was removed meanwhile
+        f = None
+    if f is None:
+        if job.status == JobStatus.DONE:
+            return download(job_id, request)
+        raise HTTPException(status_code=409, detail=f"No live stream: job {job.status.value}.")
+
+    async def stream():
+        with f:
+            while True:
+                chunk = f.read(256 * 1024)
+                if chunk:
+                    yield chunk
+                elif (await asyncio.to_thread(jobs.get, job_id) or job).status in FINISHED:
+                    # The encoder closed the file before the job finished: drain and stop
+                    rest = f.read()
+                    if rest:
+                        yield rest
+                    return
+                else:
+                    await asyncio.sleep(0.2)
+
+    return StreamingResponse(stream(), media_type="video/mp4", headers={"Cache-Control": "no-store"})
@@ -0,0 +1,330 @@
+"""
+Pipeline tracing (render workers) and a Prometheus-style registry (API).
+
+Worker side: make_ad_video runs inside trace_job(); pipeline code wraps
+stages in span("tts", scene=2) and records hot-path timings with observe().
+Each render process handles one job at a time, so the active trace is a
+process global (safe to use from the job's frame threads too). The finished
+trace travels back to the API with the job result.
+
+API side: MetricsRegistry folds every finished job's trace into counters and
+histograms and renders them, plus live gauges, in the Prometheus text format.
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bucket upper bounds in seconds
+FRAME_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Encoded frames per second of encode stage
+FPS_BUCKETS = (5, 10, 20, 30, 60, 120, 240, 480)
+
+# Per-frame timings recorded by the encoders (see video_maker.py)
+FRAME_HISTOGRAMS = ("frame_effect", "frame_write")
+
+# Peak resident memory per job, in MB
+MEMORY_BUCKETS = (64, 128, 256, 384, 512, 768, 1024, 1536, 2048, 4096)
+
+
+# -----------------------------
+# Histogram
+# -----------------------------
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, like Prometheus)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        if tuple(data.get("buckets", ())) != self.buckets:
+            return
+        for i, n in enumerate(data["counts"]):
+            self.counts[i] += n
+        self.sum += data["sum"]
+        self.count += data["count"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"buckets": list(self.buckets), "counts": list(self.counts), "sum": round(self.sum, 6), "count": self.count}
+
+
+# -----------------------------
+# Worker side: per-job trace
+# -----------------------------
+class Trace:
+    """Spans, histograms and counters for one render job."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.histograms: Dict[str, Histogram] = {name: Histogram(FRAME_BUCKETS) for name in FRAME_HISTOGRAMS}
+        self.counters: Dict[str, float] = {}
+        self.peaks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        t0 = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e.__class__.__name__
+            raise
+        finally:
+            t1 = time.perf_counter()
+            record = {"name": name, "start_ms": round((t0 - self.started) * 1000, 2), "ms": round((t1 - t0) * 1000, 2)}
+            if attrs:
+                record["attrs"] = attrs
+            if error:
+                record["error"] = error
+            with self._lock:
+                self.spans.append(record)
+
+    def observe(self, name: str, value: float) -> None:
+        # The segments engine's scene threads observe concurrently; Histogram updates are not atomic
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram(FRAME_BUCKETS)
+            hist.observe(value)
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def peak(self, name: str, value: float) -> None:
+        """Keep the largest value seen for `name` (e.g. the RSS of each ffmpeg child)."""
+        with self._lock:
+            self.peaks[name] = max(self.peaks.get(name, value), value)
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Seconds per span name (scene-level spans summed across scenes)."""
+        totals: Dict[str, float] = {}
+        for s in self.spans:
+            totals[s["name"]] = totals.get(s["name"], 0.0) + s["ms"] / 1000
+        return {k: round(v, 4) for k, v in totals.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+                "stages": self.stage_totals(),
+                "histograms": {k: h.to_dict() for k, h in self.histograms.items() if h.count},
+                "counters": dict(self.counters),
+                "peaks": dict(self.peaks),
+            }
+
+
+_current: Optional[Trace] = None
+
+
+@contextmanager
+def trace_job(job_id: str) -> Iterator[Trace]:
+    """Make a fresh Trace the process-wide active one for the duration of a job."""
+    global _current
+    trace = Trace(job_id)
+    previous, _current = _current, trace
+    try:
+        yield trace
+    finally:
+        _current = previous
+
+
+def current_trace() -> Optional[Trace]:
+    return _current
+
+
+def span(name: str, **attrs: Any):
+    """Time a pipeline stage on the active trace (no-op outside trace_job)."""
+    trace = _current
+    return trace.span(name, **attrs) if trace is not None else nullcontext()
+
+
+def observe(name: str, value: float) -> None:
+    trace = _current
+    if trace is not None:
+        trace.observe(name, value)
+
+
+def count(name: str, n: float = 1) -> None:
+    trace = _current
+    if trace is not None:
+        trace.count(name, n)
+
+
+def peak(name: str, value: float) -> None:
+    trace = _current
+    if trace is not None:
+        trace.peak(name, value)
+
+
+# -----------------------------
+# Worker side: peak memory
+# -----------------------------
+def reset_peak_rss() -> bool:
+    """
+    Reset this process's RSS high-water mark so the next peak_rss_mb() reads
+    one job's peak rather than the worker's lifetime peak (Linux only).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Peak resident set size (VmHWM) of `pid` (default: this process) in MB."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    if pid is not None and pid != os.getpid():
+        return None
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS, and cannot be reset
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+
+
+# -----------------------------
+# API side: aggregate + Prometheus text
+# -----------------------------
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{str(v)}"' for k, v in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+class MetricsRegistry:
+    """Process-wide counters and histograms fed by finished jobs."""
+
+    PREFIX = "ad_"
+
+    def __init__(self):
+        # Re-entrant: record_job holds it across its inc()/histogram() calls
+        self._lock = threading.RLock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+
+    def _key(self, name: str, labels: Optional[Dict[str, str]]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None, help: str = "") -> None:
+        with self._lock:
+            key = self._key(name, labels)
+            self._counters[key] = self._counters.get(key, 0.0) + value
+            self._help.setdefault(name, ("counter", help))
+
+    def histogram(
+        self,
+        name: str,
+        buckets: Sequence[float],
+        labels: Optional[Dict[str, str]] = None,
+        help: str = "",
+    ) -> Histogram:
+        with self._lock:
+            key = self._key(name, labels)
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(buckets)
+                self._help.setdefault(name, ("histogram", help))
+            return hist
+
+    def record_job(self, status: str, result: Dict[str, Any], queue_wait: Optional[float] = None) -> None:
+        """Fold one finished job (status + the worker's result dict) into the totals."""
+        # Jobs finish on pool callback / job-store watcher threads while /metrics renders
+        with self._lock:
+            self._record_job(status, result, queue_wait)
+
+    def _record_job(self, status: str, result: Dict[str, Any], queue_wait: Optional[float]) -> None:
+        self.inc("jobs_total", labels={"status": status}, help="Finished render jobs by status.")
+        if queue_wait is not None:
+            self.histogram("job_queue_wait_seconds", STAGE_BUCKETS, help="Time jobs waited for a worker.").observe(queue_wait)
+
+        timings = result.get("timings") or {}
+        if timings.get("total"):
+            self.histogram("job_seconds", STAGE_BUCKETS, help="Wall time of finished renders.").observe(timings["total"])
+
+        trace = result.get("trace") or {}
+        frames = (trace.get("counters") or {}).get("frames_encoded")
+        if frames and timings.get("encode"):
+            self.histogram(
+                "encode_fps", FPS_BUCKETS, help="Frames encoded per second of encode stage, per job.",
+            ).observe(frames / timings["encode"])
+        for stage, seconds in (trace.get("stages") or {}).items():
+            self.histogram(
+                "stage_seconds", STAGE_BUCKETS, {"stage": stage},
+                help="Seconds per pipeline stage per job (scene stages summed over scenes).",
+            ).observe(seconds)
+        for name, data in (trace.get("histograms") or {}).items():
+            self.histogram(f"{name}_seconds", FRAME_BUCKETS, help=f"Per-frame {name.replace('_', ' ')} time.").merge(data)
+        for name, value in (trace.get("counters") or {}).items():
+            self.inc(f"{name}_total", value, help=f"Sum of per-job {name.replace('_', ' ')}.")
+
+        memory = result.get("memory") or {}
+        if memory.get("worker_peak_mb"):
+            self.histogram(
+                "job_peak_rss_mb", MEMORY_BUCKETS, help="Peak resident memory of the render worker per job, MB.",
+            ).observe(memory["worker_peak_mb"])
+        if memory.get("ffmpeg_peak_mb"):
+            self.histogram(
+                "job_ffmpeg_peak_rss_mb", MEMORY_BUCKETS, help="Peak resident memory of the largest ffmpeg encoder per job, MB.",
+            ).observe(memory["ffmpeg_peak_mb"])
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        out: List[str] = []
+        seen = set()
+
+        def header(name: str, kind: str, help: str) -> None:
+            if name in seen:
+                return
+            seen.add(name)
+            if help:
+                out.append(f"# HELP {self.PREFIX}{name} {help}")
+            out.append(f"# TYPE {self.PREFIX}{name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                header(name, "counter", self._help.get(name, ("", ""))[1])
+                out.append(f"{self.PREFIX}{name}{_labels(dict(labels))} {value:g}")
+
+            for (name, labels), hist in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                header(name, "histogram", self._help.get(name, ("", ""))[1])
+                base = dict(labels)
+                running = 0
+                for bound, n in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+                    running += n
+                    out.append(f"{self.PREFIX}{name}_bucket{_labels(dict(base, le=str(bound)))} {running}")
+                out.append(f"{self.PREFIX}{name}_sum{_labels(base)} {hist.sum:.6f}")
+                out.append(f"{self.PREFIX}{name}_count{_labels(base)} {hist.count}")
+
+        for name, value in sorted((gauges or {}).items()):
+            header(name, "gauge", "")
+            out.append(f"{self.PREFIX}{name} {value:g}")
+        return "\n".join(out) + "\n"
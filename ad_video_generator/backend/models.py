@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Any, List, Literal, Optional, get_args
+
+from pydantic import BaseModel, Field, field_validator
+
+from ad_video_generator.backend.profiles import PROFILES
+from ad_video_generator.backend.templates import get_registry
+
+Language = Literal["Hinglish", "Hindi", "English"]
+
+LANGUAGES = get_args(Language)
+
+
+def _check_hook(hook_id: str) -> str:
+    # Hooks are data (templates/common.json + AD_TEMPLATE_DIRS), so is the list of valid ids
+    if hook_id not in get_registry().hook_ids:
+        raise ValueError(f"unknown hook '{hook_id}'")
+    return hook_id
+
+
+class AdRequest(BaseModel):
+    brand: str = Field(default="Brand")
+    product: str = Field(default="Product")
+    benefits: List[str] = Field(default_factory=list)
+
+    audience: str = Field(default="India, 18-35")
+    offer: Optional[str] = None
+    cta: str = Field(default="Order Now")
+
+    tone: str = Field(default="Relatable, punchy")
+    language: str = Field(default="Hinglish")   # Hinglish / Hindi / English
+    duration_sec: int = Field(default=15, ge=5, le=60)  # safe range
+    hook: Optional[str] = None  # force a hook id from the templates (hook_a / hook_b / ...)
+    profile: str = Field(default="final")  # preview / final / square / landscape (see profiles.py)
+    template: Optional[str] = None  # script template id (ad_video_generator/templates); default picks by duration
+
+    @field_validator("hook")
+    @classmethod
+    def _known_hook(cls, v: Optional[str]) -> Optional[str]:
+        return _check_hook(v) if v else None
+
+    @field_validator("profile")
+    @classmethod
+    def _known_profile(cls, v: str) -> str:
+        name = v.strip().lower()
+        if name not in PROFILES:
+            raise ValueError(f"unknown profile '{v}' (one of {sorted(PROFILES)})")
+        return name
+
+    @field_validator("template")
+    @classmethod
+    def _known_template(cls, v: Optional[str]) -> Optional[str]:
+        if v and v not in get_registry():
+            raise ValueError(f"unknown template '{v}'")
+        return v or None
+
+
+class VariantSpec(BaseModel):
+    """Cartesian batch: every product x language x hook combination."""
+    products: List[AdRequest] = Field(min_length=1)
+    languages: List[Language] = Field(default_factory=lambda: list(LANGUAGES), min_length=1)
+    hooks: List[str] = Field(default_factory=lambda: list(get_registry().hook_ids), min_length=1)
+
+    @field_validator("languages", mode="before")
+    @classmethod
+    def _language_names(cls, v: Any) -> Any:
+        # Case-insensitive like AdRequest.language ("english" -> "English")
+        canonical = {name.lower(): name for name in LANGUAGES}
+        if isinstance(v, list):
+            return [canonical.get(x.strip().lower(), x) if isinstance(x, str) else x for x in v]
+        return v
+
+    @field_validator("hooks")
+    @classmethod
+    def _known_hooks(cls, v: List[str]) -> List[str]:
+        return [_check_hook(h) for h in v]
+
+
+class BatchRequest(BaseModel):
+    requests: List[AdRequest] = Field(default_factory=list)
+    variants: Optional[VariantSpec] = None
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from ad_video_generator.backend import settings
+
+
+def output_key(job_id: str) -> str:
+    """Object key of a job's finished video."""
+    return f"ad_{job_id}.mp4"
+
+
+class ObjectStore(ABC):
+    """
+    Where finished videos live, addressed by flat keys (see output_key).
+
+    Render workers put() a finished MP4; API nodes serve it from local_path().
+    A remote backend (S3, GCS) would implement the same three calls and make
+    local_path() a read-through cache.
+    """
+
+    @abstractmethod
+    def put(self, key: str, src: Path) -> None:
+        ...
+
+    @abstractmethod
+    def local_path(self, key: str) -> Path:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def exists(self, key: str) -> bool:
+        return self.local_path(key).exists()
+
+
+class LocalObjectStore(ObjectStore):
+    """
+    Objects as files in one directory. For a render farm the directory is a
+    volume every node mounts (NFS, EFS, ...); single-node mode uses data/outputs.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def local_path(self, key: str) -> Path:
+        return self.root / key
+
+    def put(self, key: str, src: Path) -> None:
+        """Move `src` in; readers never see a partial object."""
+        dst = self.local_path(key)
+        tmp = dst.with_name(f".{key}.{uuid.uuid4().hex[:6]}.tmp")
+        try:
+            shutil.move(str(src), str(tmp))  # a copy when src is on another filesystem
+            os.replace(tmp, dst)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def delete(self, key: str) -> None:
+        self.local_path(key).unlink(missing_ok=True)
+
+
+_store: Optional[ObjectStore] = None
+
+
+def get_object_store() -> ObjectStore:
+    global _store
+    if _store is None:
+        _store = LocalObjectStore(settings.OBJECT_STORE_DIR)
+    return _store
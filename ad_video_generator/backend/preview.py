@@ -0,0 +1,116 @@
+"""
+Storyboard preview: one still per scene, no TTS and no encoding.
+
+Copy iterations need to see the scenes, not the video. storyboard() runs the
+script engine and draws each scene's still straight at thumbnail size (the
+layout scales with the profile), so every background, font and wrapped line
+comes from the asset and layout caches after the first call.
+
+Timings are the script's planned ones; the final render may shift them once
+the real voiceovers are measured (see timing.py).
+"""
+from __future__ import annotations
+
+import base64
+import io
+from dataclasses import replace
+from typing import Any, Dict, List
+
+import numpy as np
+from PIL import Image, ImageDraw, features
+
+from ad_video_generator.backend.assets import get_font
+from ad_video_generator.backend.frames import build_frame, scene_badge
+from ad_video_generator.backend.profiles import RenderProfile, get_profile
+from ad_video_generator.backend.script_engine import generate_ad_json
+
+THUMB_WIDTHS = (120, 480)       # smallest / largest thumbnail width accepted
+SHEET_COLUMNS = 5
+SHEET_GAP = 12
+SHEET_CAPTION = 36              # pixels under each thumbnail for the scene's timing
+IMAGE_FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+
+
+def thumb_profile(profile: RenderProfile, width: int) -> RenderProfile:
+    """`profile` scaled down to `width` pixels wide, same aspect ratio."""
+    width = min(max(width, THUMB_WIDTHS[0]), THUMB_WIDTHS[1])
+    height = max(1, round(width * profile.height / profile.width))
+    return replace(profile, name=f"{profile.name}-thumb", width=width, height=height)
+
+
+def encode_image(img: Image.Image, fmt: str = "jpeg", quality: int = 80) -> bytes:
+    """JPEG or WebP bytes (WebP falls back to JPEG when Pillow lacks it)."""
+    if fmt == "webp" and not features.check("webp"):
+        fmt = "jpeg"
+    pil_format, _ = IMAGE_FORMATS.get(fmt, IMAGE_FORMATS["jpeg"])
+    buf = io.BytesIO()
+    img.save(buf, pil_format, quality=quality)
+    return buf.getvalue()
+
+
+def storyboard(meta: Dict[str, Any], width: int = 240) -> Dict[str, Any]:
+    """
+    The script for `meta` plus one still (RGB array) per scene.
+    Scene dicts carry the timing, line and on-screen text the still shows.
+    """
+    ad = generate_ad_json(meta)
+    profile = thumb_profile(get_profile(meta.get("profile")), width)
+
+    scenes: List[Dict[str, Any]] = []
+    for idx, scene in enumerate(ad.get("scenes", [])):
+        on_screen = scene.get("on_screen_text", []) or []
+        badge = scene_badge(scene)
+        scenes.append({
+            "idx": idx,
+            "t_start": scene.get("t_start", 0),
+            "t_end": scene.get("t_end", 0),
+            "vo": scene.get("vo"),
+            "on_screen_text": on_screen,
+            "badge": badge,
+            "sfx": scene.get("sfx"),
+            "frame": build_frame(on_screen, footer="Swipe up / Learn more", badge=badge, profile=profile),
+        })
+    return {
+        "duration": ad.get("duration"),
+        "hook": ad.get("chosen_hook"),
+        "size": list(profile.size),
+        "scenes": scenes,
+    }
+
+
+def thumbnails(board: Dict[str, Any], fmt: str = "jpeg") -> Dict[str, Any]:
+    """JSON-ready storyboard: each scene's still as a base64 data URL."""
+    _, mime = IMAGE_FORMATS.get(fmt, IMAGE_FORMATS["jpeg"])
+    if fmt == "webp" and not features.check("webp"):
+        mime = IMAGE_FORMATS["jpeg"][1]
+    scenes = []
+    for scene in board["scenes"]:
+        data = encode_image(Image.fromarray(scene["frame"]), fmt)
+        out = {k: v for k, v in scene.items() if k != "frame"}
+        out["thumbnail"] = f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+        scenes.append(out)
+    return dict(board, scenes=scenes)
+
+
+def contact_sheet(board: Dict[str, Any]) -> Image.Image:
+    """All stills on one image, left to right, with each scene's time range under it."""
+    frames: List[np.ndarray] = [s["frame"] for s in board["scenes"]]
+    if not frames:
+        return Image.new("RGB", (1, 1))
+    th, tw = frames[0].shape[:2]
+    cols = min(SHEET_COLUMNS, len(frames))
+    rows = -(-len(frames) // cols)
+    sheet = Image.new(
+        "RGB",
+        (cols * tw + (cols + 1) * SHEET_GAP, rows * (th + SHEET_CAPTION) + (rows + 1) * SHEET_GAP),
+        (24, 24, 28),
+    )
+    draw = ImageDraw.Draw(sheet)
+    font = get_font(20)
+    for i, (scene, frame) in enumerate(zip(board["scenes"], frames)):
+        x = SHEET_GAP + (i % cols) * (tw + SHEET_GAP)
+        y = SHEET_GAP + (i // cols) * (th + SHEET_CAPTION + SHEET_GAP)
+        sheet.paste(Image.fromarray(frame), (x, y))
+        caption = f"{i + 1}  {float(scene['t_start']):.1f}-{float(scene['t_end']):.1f}s"
+        draw.text((x, y + th + 8), caption, font=font, fill=(230, 230, 230))
+    return sheet
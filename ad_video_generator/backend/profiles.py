@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ad_video_generator.backend import settings
+
+# Layout numbers in video_maker/layout are designed on a 1080 px short side
+REFERENCE_SHORT_SIDE = 1080
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """Output size, frame rate and encoder settings for one kind of render."""
+    name: str
+    width: int
+    height: int
+    fps: int
+    preset: str = "medium"
+    crf: Optional[int] = None          # None = libx264 default (23)
+    supersample: int = 2                # MotionPlan source supersampling
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @property
+    def scale(self) -> float:
+        """Layout scale relative to the 1080 px reference."""
+        return min(self.width, self.height) / REFERENCE_SHORT_SIDE
+
+    def px(self, value: float) -> int:
+        """A reference-layout length (fonts, margins, offsets) in this profile's pixels."""
+        return max(1, int(round(value * self.scale)))
+
+    def encoder_args(self) -> List[str]:
+        return ["-crf", str(self.crf)] if self.crf is not None else []
+
+
+def _final(name: str, width: int, height: int) -> RenderProfile:
+    return RenderProfile(
+        name=name,
+        width=width,
+        height=height,
+        fps=settings.FPS,
+        supersample=settings.MOTION_SUPERSAMPLE,
+    )
+
+
+PROFILES: Dict[str, RenderProfile] = {
+    # ✅ Quick look for marketers: a third of the size, half the frames, fastest x264 preset
+    "preview": RenderProfile("preview", 360, 640, fps=15, preset="ultrafast", crf=28, supersample=1),
+    "final": _final("final", 1080, 1920),
+    "square": _final("square", 1080, 1080),
+    "landscape": _final("landscape", 1920, 1080),
+}
+
+DEFAULT_PROFILE = "final"
+
+
+def get_profile(name: Optional[str]) -> RenderProfile:
+    """Profile by name; unknown or empty names fall back to "final"."""
+    return PROFILES.get((name or DEFAULT_PROFILE).strip().lower(), PROFILES[DEFAULT_PROFILE])
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.fonts import resolve_font_path
+from ad_video_generator.backend.templates import get_registry
+from ad_video_generator.backend.voice import voice_for
+
+# ✅ Bump whenever a code change alters rendered pixels or audio, so stale videos stop matching
+RENDERER_VERSION = "5"
+
+
+# -----------------------------
+# Canonical request key
+# -----------------------------
+def _clean(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    return value
+
+
+def normalize_request(meta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonical form of an AdRequest payload: whitespace collapsed, empty
+    benefits dropped, blank offer treated as no offer. Tone and language are
+    only matched case-insensitively by script_engine, so they are lowercased.
+    """
+    out: Dict[str, Any] = {}
+    for k, v in sorted(meta.items()):
+        if k == "benefits":
+            v = [_clean(b) for b in (v or []) if _clean(b)]
+        elif k in ("tone", "language"):
+            v = (_clean(v) or "").lower()
+        elif k == "offer":
+            v = _clean(v) or None
+        else:
+            v = _clean(v)
+        out[k] = v
+    return out
+
+
+def render_key(meta: Dict[str, Any]) -> str:
+    """Hash of the normalized request plus everything else that changes the output."""
+    payload = {
+        "request": normalize_request(meta),
+        "renderer": RENDERER_VERSION,
+        "fps": settings.FPS,
+        "supersample": settings.MOTION_SUPERSAMPLE,
+        "font": resolve_font_path(),  # AD_FONT_PATH, else the first match across AD_FONT_DIRS + built-ins
+        "tts": settings.TTS_BACKEND,
+        "tts_url": settings.TTS_URL if settings.TTS_BACKEND == "http" else None,
+        "voice": voice_for(meta.get("language")),  # AD_TTS_VOICES
+        "sfx_volume": settings.SFX_VOLUME,
+        "max_speech_tempo": settings.MAX_SPEECH_TEMPO,
+        "templates": get_registry().fingerprint,  # built-in + AD_TEMPLATE_DIRS files
+        "engine": settings.RENDER_ENGINE,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# On-disk index
+# -----------------------------
+class RenderCache:
+    """
+    Maps render keys to finished videos so identical requests skip the render.
+
+    The index is a small JSON file (key -> job_id, path, size, created,
+    last_used) rewritten atomically on change. Lookups run on the event loop,
+    so they only update memory; their last_used times reach the file on the
+    next record(), evict() (the API's sweeper) or flush(). Entries whose video
+    disappeared (e.g. removed by the output sweeper) are dropped on lookup;
+    evict() trims by age and total size, oldest-used first.
+    """
+
+    def __init__(self, index_path: Path, max_bytes: int, max_age_sec: float):
+        self.index_path = Path(index_path)
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._read()
+        self._dirty = False  # in-memory changes not yet in the index file
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.index_path)
+        self._dirty = False
+
+    def flush(self) -> None:
+        """Write pending lookup updates (last_used, dropped entries) to the index."""
+        with self._lock:
+            if self._dirty:
+                self._write()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not Path(entry["path"]).exists():
+                if entry is not None:
+                    del self._entries[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self._dirty = True
+            self.hits += 1
+            return dict(entry)
+
+    def record(self, key: str, job_id: str, path: Path) -> None:
+        try:
+            size = Path(path).stat().st_size
+        except FileNotFoundError:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                "job_id": job_id,
+                "path": str(path),
+                "size": size,
+                "created": now,
+                "last_used": now,
+            }
+            self._write()
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop entries past max age, then least recently used until under max_bytes."""
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                expired = self.max_age_sec > 0 and now - entry["created"] > self.max_age_sec
+                if expired or not Path(entry["path"]).exists():
+                    Path(entry["path"]).unlink(missing_ok=True)
+                    del self._entries[key]
+                    removed += 1
+
+            total = sum(e["size"] for e in self._entries.values())
+            for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1]["last_used"]):
+                if self.max_bytes <= 0 or total <= self.max_bytes:
+                    break
+                Path(entry["path"]).unlink(missing_ok=True)
+                del self._entries[key]
+                total -= entry["size"]
+                removed += 1
+
+            if removed or self._dirty:
+                self._write()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(e["size"] for e in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from ad_video_generator.backend import settings
+
+
+# -----------------------------
+# Scratch root (tmpfs when available)
+# -----------------------------
+def scratch_root() -> Path:
+    """
+    Where per-job scratch directories live.
+    AD_SCRATCH_DIR wins; otherwise /dev/shm (RAM-backed) on Linux, else data/outputs/tmp.
+    """
+    if settings.SCRATCH_DIR:
+        root = Path(settings.SCRATCH_DIR)
+    else:
+        shm = Path("/dev/shm")
+        if shm.is_dir() and os.access(shm, os.W_OK):
+            root = shm / "ad_video_generator"
+        else:
+            root = settings.OUT_DIR / "tmp"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+# Fragmented MP4 the ffmpeg engine writes inside a job's scratch dir while encoding
+LIVE_NAME = "live.mp4"
+
+
+@contextmanager
+def job_scratch(job_id: str) -> Iterator[Path]:
+    """
+    Private scratch directory for one render. Frames, voiceovers and MoviePy's
+    temp audio go here, and the whole directory is removed on success or failure.
+    """
+    path = scratch_root() / f"job_{job_id}_{uuid.uuid4().hex[:6]}"
+    path.mkdir(parents=True)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def live_path(job_name: str) -> Optional[Path]:
+    """Growing fragmented MP4 of a render in progress (see LIVE_NAME), if one exists yet."""
+    for path in scratch_root().glob(f"job_{job_name}_*/{LIVE_NAME}"):
+        return path
+    return None
+
+
+# -----------------------------
+# Output sweeper (TTL + disk quota)
+# -----------------------------
+def _remove(path: Path) -> int:
+    try:
+        size = path.stat().st_size if path.is_file() else 0
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink()
+        return size
+    except FileNotFoundError:
+        return 0
+
+
+def sweep_outputs(
+    out_dir: Path,
+    max_bytes: int,
+    ttl_sec: float,
+    keep: Iterable[Path] = (),
+    now: Optional[float] = None,
+) -> Dict[str, int]:
+    """
+    Delete finished videos older than `ttl_sec`, then the oldest remaining ones
+    until `out_dir` fits in `max_bytes`. Paths in `keep` (jobs still rendering)
+    are never touched. Stale job scratch dirs are swept with the same TTL.
+    """
+    now = time.time() if now is None else now
+    keep_set = {Path(p).resolve() for p in keep}
+    removed, freed = 0, 0
+
+    videos = []
+    for p in out_dir.glob("ad_*.mp4"):
+        if p.resolve() in keep_set:
+            continue
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        videos.append((st.st_mtime, st.st_size, p))
+    videos.sort()
+
+    survivors = []
+    for mtime, size, p in videos:
+        if ttl_sec > 0 and now - mtime > ttl_sec:
+            freed += _remove(p)
+            removed += 1
+        else:
+            survivors.append((mtime, size, p))
+
+    total = sum(size for _, size, _ in survivors)
+    for mtime, size, p in survivors:
+        if max_bytes <= 0 or total <= max_bytes:
+            break
+        freed += _remove(p)
+        total -= size
+        removed += 1
+
+    # Scratch dirs left behind by killed workers
+    for root in {scratch_root(), out_dir / "tmp"}:
+        if not root.is_dir():
+            continue
+        for p in root.glob("job_*"):
+            try:
+                if now - p.stat().st_mtime > ttl_sec > 0:
+                    shutil.rmtree(p, ignore_errors=True)
+            except FileNotFoundError:
+                pass
+
+    return {"removed": removed, "freed_bytes": freed, "total_bytes": total}
@@ -0,0 +1,211 @@
+"""
+Bulk script generation: ad scripts for a whole catalog, no rendering.
+
+Used by POST /scripts/bulk and from the command line:
+
+    python -m ad_video_generator.backend.scripts_bulk catalog.csv [--output csv] > scripts.jsonl
+
+Input is CSV (a header row of AdRequest fields; benefits separated by "|")
+or JSONL (one AdRequest object per line). Rows are parsed, validated and
+scripted as they stream in, and results stream out in the same or the other
+format: one line per row, with an "error" instead of a script for bad rows.
+A "sku" (or "id") column is echoed back so results can be joined to the catalog.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import codecs
+import csv
+import io
+import json
+import sys
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.models import AdRequest
+from ad_video_generator.backend.templates import get_registry
+
+FORMATS = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+ID_COLUMNS = ("sku", "id")
+BENEFIT_SEP = "|"
+
+# Output lines per chunk handed to the response stream
+CHUNK_ROWS = 256
+
+
+# -----------------------------
+# Input (bytes -> row dicts)
+# -----------------------------
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines (without line endings) as the chunks arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")("replace")
+    tail = ""
+    async for chunk in chunks:
+        text = tail + decoder.decode(chunk)
+        *lines, tail = text.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def read_jsonl(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"_error": f"invalid JSON: {e.msg}"}
+            continue
+        yield row if isinstance(row, dict) else {"_error": "row is not a JSON object"}
+
+
+async def read_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    header: Optional[List[str]] = None
+    record = ""
+    async for line in _lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue  # newline inside a quoted field: the record goes on
+        values, record = next(csv.reader([record]), []), ""
+        if not any(v.strip() for v in values):
+            continue
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        yield dict(zip(header, values))
+
+
+READERS = {"jsonl": read_jsonl, "csv": read_csv}
+
+
+# -----------------------------
+# Rows -> scripts
+# -----------------------------
+def request_from_row(row: Dict[str, Any]) -> AdRequest:
+    """AdRequest from a CSV/JSONL row: unknown columns ignored, blank cells treated as missing."""
+    data = {k: v for k, v in row.items() if k in AdRequest.model_fields and v not in ("", None)}
+    if isinstance(data.get("benefits"), str):
+        data["benefits"] = [b.strip() for b in data["benefits"].split(BENEFIT_SEP) if b.strip()]
+    return AdRequest(**data)
+
+
+def script_row(n: int, row: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"row": n}
+    for col in ID_COLUMNS:
+        if row.get(col) not in (None, ""):
+            out[col] = row[col]
+            break
+    if "_error" in row:
+        out["error"] = row["_error"]
+        return out
+    try:
+        req = request_from_row(row)
+    except ValidationError as e:
+        out["error"] = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        return out
+    out["script"] = get_registry().generate(req.model_dump())
+    return out
+
+
+# -----------------------------
+# Output
+# -----------------------------
+def csv_header(max_scenes: int) -> List[str]:
+    cols = ["row", "sku", "error", "template", "duration_sec", "hook"]
+    for i in range(1, max_scenes + 1):
+        cols += [f"scene{i}_start", f"scene{i}_end", f"scene{i}_vo", f"scene{i}_text"]
+    return cols
+
+
+def csv_values(result: Dict[str, Any], max_scenes: int) -> List[Any]:
+    script = result.get("script") or {}
+    sku = next((result[c] for c in ID_COLUMNS if c in result), "")
+    values = [result["row"], sku, result.get("error", ""), script.get("template", ""),
+              script.get("duration", ""), script.get("chosen_hook", "")]
+    scenes = script.get("scenes", [])
+    for i in range(max_scenes):
+        if i < len(scenes):
+            s = scenes[i]
+            values += [s["t_start"], s["t_end"], s["vo"], " / ".join(t for t in s["on_screen_text"] if t)]
+        else:
+            values += ["", "", "", ""]
+    return values
+
+
+def _format(results: Iterable[Dict[str, Any]], output: str, max_scenes: int) -> str:
+    if output == "jsonl":
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in results)
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    for r in results:
+        w.writerow(csv_values(r, max_scenes))
+    return buf.getvalue()
+
+
+async def stream_scripts(
+    chunks: AsyncIterator[bytes],
+    input_format: str = "jsonl",
+    output: str = "jsonl",
+    max_rows: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Scripts for every row of an uploaded catalog, as output text chunks.
+    Rows beyond `max_rows` are not read; a final error line says so.
+    """
+    max_rows = max_rows or settings.SCRIPTS_BULK_MAX_ROWS
+    max_scenes = get_registry().max_scenes
+    if output == "csv":
+        yield ",".join(csv_header(max_scenes)) + "\n"
+
+    batch: List[Dict[str, Any]] = []
+    n = 0
+    async for row in READERS[input_format](chunks):
+        n += 1
+        if n > max_rows:
+            batch.append({"row": n, "error": f"too many rows (max {max_rows}); the rest were skipped"})
+            break
+        batch.append(script_row(n, row))
+        if len(batch) >= CHUNK_ROWS:
+            yield _format(batch, output, max_scenes)
+            batch = []
+            await asyncio.sleep(0)  # let other requests run between chunks
+    if batch:
+        yield _format(batch, output, max_scenes)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+async def _file_chunks(f: Any, size: int = 1 << 16) -> AsyncIterator[bytes]:
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _main(args: argparse.Namespace) -> None:
+    src = sys.stdin.buffer if args.items == "-" else open(args.items, "rb")
+    input_format = args.input or ("csv" if args.items.lower().endswith(".csv") else "jsonl")
+    with src:
+        async for text in stream_scripts(_file_chunks(src), input_format, args.output or input_format):
+            sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Generate ad scripts (no rendering) for a CSV/JSONL catalog.")
+    ap.add_argument("items", help="CSV or JSONL file with one AdRequest per row ('-' for stdin)")
+    ap.add_argument("--input", choices=sorted(FORMATS), help="input format (default: from the file extension)")
+    ap.add_argument("--output", choices=sorted(FORMATS), help="output format (default: same as input)")
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
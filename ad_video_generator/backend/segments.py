@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.encoder import FASTSTART_ARGS, ffmpeg_binary
+
+# ✅ Bump whenever motion, frame drawing or encoder settings change segment pixels
+SEGMENT_VERSION = "2"
+
+
+# -----------------------------
+# Keys
+# -----------------------------
+def scene_frames(duration: float, fps: int) -> int:
+    """Frames a scene segment holds: its duration snapped to the frame grid."""
+    return max(1, int(round(duration * fps)))
+
+
+def segment_key(
+    frame: np.ndarray,
+    motion: str,
+    anim: str,
+    duration: float,
+    frames: int,
+    fps: int,
+    supersample: int,
+    preset: str = "medium",
+    crf: Optional[int] = None,
+) -> str:
+    """
+    Hash of everything that changes a scene's encoded video: the drawn still
+    (on-screen text, badge, footer, font and size are all in its pixels),
+    camera + text animation, duration and frame count, fps and encoder settings.
+    """
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(frame).data)
+    h.update(
+        "\0".join((
+            SEGMENT_VERSION, str(frame.shape), (motion or "").lower(), (anim or "").lower(),
+            f"{duration:.6f}", str(frames), str(fps), str(supersample), preset, str(crf),
+        )).encode("utf-8")
+    )
+    return h.hexdigest()
+
+
+# -----------------------------
+# Segment cache (disk, shared by workers)
+# -----------------------------
+class SegmentCache:
+    """
+    Encoded, video-only scene segments on disk, keyed by segment_key().
+
+    Files live at root/kk/<key>.mp4 and are published with an atomic rename,
+    so several worker processes can share the directory; two workers missing
+    on the same key just encode it twice. mtime is the "last used" stamp and
+    the oldest segments are deleted once the folder grows past `max_bytes`.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.mp4"
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def tmp_path(self, key: str) -> Path:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f".{key}.{uuid.uuid4().hex[:6]}.tmp.mp4")
+
+    def put(self, key: str, tmp: Path, evict: bool = True) -> Path:
+        """
+        Publish a finished segment written at tmp_path(key). Jobs encoding
+        several segments at once pass evict=False and evict once they are
+        joined, so one segment never evicts a sibling the job still needs.
+        """
+        path = self.path_for(key)
+        os.replace(tmp, path)
+        if evict:
+            self.evict(keep=[path])
+        return path
+
+    def evict(self, keep: Iterable[Path] = ()) -> int:
+        if self.max_bytes <= 0:
+            return 0
+        keep_set = set(keep)
+        entries = []
+        for p in self.root.glob("*/*.mp4"):
+            if p.name.startswith("."):
+                continue
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if p in keep_set:
+                continue
+            p.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache: Optional[SegmentCache] = None
+
+
+def get_segment_cache() -> SegmentCache:
+    """Process-wide segment cache (settings.SEGMENT_CACHE_DIR)."""
+    global _cache
+    if _cache is None:
+        _cache = SegmentCache(settings.SEGMENT_CACHE_DIR, settings.SEGMENT_CACHE_BYTES)
+    return _cache
+
+
+# -----------------------------
+# Assembly
+# -----------------------------
+def concat_segments(segments: Iterable[Path], audio_path: Path, out_path: Path, list_path: Path) -> None:
+    """Stream-copy the video segments back to back and mux in the soundtrack (AAC)."""
+    lines: List[str] = []
+    for p in segments:
+        escaped = str(Path(p).resolve()).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'")
+    list_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    cmd = [
+        ffmpeg_binary(), "-y", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", str(list_path),
+        "-i", str(audio_path),
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "copy", "-c:a", "aac", *FASTSTART_ARGS,
+        str(out_path),
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg concat failed: {err[-2000:]}")
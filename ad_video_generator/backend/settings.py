@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+# -----------------------------
+# Env helpers
+# -----------------------------
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+# -----------------------------
+# Paths
+# -----------------------------
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../ad_video_generator
+DATA_DIR = BASE_DIR / "data"
+OUT_DIR = DATA_DIR / "outputs"
+
+
+# -----------------------------
+# Job queue
+# -----------------------------
+# Render processes; each one keeps a core busy while MoviePy encodes.
+RENDER_WORKERS = max(1, _env_int("AD_RENDER_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+
+# Jobs allowed to wait for a free worker before /generate answers 429.
+MAX_QUEUE = max(0, _env_int("AD_MAX_QUEUE", 16))
+
+# Finished job records kept in memory for /jobs/{id}.
+JOB_HISTORY = max(1, _env_int("AD_JOB_HISTORY", 500))
+
+# Render processes warm up when they spawn (MoviePy, ffmpeg, fonts and backgrounds for every
+# profile, the TTS client, a tiny encode) so the first job runs at full speed; /ready waits for it.
+# 0 only preloads the default background and fonts.
+WORKER_WARMUP = _env_int("AD_WORKER_WARMUP", 1) != 0
+
+
+# -----------------------------
+# Render farm (multi-node mode)
+# -----------------------------
+# SQLite job store shared by every API node and render worker (e.g. on a shared volume).
+# Empty = single-node mode: jobs live in memory and render in the API's own process pool.
+JOB_STORE = os.environ.get("AD_JOB_STORE", "").strip()
+
+# Finished videos (local-filesystem object store); farm nodes must all see the same directory.
+OBJECT_STORE_DIR = Path(os.environ.get("AD_OBJECT_STORE_DIR", "").strip() or OUT_DIR)
+
+# A worker that misses heartbeats this long loses its jobs to other workers...
+JOB_LEASE_SEC = max(5, _env_int("AD_JOB_LEASE_SEC", 30))
+
+# ...and a job whose workers keep dying fails after this many attempts.
+JOB_MAX_ATTEMPTS = max(1, _env_int("AD_JOB_MAX_ATTEMPTS", 3))
+
+# How often farm workers poll for work and heartbeat their jobs.
+WORKER_POLL_SEC = max(1, _env_int("AD_WORKER_POLL_SEC", 1))
+
+
+# -----------------------------
+# Scratch space + output retention
+# -----------------------------
+# Per-job scratch root; empty means /dev/shm when writable, else data/outputs/tmp.
+SCRATCH_DIR = os.environ.get("AD_SCRATCH_DIR", "").strip()
+
+# Finished videos in data/outputs are deleted after this many hours...
+OUTPUT_TTL_SEC = max(0, _env_int("AD_OUTPUT_TTL_HOURS", 24)) * 3600
+
+# ...and the oldest ones go first once the folder exceeds this quota (0 = no quota).
+OUTPUT_QUOTA_BYTES = max(0, _env_int("AD_OUTPUT_QUOTA_MB", 2048)) * 1024 * 1024
+
+# How often the API runs the sweeper.
+SWEEP_INTERVAL_SEC = max(10, _env_int("AD_SWEEP_INTERVAL_SEC", 300))
+
+
+# -----------------------------
+# Text-to-speech
+# -----------------------------
+# "edge" (edge-tts, needs network), "offline" (deterministic local stand-in) or
+# "http" (a self-hosted TTS server at TTS_URL, e.g. backend/tts_server.py).
+TTS_BACKEND = os.environ.get("AD_TTS_BACKEND", "edge").strip().lower()
+TTS_URL = os.environ.get("AD_TTS_URL", "http://127.0.0.1:8099").strip().rstrip("/")
+
+# Voice per AdRequest.language, e.g. "English=en-US-GuyNeural;Hindi=hi-IN-SwaraNeural".
+TTS_VOICES = {
+    k.strip().lower(): v.strip()
+    for k, _, v in (item.partition("=") for item in os.environ.get("AD_TTS_VOICES", "").split(";"))
+    if k.strip() and v.strip()
+}
+
+# Per-line timeout, retries and process-wide lines in flight; unset keeps the provider's own default.
+TTS_TIMEOUT_SEC = max(0, _env_int("AD_TTS_TIMEOUT_SEC", 0))
+TTS_RETRIES = _env_int("AD_TTS_RETRIES", -1)
+TTS_MAX_INFLIGHT = max(0, _env_int("AD_TTS_MAX_INFLIGHT", 0))
+
+# Artificial per-request delay of the stand-in TTS server, to mimic a remote service in load tests.
+TTS_SERVER_LATENCY_MS = max(0, _env_int("AD_TTS_SERVER_LATENCY_MS", 0))
+
+# Content-addressed voiceover cache shared by all render workers (0 MB disables it).
+TTS_CACHE_DIR = Path(os.environ.get("AD_TTS_CACHE_DIR", "").strip() or DATA_DIR / "cache" / "tts")
+TTS_CACHE_BYTES = max(0, _env_int("AD_TTS_CACHE_MB", 256)) * 1024 * 1024
+
+
+# -----------------------------
+# Audio
+# -----------------------------
+# Loudness of the script's sfx cues (whoosh, boom, ...) in percent; 0 mutes them.
+SFX_VOLUME = max(0, _env_int("AD_SFX_VOLUME", 35))
+
+
+# -----------------------------
+# Scene pipeline
+# -----------------------------
+# Voiceover requests in flight at once per job.
+TTS_CONCURRENCY = max(1, _env_int("AD_TTS_CONCURRENCY", 4))
+
+# Fastest speech the timing solver may use to fit lines into the requested duration (125 = 1.25x).
+MAX_SPEECH_TEMPO = max(100, _env_int("AD_MAX_SPEECH_TEMPO_PCT", 125)) / 100
+
+# Threads per job for frame drawing and voiceover decoding.
+FRAME_THREADS = max(1, _env_int("AD_FRAME_THREADS", min(4, os.cpu_count() or 1)))
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+# "moviepy" (compose + write_videofile), "ffmpeg" (frames piped straight into ffmpeg)
+# or "segments" (each scene encoded once into a cached segment, then stream-copied together).
+RENDER_ENGINE = os.environ.get("AD_RENDER_ENGINE", "moviepy").strip().lower()
+
+FPS = max(1, _env_int("AD_FPS", 30))
+
+# x264 threads per ffmpeg encoder; 0 = auto: this job's share of the host's cores
+# (cores / RENDER_WORKERS), split across the encoders the job runs at once.
+ENCODE_THREADS = max(0, _env_int("AD_ENCODE_THREADS", 0))
+
+# Scenes the "segments" engine renders + encodes at once; 0 = auto (one per two cores of the job's share).
+SEGMENT_PARALLEL = max(0, _env_int("AD_SEGMENT_PARALLEL", 0))
+
+# The ffmpeg engine encodes to a fragmented MP4 first so /jobs/{id}/live can stream
+# the render while it runs (0 = encode straight to the final faststart MP4).
+LIVE_STREAM = _env_int("AD_LIVE_STREAM", 1) != 0
+
+# Motion warps sample a source supersampled this many times (1 = fastest, 2 = half-pixel accurate).
+MOTION_SUPERSAMPLE = max(1, _env_int("AD_MOTION_SUPERSAMPLE", 2))
+
+# Memory-bounded renders (ffmpeg/segments engines): frames are drawn only when the
+# encoder reaches their scene, and x264 uses a shorter lookahead.
+LOW_MEMORY = _env_int("AD_LOW_MEMORY", 0) != 0
+
+
+# -----------------------------
+# Diagnostics
+# -----------------------------
+# When set, every render writes a cProfile dump to <dir>/<job_id>.prof (main thread only).
+PROFILE_DIR = os.environ.get("AD_PROFILE_DIR", "").strip()
+
+
+# -----------------------------
+# Assets
+# -----------------------------
+# Extra font directories searched before the built-in ones (os.pathsep separated).
+FONT_DIRS = [d for d in os.environ.get("AD_FONT_DIRS", "").split(os.pathsep) if d.strip()]
+
+# Explicit font file; skips the search entirely.
+FONT_PATH = os.environ.get("AD_FONT_PATH", "").strip()
+
+
+# -----------------------------
+# Script templates
+# -----------------------------
+# Extra template directories (os.pathsep separated) loaded after ad_video_generator/templates;
+# a file there with an existing template id replaces the built-in one.
+TEMPLATE_DIRS = [Path(d) for d in os.environ.get("AD_TEMPLATE_DIRS", "").split(os.pathsep) if d.strip()]
+
+# Largest /scripts/bulk upload, in rows.
+SCRIPTS_BULK_MAX_ROWS = max(1, _env_int("AD_SCRIPTS_BULK_MAX_ROWS", 100000))
+
+
+# -----------------------------
+# Render cache (whole videos)
+# -----------------------------
+# Identical requests return the existing video (0 disables).
+RENDER_CACHE = _env_int("AD_RENDER_CACHE", 1) != 0
+RENDER_CACHE_INDEX = DATA_DIR / "cache" / "renders.json"
+RENDER_CACHE_BYTES = max(0, _env_int("AD_RENDER_CACHE_MB", 1024)) * 1024 * 1024
+RENDER_CACHE_TTL_SEC = max(0, _env_int("AD_RENDER_CACHE_TTL_HOURS", 24)) * 3600
+
+# Encoded scene segments for the "segments" engine, shared across jobs and variants (0 MB disables eviction).
+SEGMENT_CACHE_DIR = Path(os.environ.get("AD_SEGMENT_CACHE_DIR", "").strip() or DATA_DIR / "cache" / "segments")
+SEGMENT_CACHE_BYTES = max(0, _env_int("AD_SEGMENT_CACHE_MB", 2048)) * 1024 * 1024
+
+# Largest /generate/batch request (after variant expansion).
+BATCH_MAX_ITEMS = max(1, _env_int("AD_BATCH_MAX_ITEMS", 5000))
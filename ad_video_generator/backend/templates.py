@@ -0,0 +1,288 @@
+"""
+Script templates: declarative scene layouts instead of code.
+
+ad_video_generator/templates/ holds one JSON file per layout (scene timeline,
+lines, on-screen text, shots, sfx) plus common.json (hooks and shared lines).
+Any string may be a {"hinglish": ..., "hindi": ..., "english": ...} table and
+may use {brand}, {product}, {b1}, {cta}, {hook_line}, ... placeholders.
+
+The registry loads and validates every file once, then precompiles each
+template per language into plain format strings, so generating a script is
+only a few str.format_map calls: cheap enough for catalog-scale bulk runs.
+Scene times are written for the template's nominal duration and scale to the
+requested one.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import string
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ad_video_generator.backend import settings
+
+TEMPLATE_DIR = settings.BASE_DIR / "templates"
+COMMON_FILE = "common.json"
+
+LANGUAGES = ("hinglish", "hindi", "english")
+
+# Placeholders a template string may use
+FIELDS = frozenset({
+    "brand", "product", "b1", "b2", "b3", "offer", "offer_prefix", "cta", "cta_line",
+    "hook_line", "hook_line_short", "hook_visual_query", "hook_sfx",
+})
+
+# Scene keys in output order (video_maker, timing and preview read these)
+SCENE_KEYS = (
+    "vo", "vo_short", "on_screen_text", "shot", "camera", "visual_query", "text_animation", "sfx", "overlay",
+)
+
+DEFAULT_BENEFITS = ("Visible results", "Lightweight & easy", "Worth every rupee")
+
+Compiled = Callable[[Dict[str, str]], Any]
+
+
+def language_key(language: Optional[str]) -> str:
+    """AdRequest.language -> string-table column (Hinglish unless Hindi or English is asked for)."""
+    lang = (language or "Hinglish").lower()
+    if "hindi" in lang and "hinglish" not in lang:
+        return "hindi"
+    if "english" in lang:
+        return "english"
+    return "hinglish"
+
+
+# -----------------------------
+# Compilation
+# -----------------------------
+def _is_table(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value) and set(value) <= set(LANGUAGES)
+
+
+def _compile(value: Any, lang: str, where: str) -> Compiled:
+    """Resolve language tables for `lang` and turn the value into ctx -> output."""
+    if _is_table(value):
+        if lang not in value:
+            raise ValueError(f"{where}: missing '{lang}' text")
+        value = value[lang]
+    if isinstance(value, list):
+        parts = [_compile(v, lang, f"{where}[{i}]") for i, v in enumerate(value)]
+        return lambda ctx: [p(ctx) for p in parts]
+    if not isinstance(value, str):
+        return lambda ctx: value
+
+    names = {name for _, name, _, _ in string.Formatter().parse(value) if name is not None}
+    unknown = names - FIELDS
+    if unknown:
+        raise ValueError(f"{where}: unknown placeholder(s) {sorted(unknown)}")
+    if not names:
+        return lambda ctx: value
+    return lambda ctx: value.format_map(ctx)
+
+
+def _compile_dict(raw: Dict[str, Any], lang: str, where: str, keys: Iterable[str]) -> Callable[[Dict[str, str]], Dict[str, Any]]:
+    parts = [(k, _compile(raw[k], lang, f"{where}.{k}")) for k in keys if k in raw]
+    return lambda ctx: {k: p(ctx) for k, p in parts}
+
+
+# -----------------------------
+# Templates
+# -----------------------------
+@dataclass
+class Template:
+    """One scene layout, e.g. "short" (<=15 s) or "story" (16-60 s)."""
+    id: str
+    description: str
+    durations: Tuple[int, int]
+    nominal_duration: float
+    default_hook: str
+    tone_hooks: Dict[str, str]
+    times: List[Tuple[float, float]]
+    scenes: Dict[str, List[Callable[[Dict[str, str]], Dict[str, Any]]]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, path: Path) -> "Template":
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        where = path.name
+        try:
+            tid = raw["id"]
+            lo, hi = raw["durations"]
+            times = [(s["t"][0], s["t"][1]) for s in raw["scenes"]]
+            if not all(isinstance(t, (int, float)) for pair in times for t in pair):
+                raise ValueError("scene times must be numbers")
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{where}: needs id, durations [min, max] and scenes with t [start, end] ({e!r})") from None
+        if not times:
+            raise ValueError(f"{where}: no scenes")
+
+        hook = raw.get("hook") or {}
+        tpl = cls(
+            id=tid,
+            description=raw.get("description", ""),
+            durations=(int(lo), int(hi)),
+            nominal_duration=float(raw.get("nominal_duration") or times[-1][1]),
+            default_hook=hook.get("default", "hook_a"),
+            tone_hooks={k.lower(): v for k, v in (hook.get("tones") or {}).items()},
+            times=times,
+        )
+        for lang in LANGUAGES:
+            tpl.scenes[lang] = [
+                _compile_dict(s, lang, f"{where}.scenes[{i}]", SCENE_KEYS) for i, s in enumerate(raw["scenes"])
+            ]
+        return tpl
+
+    def covers(self, duration: int) -> bool:
+        return self.durations[0] <= duration <= self.durations[1]
+
+    def timeline(self, duration: float) -> List[Tuple[float, float]]:
+        """Scene (t_start, t_end) scaled from the nominal duration to `duration`."""
+        if duration == self.nominal_duration:
+            return list(self.times)
+        k = duration / self.nominal_duration
+        return [(round(t0 * k, 2), round(t1 * k, 2)) for t0, t1 in self.times]
+
+    def pick_hook(self, tone: str) -> str:
+        for word, hook_id in self.tone_hooks.items():
+            if word in tone:
+                return hook_id
+        return self.default_hook
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+class TemplateRegistry:
+    """
+    All templates plus the shared hooks/lines, loaded from `dirs` in order;
+    a later directory's file with the same template id replaces the earlier one.
+    """
+
+    def __init__(self, dirs: Iterable[Path]):
+        self.templates: Dict[str, Template] = {}
+        self._hooks: Dict[str, List[Callable[[Dict[str, str]], Dict[str, Any]]]] = {}
+        self._strings: Dict[str, Dict[str, Compiled]] = {}
+        digest = hashlib.sha256()
+
+        common: Dict[str, Any] = {}
+        for d in dirs:
+            d = Path(d)
+            if not d.is_dir():
+                continue
+            for path in sorted(d.glob("*.json")):
+                digest.update(path.name.encode("utf-8") + b"\0" + path.read_bytes())
+                if path.name == COMMON_FILE:
+                    raw = json.loads(path.read_text(encoding="utf-8"))
+                    common.setdefault("strings", {}).update(raw.get("strings") or {})
+                    hooks = {h["id"]: h for h in common.get("hooks", [])}
+                    hooks.update({h["id"]: h for h in raw.get("hooks") or []})
+                    common["hooks"] = list(hooks.values())
+                else:
+                    tpl = Template.load(path)
+                    self.templates[tpl.id] = tpl
+
+        # Changes whenever a template file does (part of the render cache key)
+        self.fingerprint = digest.hexdigest()[:16]
+
+        if not self.templates or not common.get("hooks"):
+            raise ValueError(f"No script templates found in {[str(d) for d in dirs]}")
+
+        hook_keys = ("id", "line", "line_short", "visual", "visual_query", "text_style", "animation", "sfx")
+        for lang in LANGUAGES:
+            self._strings[lang] = {
+                name: _compile(value, lang, f"{COMMON_FILE}.strings.{name}")
+                for name, value in common.get("strings", {}).items()
+            }
+            self._hooks[lang] = [
+                _compile_dict(h, lang, f"{COMMON_FILE}.hooks[{i}]", hook_keys) for i, h in enumerate(common["hooks"])
+            ]
+
+        # Hook ids requests may name (AdRequest.hook, batch variants), in file order
+        self.hook_ids: List[str] = [h["id"] for h in common["hooks"]]
+        for tpl in self.templates.values():
+            missing = ({tpl.default_hook} | set(tpl.tone_hooks.values())) - set(self.hook_ids)
+            if missing:
+                raise ValueError(f"template '{tpl.id}' refers to unknown hook(s) {sorted(missing)}")
+
+    def __contains__(self, template_id: str) -> bool:
+        return template_id in self.templates
+
+    @property
+    def max_scenes(self) -> int:
+        return max(len(t.times) for t in self.templates.values())
+
+    def for_duration(self, duration: int) -> Template:
+        """The template whose duration range covers `duration`; else the nearest range."""
+        for tpl in self.templates.values():
+            if tpl.covers(duration):
+                return tpl
+        return min(
+            self.templates.values(),
+            key=lambda t: min(abs(duration - t.durations[0]), abs(duration - t.durations[1])),
+        )
+
+    def generate(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Script (hooks + timed scenes) for an AdRequest payload."""
+        benefits = meta.get("benefits") or []
+        offer = meta.get("offer")
+        duration = int(meta.get("duration_sec", 15))
+        tone = (meta.get("tone") or "Relatable, punchy").lower()
+        lang = language_key(meta.get("language"))
+
+        template_id = meta.get("template")
+        if template_id:
+            if template_id not in self.templates:
+                raise KeyError(f"Unknown script template '{template_id}'")
+            tpl = self.templates[template_id]
+        else:
+            tpl = self.for_duration(duration)
+
+        ctx: Dict[str, str] = {
+            "brand": meta.get("brand", "Brand"),
+            "product": meta.get("product", "Product"),
+            "cta": meta.get("cta", "Order Now"),
+            "offer": offer or "",
+            "offer_prefix": f"{offer} — " if offer else "",
+        }
+        for i, default in enumerate(DEFAULT_BENEFITS):
+            ctx[f"b{i + 1}"] = benefits[i] if len(benefits) > i else default
+        for name, compiled in self._strings[lang].items():
+            ctx[name] = compiled(ctx)
+
+        hooks = [h(ctx) for h in self._hooks[lang]]
+        by_id = {h["id"]: h for h in hooks}
+        # Explicit hook id (e.g. batch variants) wins over the template's pick
+        chosen = by_id.get(meta.get("hook") or "") or by_id[tpl.pick_hook(tone)]
+        ctx.update(
+            hook_line=chosen["line"],
+            hook_line_short=chosen["line_short"],
+            hook_visual_query=chosen["visual_query"],
+            hook_sfx=chosen["sfx"],
+        )
+
+        scenes = []
+        for (t0, t1), compiled in zip(tpl.timeline(duration), tpl.scenes[lang]):
+            scene = {"t_start": t0, "t_end": t1}
+            scene.update(compiled(ctx))
+            scene.setdefault("overlay", [])
+            scenes.append(scene)
+
+        return {
+            "duration": duration,
+            "template": tpl.id,
+            "hooks": hooks,
+            "chosen_hook": chosen["id"],
+            "scenes": scenes,
+        }
+
+
+_registry: Optional[TemplateRegistry] = None
+
+
+def get_registry() -> TemplateRegistry:
+    """Process-wide registry: built-in templates, then AD_TEMPLATE_DIRS overrides."""
+    global _registry
+    if _registry is None:
+        _registry = TemplateRegistry([TEMPLATE_DIR, *settings.TEMPLATE_DIRS])
+    return _registry
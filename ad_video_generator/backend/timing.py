@@ -0,0 +1,131 @@
+"""
+Scene-timing solver: fit the script's timeline to the real voiceover lengths.
+
+generate_ad_json() plans scene lengths before any audio exists. Once the
+voiceovers are synthesized and measured, plan_timing() picks scene lengths
+that add up to the requested duration, keep every line whole, and stay as
+close to the script's own pacing as possible. When the lines are too long
+it first swaps in the script's shorter line variants, then speeds all
+speech up uniformly (up to settings.MAX_SPEECH_TEMPO), and only as a last
+resort lets lines be cut.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ad_video_generator.backend import settings
+
+# Breath after each line before the cut
+VO_TAIL_SEC = 0.2
+MIN_SCENE_SEC = 1.0
+
+
+@dataclass
+class TimingPlan:
+    """Solved scene lengths plus what it took to get there."""
+    durations: List[float]
+    tempo: float = 1.0                                    # speech speed-up applied to every line
+    short_lines: List[int] = field(default_factory=list)  # scenes using their shorter line variant
+    overflow_sec: float = 0.0                             # speech cut because nothing else fit
+
+    @property
+    def fits(self) -> bool:
+        return self.tempo == 1.0 and not self.short_lines and not self.overflow_sec
+
+    def timeline(self) -> List[Tuple[float, float]]:
+        """(t_start, t_end) per scene."""
+        out, t = [], 0.0
+        for d in self.durations:
+            out.append((round(t, 4), round(t + d, 4)))
+            t += d
+        return out
+
+
+def _floors(speech: Sequence[float], tempo: float) -> List[float]:
+    return [max(MIN_SCENE_SEC, s / tempo + VO_TAIL_SEC) for s in speech]
+
+
+def fit_durations(nominal: Sequence[float], floors: Sequence[float], total: float) -> Optional[List[float]]:
+    """
+    Scene lengths summing to `total`, none below its floor, as close to the
+    nominal lengths as possible; None when the floors alone exceed `total`.
+
+    Spare time is spread in proportion to the nominal lengths. Missing time
+    is taken evenly from every scene that still has room (water-filling),
+    so no single scene gets squeezed to nothing.
+    """
+    if sum(floors) > total + 1e-6:
+        return None
+    base = [max(f, d) for f, d in zip(floors, nominal)]
+    excess = sum(base) - total
+    if excess <= 0:
+        weight = sum(nominal) or len(nominal)
+        return [b - excess * (d or 1.0) / weight for b, d in zip(base, nominal)]
+
+    lo, hi = 0.0, max(base)
+    for _ in range(60):
+        cut = (lo + hi) / 2
+        if sum(max(f, b - cut) for f, b in zip(floors, base)) > total:
+            lo = cut
+        else:
+            hi = cut
+    out = [max(f, b - hi) for f, b in zip(floors, base)]
+    # Hand the bisection residue to the scene with the most room
+    roomiest = max(range(len(out)), key=lambda i: out[i] - floors[i])
+    out[roomiest] += total - sum(out)
+    return out
+
+
+def plan_timing(
+    nominal: Sequence[float],
+    speech: Sequence[float],
+    total: float,
+    short: Optional[Dict[int, float]] = None,
+    max_tempo: Optional[float] = None,
+) -> TimingPlan:
+    """
+    Solve scene lengths for measured line lengths `speech` (seconds).
+
+    `short` maps scene index -> length of that scene's shorter line variant,
+    when one has been synthesized. Variants are swapped in biggest saving
+    first, and only as many as needed.
+    """
+    max_tempo = max_tempo or settings.MAX_SPEECH_TEMPO
+    speech = list(speech)
+
+    durations = fit_durations(nominal, _floors(speech, 1.0), total)
+    if durations is not None:
+        return TimingPlan(durations)
+
+    used: List[int] = []
+    for i, alt in sorted((short or {}).items(), key=lambda kv: speech[kv[0]] - kv[1], reverse=True):
+        if alt >= speech[i]:
+            continue
+        speech[i] = alt
+        used.append(i)
+        durations = fit_durations(nominal, _floors(speech, 1.0), total)
+        if durations is not None:
+            return TimingPlan(durations, short_lines=sorted(used))
+
+    # Smallest uniform speed-up that makes every line fit
+    lo, hi = 1.0, max_tempo
+    if fit_durations(nominal, _floors(speech, hi), total) is not None:
+        for _ in range(30):
+            mid = (lo + hi) / 2
+            if fit_durations(nominal, _floors(speech, mid), total) is None:
+                lo = mid
+            else:
+                hi = mid
+        tempo = min(max_tempo, math.ceil(hi * 100) / 100)  # round up: a faster tempo still fits
+        durations = fit_durations(nominal, _floors(speech, tempo), total)
+        if durations is not None:
+            return TimingPlan(durations, tempo=tempo, short_lines=sorted(used))
+
+    # Nothing fits: keep the proportions of the fastest floors and cut the lines' ends
+    floors = _floors(speech, max_tempo)
+    scale = total / sum(floors)
+    durations = [f * scale for f in floors]
+    overflow = sum(max(0.0, s / max_tempo - d) for s, d in zip(speech, durations))
+    return TimingPlan(durations, tempo=max_tempo, short_lines=sorted(used), overflow_sec=round(overflow, 3))
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict
+
+# synth(text, out_path, voice) -> writes an audio file at out_path
+SynthFn = Callable[[str, Path, str], Awaitable[None]]
+
+
+class TTSCache:
+    """
+    Content-addressed voiceover cache on disk.
+
+    Entries are keyed by sha256(engine_version, voice, text), so the same CTA or
+    hook line is synthesized once and then copied out for every later render.
+    The in-process index is an LRU ordered by last use; once the cache grows past
+    `max_bytes` the least recently used files are deleted. Concurrent requests
+    for the same line in one process share a single synthesis (single-flight).
+    """
+
+    def __init__(self, root: Path, synth: SynthFn, engine_version: str, max_bytes: int = 256 * 1024 * 1024):
+        self.root = Path(root)
+        self.synth = synth
+        self.engine_version = engine_version
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # key -> size in bytes
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loaded = False
+
+    # ---- index ----
+    def key(self, text: str, voice: str) -> str:
+        raw = "\0".join((self.engine_version, voice, text)).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.audio"
+
+    def _load(self) -> None:
+        """Rebuild the LRU index from disk (oldest mtime first)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for p in self.root.glob("*/*.audio"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, p.stem, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((k, size) for _, k, size in entries)
+        self._bytes = sum(self._index.values())
+        self._loaded = True
+
+    def _touch(self, key: str) -> bool:
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # mtime doubles as "last used" across restarts
+        except FileNotFoundError:
+            # Evicted by another worker process sharing the directory
+            self._bytes -= self._index.pop(key, 0)
+            return False
+        self._index.move_to_end(key)
+        return True
+
+    def _add(self, key: str, size: int) -> None:
+        self._bytes -= self._index.pop(key, 0)
+        self._index[key] = size
+        self._bytes += size
+        if self._bytes > self.max_bytes:
+            self._load()  # other processes may have added or evicted entries
+            self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = next(iter(self._index.items()))
+            if key == keep:
+                self._index.move_to_end(key)
+                continue
+            self._index.popitem(last=False)
+            self._bytes -= size
+            self.path_for(key).unlink(missing_ok=True)
+            self.evictions += 1
+
+    # ---- public API ----
+    async def get(self, text: str, voice: str) -> Path:
+        """Return the cached audio for (text, voice), synthesizing it on a miss."""
+        if not self._loaded:
+            self._load()
+
+        key = self.key(text, voice)
+        if key in self._index and self._touch(key):
+            self.hits += 1
+            return self.path_for(key)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            path = self.path_for(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{key}.{uuid.uuid4().hex[:6]}.tmp")
+            try:
+                await self.synth(text, tmp, voice)
+                os.replace(tmp, path)  # atomic: readers never see half-written audio
+            finally:
+                tmp.unlink(missing_ok=True)
+            self._add(key, path.stat().st_size)
+            fut.set_result(path)
+            return path
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def synthesize(self, text: str, out_path: Path, voice: str) -> None:
+        """Drop-in for voice.synthesize: copy the cached audio to out_path."""
+        src = await self.get(text, voice)
+        shutil.copyfile(src, out_path)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._index),
+            "bytes": self._bytes,
+        }
+
@@ -0,0 +1,56 @@
+"""
+Stand-in TTS server for offline load tests and local development.
+
+    uvicorn ad_video_generator.backend.tts_server:app --port 8099
+    AD_TTS_BACKEND=http AD_TTS_URL=http://127.0.0.1:8099 uvicorn ad_video_generator.backend.main:app
+
+Speaks the protocol voice.HTTPProvider expects and answers with the offline
+engine's WAV, after AD_TTS_SERVER_LATENCY_MS per request when set.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.voice import DEFAULT_VOICE, offline_wav
+
+
+class Line(BaseModel):
+    text: str
+    voice: str = DEFAULT_VOICE
+
+
+class Batch(BaseModel):
+    lines: List[Line] = Field(default_factory=list, max_length=64)
+
+
+app = FastAPI(title="Offline TTS stand-in")
+
+
+async def _latency() -> None:
+    if settings.TTS_SERVER_LATENCY_MS:
+        await asyncio.sleep(settings.TTS_SERVER_LATENCY_MS / 1000)
+
+
+@app.get("/health")
+def health():
+    return {"ok": True, "engine": "offline"}
+
+
+@app.post("/synthesize")
+async def synthesize(line: Line):
+    await _latency()
+    return Response(offline_wav(line.text, line.voice), media_type="audio/wav")
+
+
+@app.post("/synthesize/batch")
+async def synthesize_batch(batch: Batch):
+    """Several lines in one round trip; audio comes back base64-encoded in request order."""
+    await _latency()
+    return {"audio": [base64.b64encode(offline_wav(x.text, x.voice)).decode("ascii") for x in batch.lines]}
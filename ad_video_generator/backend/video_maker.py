@@ -1,143 +1,39 @@
 from __future__ import annotations
 
+import asyncio
+import shutil
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
 
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
+from moviepy.editor import ImageClip, concatenate_videoclips
+from proglog import ProgressBarLogger
 
 # ✅ IMPORTANT: absolute imports (fixes "No module named backend" on cloud)
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.audio import AUDIO_RATE, change_tempo, decode_pcm, mix_soundtrack, write_audio
+from ad_video_generator.backend.encoder import (
+    FASTSTART_ARGS, FRAGMENTED_ARGS, LOW_MEMORY_X264_ARGS, FFmpegWriter, encoder_threads, job_cores, remux_faststart,
+)
+from ad_video_generator.backend.metrics import count, observe, span
+from ad_video_generator.backend.frames import FINAL, build_frame, scene_badge
+from ad_video_generator.backend.motion import MotionPlan
+from ad_video_generator.backend.profiles import RenderProfile, get_profile
 from ad_video_generator.backend.script_engine import generate_ad_json
-from ad_video_generator.backend.voice import synthesize
+from ad_video_generator.backend.timing import TimingPlan, plan_timing
+from ad_video_generator.backend.segments import concat_segments, get_segment_cache, scene_frames, segment_key
+from ad_video_generator.backend.voice import DEFAULT_VOICE, session as tts_session, synthesize, voice_for
+from ad_video_generator.backend.scratch import LIVE_NAME, job_scratch
 
-W, H = 1080, 1920
-
-
-# -----------------------------
-# Helpers: background + fonts
-# -----------------------------
-def make_gradient_bg() -> Image.Image:
-    top = np.array([20, 20, 60], dtype=np.float32)
-    bottom = np.array([70, 40, 150], dtype=np.float32)
-
-    img = np.zeros((H, W, 3), dtype=np.uint8)
-    for y in range(H):
-        t = y / (H - 1)
-        color = top * (1 - t) + bottom * t
-        img[y, :, :] = color.astype(np.uint8)
-    return Image.fromarray(img)
-
-
-def load_font(size: int) -> ImageFont.FreeTypeFont:
-    # Windows fonts (local dev)
-    candidates = [
-        r"C:\Windows\Fonts\arialbd.ttf",
-        r"C:\Windows\Fonts\arial.ttf",
-        r"C:\Windows\Fonts\calibri.ttf",
-        r"C:\Windows\Fonts\segoeui.ttf",
-    ]
-    for fp in candidates:
-        if Path(fp).exists():
-            try:
-                return ImageFont.truetype(fp, size=size)
-            except Exception:
-                pass
-    return ImageFont.load_default()
-
-
-def wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont, max_width: int) -> List[str]:
-    words = text.split()
-    lines: List[str] = []
-    cur: List[str] = []
-
-    for w in words:
-        test = " ".join(cur + [w])
-        bbox = draw.textbbox((0, 0), test, font=font)
-        width = bbox[2] - bbox[0]
-        if width <= max_width:
-            cur.append(w)
-        else:
-            if cur:
-                lines.append(" ".join(cur))
-            cur = [w]
-
-    if cur:
-        lines.append(" ".join(cur))
-    return lines
-
-
-def draw_centered_text_block(
-    img: Image.Image,
-    lines: List[str],
-    y_center: int,
-    font: ImageFont.ImageFont,
-    fill=(255, 255, 255),
-    shadow=True,
-    line_gap=18,
-) -> None:
-    draw = ImageDraw.Draw(img)
-
-    sizes = []
-    for line in lines:
-        bbox = draw.textbbox((0, 0), line, font=font)
-        w = bbox[2] - bbox[0]
-        h = bbox[3] - bbox[1]
-        sizes.append((w, h))
-
-    total_h = sum(h for _, h in sizes) + line_gap * (len(lines) - 1)
-    y = y_center - total_h // 2
-
-    for (line, (w, h)) in zip(lines, sizes):
-        x = (W - w) // 2
-        if shadow:
-            draw.text((x + 3, y + 3), line, font=font, fill=(0, 0, 0))
-        draw.text((x, y), line, font=font, fill=fill)
-        y += h + line_gap
-
-
-def build_frame(
-    on_screen_lines: List[str],
-    footer: str = "Swipe up / Learn more",
-    badge: Optional[str] = None,
-) -> np.ndarray:
-    bg = make_gradient_bg()
-    draw = ImageDraw.Draw(bg)
-
-    main_text = " ".join([t.strip() for t in on_screen_lines if t and t.strip()]) or " "
-    font_main = load_font(74)
-    max_width = W - 140
-
-    wrapped = wrap_text(draw, main_text, font_main, max_width=max_width)[:4]
-    draw_centered_text_block(bg, wrapped, y_center=H // 2, font=font_main)
-
-    # CTA footer
-    font_footer = load_font(44)
-    footer_lines = wrap_text(draw, footer, font_footer, max_width=max_width)[:2]
-    footer_y = H - 220
-    for i, line in enumerate(footer_lines):
-        bbox = draw.textbbox((0, 0), line, font=font_footer)
-        fw = bbox[2] - bbox[0]
-        x = (W - fw) // 2
-        y = footer_y + i * 54
-        draw.text((x + 2, y + 2), line, font=font_footer, fill=(0, 0, 0))
-        draw.text((x, y), line, font=font_footer, fill=(255, 255, 255))
-
-    # Badge
-    if badge:
-        font_badge = load_font(48)
-        text = badge.strip()
-        pad_x, pad_y = 30, 18
-        bbox = draw.textbbox((0, 0), text, font=font_badge)
-        bw = (bbox[2] - bbox[0]) + pad_x * 2
-        bh = (bbox[3] - bbox[1]) + pad_y * 2
-
-        x0, y0 = 60, 90
-        draw.rounded_rectangle([x0, y0, x0 + bw, y0 + bh], radius=24, fill=(255, 255, 255))
-        draw.text((x0 + pad_x, y0 + pad_y), text, font=font_badge, fill=(0, 0, 0))
-
-    return np.array(bg)
+# progress(stage, fraction) — fraction is overall job progress in [0, 1]
+ProgressFn = Callable[[str, float], None]
 
 
 # -----------------------------
@@ -152,141 +48,570 @@ def _lanczos():
 
 def zoom_frame(frame: np.ndarray, scale: float) -> np.ndarray:
     """
-    Zoom frame safely with Pillow and center-crop back to W x H.
+    Zoom frame safely with Pillow and center-crop back to its own size.
     """
     if scale <= 1.0:
         return frame
 
     img = Image.fromarray(frame)
-    new_w = max(int(W * scale), W)
-    new_h = max(int(H * scale), H)
+    w, h = img.size
+    new_w = max(int(w * scale), w)
+    new_h = max(int(h * scale), h)
 
     img2 = img.resize((new_w, new_h), resample=_lanczos())
 
-    left = (new_w - W) // 2
-    top = (new_h - H) // 2
-    img2 = img2.crop((left, top, left + W, top + H))
+    left = (new_w - w) // 2
+    top = (new_h - h) // 2
+    img2 = img2.crop((left, top, left + w, top + h))
     return np.array(img2)
 
 
 # -----------------------------
 # Motion + text timing
 # -----------------------------
-def apply_scene_motion(clip: ImageClip, mode: str, dur: float) -> ImageClip:
-    mode = (mode or "").lower()
-    dur = max(float(dur), 0.001)
-
-    def transform(frame: np.ndarray, t: float) -> np.ndarray:
-        # default gentle zoom
-        z = 1.0 + 0.04 * (t / dur)
+def _motion_plan(frame: np.ndarray, motion: str, anim: str, dur: float, profile: RenderProfile) -> MotionPlan:
+    return MotionPlan(frame, motion, anim, dur, supersample=profile.supersample, px=profile.scale)
 
-        if "zoom" in mode:
-            z = 1.0 + 0.06 * (t / dur)
-        elif "shake" in mode:
-            z = 1.0 + 0.03 * (t / dur)
 
-        out = zoom_frame(frame, z)
-
-        if "shake" in mode and t < 0.6:
-            dx = int(4 * np.sin(45 * t))
-            dy = int(4 * np.cos(38 * t))
-            out = np.roll(out, shift=(dy, dx), axis=(0, 1))
+def apply_scene_motion(clip: ImageClip, mode: str, dur: float, anim: str = "", profile: RenderProfile = FINAL) -> ImageClip:
+    """
+    Camera motion plus text animation, rendered as one warp per frame (see MotionPlan).
+    Text animations live in the warp rather than set_position, which
+    concatenate_videoclips(method="compose") would override.
+    """
+    plan = _motion_plan(clip.img, mode, anim, dur, profile)
 
-        return out
+    def effect(gf, t):
+        t0 = time.perf_counter()
+        frame = plan.render(t)
+        observe("frame_effect", time.perf_counter() - t0)
+        return frame
 
-    # ✅ MoviePy-safe: per-frame effect
-    return clip.fl_image(lambda frame: transform(frame, clip.t))
+    # ✅ MoviePy-safe: per-frame effect evaluated at the frame's own time
+    return clip.fl(effect)
 
 
-def apply_text_animation_timing(clip: ImageClip, anim: str) -> ImageClip:
-    anim = (anim or "").lower()
+# -----------------------------
+# Scene builder (async TTS + threaded frames)
+# -----------------------------
+@dataclass
+class SceneInputs:
+    """
+    Everything an encoder needs for one scene: still frame, voiceover PCM and timing.
 
-    if anim in ("pop_in", "cta_bounce"):
-        def transform(frame: np.ndarray, t: float) -> np.ndarray:
-            s = 0.92 + 0.08 * min(t / 0.25, 1.0)
-            return zoom_frame(frame, s)
+    `duration` is the scene's length in the script; the voiceover is padded or
+    trimmed to it when the soundtrack is mixed (audio.mix_soundtrack). In
+    low-memory mode `frame` stays None and is drawn only when the encoder
+    reaches the scene (scene_frame).
+    """
+    idx: int
+    frame: Optional[np.ndarray]
+    pcm: np.ndarray
+    duration: float
+    motion: str
+    anim: str
+    profile: RenderProfile = FINAL
+    on_screen: List[str] = field(default_factory=list)
+    badge: Optional[str] = None
+    sfx: Optional[str] = None
+
+
+def _render_frame(on_screen: List[str], badge: Optional[str], profile: RenderProfile = FINAL) -> Tuple[np.ndarray, float]:
+    """Blocking PIL work for one scene (runs in a worker thread). Returns (frame, seconds spent)."""
+    t0 = time.perf_counter()
+    with span("build_frame"):
+        frame = build_frame(on_screen, footer="Swipe up / Learn more", badge=badge, profile=profile)
+    return frame, time.perf_counter() - t0
+
+
+def scene_frame(inputs: SceneInputs) -> np.ndarray:
+    """The scene's still frame, drawn now if it was not prepared up front."""
+    if inputs.frame is not None:
+        return inputs.frame
+    return _render_frame(inputs.on_screen, inputs.badge, inputs.profile)[0]
+
+
+def _decode_voiceover(vo_path: Path) -> np.ndarray:
+    with span("audio_decode"):
+        return decode_pcm(vo_path)
+
+
+def scene_clip(inputs: SceneInputs) -> ImageClip:
+    """Silent MoviePy clip for a prepared scene (the moviepy engine muxes the soundtrack)."""
+    # ✅ In-memory frame: no PNG save + decode round trip
+    clip = ImageClip(scene_frame(inputs)).set_duration(inputs.duration)
+    return apply_scene_motion(clip, inputs.motion, clip.duration, inputs.anim, inputs.profile)
+
+
+async def voiceover(
+    text: str,
+    vo_path: Path,
+    tts_limit: Optional[asyncio.Semaphore] = None,
+    pool: Optional[Executor] = None,
+    voice: str = DEFAULT_VOICE,
+    idx: int = 0,
+) -> Tuple[np.ndarray, float]:
+    """Synthesize (or fetch from the TTS cache) and decode one line. Returns (pcm, TTS seconds)."""
+    async with tts_limit or nullcontext():
+        t0 = time.perf_counter()
+        with span("tts", scene=idx):
+            await synthesize((text or "").strip() or " ", vo_path, voice)
+        tts_sec = time.perf_counter() - t0
+    # ✅ Decoded once here; every engine mixes from this PCM
+    pcm = await asyncio.get_running_loop().run_in_executor(pool, _decode_voiceover, vo_path)
+    return pcm, tts_sec
+
+
+async def prepare_scene(
+    scene: Dict[str, Any],
+    idx: int,
+    tmp_dir: Path,
+    tts_limit: Optional[asyncio.Semaphore] = None,
+    pool: Optional[Executor] = None,
+    timings: Optional[Dict[str, float]] = None,
+    profile: RenderProfile = FINAL,
+    low_memory: bool = False,
+    voice: str = DEFAULT_VOICE,
+    pcm: Optional[np.ndarray] = None,
+) -> SceneInputs:
+    """
+    TTS and frame rendering for one scene run at the same time; the scene is
+    assembled as soon as both inputs exist. `timings` receives per-stage seconds.
+    Pass `pcm` when the voiceover was already made (make_ad_video does, so the
+    timing solver can run first). With `low_memory`, no frame is drawn here.
+    """
+    dur = float(scene.get("t_end", 0) - scene.get("t_start", 0))
+    if dur <= 0:
+        dur = 1.0
 
-        return clip.fl_image(lambda frame: transform(frame, clip.t))
+    on_screen = scene.get("on_screen_text", []) or []
+    badge = scene_badge(scene)
+    anim = scene.get("text_animation") or scene.get("animation") or "pop_in"
+    motion = scene.get("camera") or "zoom"
 
-    if anim in ("slide_up",):
-        return clip.set_position(lambda t: (0, int(40 * (1 - min(t / 0.35, 1.0)))))
+    loop = asyncio.get_running_loop()
+    if low_memory:
+        frame_task = asyncio.sleep(0, (None, 0.0))
+    else:
+        frame_task = loop.run_in_executor(pool, _render_frame, on_screen, badge, profile)
+
+    t0 = time.perf_counter()
+    if pcm is None:
+        vo_path = tmp_dir / f"vo_{idx:02d}.mp3"
+        (pcm, tts_sec), (frame, frame_sec) = await asyncio.gather(
+            voiceover(scene.get("vo"), vo_path, tts_limit, pool, voice, idx), frame_task,
+        )
+        if timings is not None:
+            timings["tts"] = tts_sec
+    else:
+        frame, frame_sec = await frame_task
 
-    if anim in ("swipe_cut", "split_wipe"):
-        return clip.set_position(lambda t: (int(6 * np.sin(35 * t)) if t < 0.25 else 0, 0))
+    if timings is not None:
+        timings.update(frame=frame_sec, assemble=time.perf_counter() - t0)
+    return SceneInputs(
+        idx=idx, frame=frame, pcm=pcm, duration=dur, motion=motion, anim=anim,
+        profile=profile, on_screen=on_screen, badge=badge, sfx=scene.get("sfx"),
+    )
 
-    if anim in ("type_on", "glitch"):
-        return clip.set_position(lambda t: (int(3 * np.sin(50 * t)) if t < 0.6 else 0, 0))
 
-    return clip
+async def make_scene(scene: Dict[str, Any], idx: int, tmp_dir: Path, profile: RenderProfile = FINAL) -> ImageClip:
+    return scene_clip(await prepare_scene(scene, idx, tmp_dir, profile=profile))
 
 
 # -----------------------------
-# Scene builder (async TTS)
+# Timing stage
 # -----------------------------
-async def make_scene(scene: Dict[str, Any], idx: int, tmp_dir: Path) -> ImageClip:
-    dur = float(scene.get("t_end", 0) - scene.get("t_start", 0))
-    if dur <= 0:
-        dur = 1.0
+async def fit_timing(
+    ad: Dict[str, Any],
+    pcms: List[np.ndarray],
+    tmp_dir: Path,
+    tts_limit: Optional[asyncio.Semaphore] = None,
+    pool: Optional[Executor] = None,
+    voice: str = DEFAULT_VOICE,
+) -> TimingPlan:
+    """
+    Fit the script's timeline to the measured voiceovers (see timing.py).
+    Rewrites each scene's t_start/t_end in place, swaps in shorter lines
+    (scene["vo"] and pcms[i]) and applies the speech tempo the plan needs.
+    """
+    scenes = ad["scenes"]
+    total = float(ad.get("duration") or sum(s["t_end"] - s["t_start"] for s in scenes))
+    nominal = [max(0.0, float(s.get("t_end", 0) - s.get("t_start", 0))) for s in scenes]
+    speech = [len(p) / AUDIO_RATE for p in pcms]
+
+    plan = plan_timing(nominal, speech, total)
+    shorter = [i for i, s in enumerate(scenes) if s.get("vo_short")]
+    if not plan.fits and shorter:
+        alts = await asyncio.gather(*(
+            voiceover(scenes[i]["vo_short"], tmp_dir / f"vo_{i:02d}_short.mp3", tts_limit, pool, voice, i)
+            for i in shorter
+        ))
+        alt_pcm = {i: pcm for i, (pcm, _) in zip(shorter, alts)}
+        plan = plan_timing(nominal, speech, total, short={i: len(p) / AUDIO_RATE for i, p in alt_pcm.items()})
+        for i in plan.short_lines:
+            scenes[i]["vo"] = scenes[i]["vo_short"]
+            pcms[i] = alt_pcm[i]
+
+    if plan.tempo != 1.0:
+        loop = asyncio.get_running_loop()
+        pcms[:] = await asyncio.gather(*(loop.run_in_executor(pool, change_tempo, p, plan.tempo) for p in pcms))
+
+    for scene, (t0, t1) in zip(scenes, plan.timeline()):
+        scene["t_start"], scene["t_end"] = t0, t1
+    count("timing_short_lines", len(plan.short_lines))
+    return plan
 
-    badge: Optional[str] = None
-    on_screen = scene.get("on_screen_text", []) or []
 
-    if scene.get("overlay"):
-        for item in scene["overlay"]:
-            if isinstance(item, str) and item.upper() in ("SALE", "NEW", "LIMITED TIME", "LIMITED"):
-                badge = item.upper()
-                break
+# -----------------------------
+# Render engines
+# -----------------------------
+def _frame_grid(scenes: List[SceneInputs], fps: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Same sampling as MoviePy: frame k shows global time k / fps.
+    Returns (frame times, owning scene per frame, scene start times).
+    """
+    ends = np.cumsum([s.duration for s in scenes])
+    starts = ends - [s.duration for s in scenes]
+    grid = np.arange(0, float(ends[-1]), 1.0 / fps)
+    owner = np.minimum(np.searchsorted(ends, grid, side="right"), len(scenes) - 1)
+    return grid, owner, starts
+
+
+def _write_soundtrack(scenes: List[SceneInputs], frames: Iterable[int], fps: int, out_path: Path) -> Path:
+    """Mix voiceovers and sfx cues onto the frame timeline and write the one soundtrack the encoder muxes."""
+    with span("soundtrack"):
+        pcm = mix_soundtrack([s.pcm for s in scenes], list(frames), fps, [s.sfx for s in scenes])
+        write_audio(pcm, out_path)
+    return out_path
+
+
+def _encode_moviepy(
+    scenes: List[SceneInputs],
+    out_path: Path,
+    tmp_dir: Path,
+    report: ProgressFn,
+    quiet: bool,
+    profile: RenderProfile = FINAL,
+) -> None:
+    _, owner, _ = _frame_grid(scenes, profile.fps)
+    # AAC up front: MoviePy copies a ready audio file in instead of mixing clips itself
+    soundtrack = _write_soundtrack(scenes, np.bincount(owner, minlength=len(scenes)), profile.fps, tmp_dir / "soundtrack.m4a")
 
-    anim = scene.get("text_animation") or scene.get("animation") or "pop_in"
-    motion = scene.get("camera") or "zoom"
+    clips = [scene_clip(s) for s in scenes]
+    final = concatenate_videoclips(clips, method="compose")
+    try:
+        with span("write_videofile"):
+            final.write_videofile(
+                str(out_path),
+                fps=profile.fps,
+                codec="libx264",
+                preset=profile.preset,
+                audio=str(soundtrack),
+                threads=encoder_threads(),
+                ffmpeg_params=list(FASTSTART_ARGS) + profile.encoder_args(),
+                logger=_EncodeProgress(report, 0.3) if quiet else "bar",
+            )
+        count("frames_encoded", int(final.duration * profile.fps))
+    finally:
+        final.close()
+
+
+def _x264_args(profile: RenderProfile) -> List[str]:
+    extra = list(LOW_MEMORY_X264_ARGS) if settings.LOW_MEMORY else []
+    return profile.encoder_args() + extra
+
+
+def _pipe_frames(frames: Iterable[np.ndarray], writer: FFmpegWriter) -> Iterator[np.ndarray]:
+    """Write frames into ffmpeg, timing the motion effect and the pipe write of each one."""
+    it = iter(frames)
+    while True:
+        t0 = time.perf_counter()
+        frame = next(it, None)
+        if frame is None:
+            return
+        t1 = time.perf_counter()
+        writer.write(frame)
+        observe("frame_effect", t1 - t0)
+        observe("frame_write", time.perf_counter() - t1)
+        yield frame
+
+
+def _encode_ffmpeg(
+    scenes: List[SceneInputs],
+    out_path: Path,
+    tmp_dir: Path,
+    report: ProgressFn,
+    profile: RenderProfile = FINAL,
+) -> Dict[str, float]:
+    """
+    Generate every frame here and pipe raw RGB straight into ffmpeg, skipping
+    MoviePy's compositing and per-frame callbacks, and mux the pre-mixed
+    soundtrack. Only one scene's frame and motion plan are alive at a time.
+    Returns how many frames were resampled vs reused from the motion cache.
 
-    frame = build_frame(on_screen, footer="Swipe up / Learn more", badge=badge)
-    img_path = tmp_dir / f"frame_{idx:02d}.png"
-    Image.fromarray(frame).save(img_path)
+    With LIVE_STREAM on, frames go into a fragmented MP4 in scratch that
+    /jobs/{id}/live can tail, and the finished file is remuxed to faststart.
+    """
+    fps = profile.fps
+    grid, owner, starts = _frame_grid(scenes, fps)
+    total, written = len(grid), 0
+    soundtrack = _write_soundtrack(scenes, np.bincount(owner, minlength=len(scenes)), fps, tmp_dir / "soundtrack.wav")
+    stats = {"frames_rendered": 0, "frames_reused": 0}
+
+    target, args = (tmp_dir / LIVE_NAME, FRAGMENTED_ARGS) if settings.LIVE_STREAM else (out_path, FASTSTART_ARGS)
+    writer = FFmpegWriter(
+        target, profile.width, profile.height, fps, audio_path=soundtrack, preset=profile.preset,
+        threads=encoder_threads(), extra_args=[*args, *_x264_args(profile)],
+    )
+    with writer, span("frames", frames=total):
+        for i, s in enumerate(scenes):
+            local = grid[owner == i] - starts[i]
+            plan = _motion_plan(scene_frame(s), s.motion, s.anim, s.duration, profile)
+            for _ in _pipe_frames(plan.render_many(local), writer):
+                written += 1
+                if written % fps == 0:
+                    report("encoding", 0.3 + 0.7 * written / total)
+            stats["frames_rendered"] += plan.rendered
+            stats["frames_reused"] += plan.reused
+            plan = None  # drop the supersampled source before the next scene builds its own
+
+    if target != out_path:
+        with span("remux"):
+            remux_faststart(target, out_path)
+    count("frames_encoded", written)
+    return stats
+
+
+class _SegmentAborted(Exception):
+    """A segment encoder stopped because a sibling failed or the job was cancelled."""
+
+
+def segment_parallel(segments: int) -> int:
+    """
+    Scenes the segments engine encodes at once: AD_SEGMENT_PARALLEL, or one per
+    two cores of the job's share (the other core warps frames for it). Low-memory
+    renders keep one supersampled scene source alive at a time.
+    """
+    if settings.LOW_MEMORY:
+        return 1
+    wanted = settings.SEGMENT_PARALLEL or max(1, job_cores() // 2)
+    return max(1, min(wanted, segments))
+
+
+def _encode_segments(
+    scenes: List[SceneInputs],
+    out_path: Path,
+    tmp_dir: Path,
+    report: ProgressFn,
+    profile: RenderProfile = FINAL,
+) -> Dict[str, float]:
+    """
+    Encode each scene into its own video-only segment, reusing segments other
+    jobs already encoded (see segments.py), then stream-copy them together and
+    mux the soundtrack. Variants that only change the hook re-encode one scene.
 
-    vo_text = (scene.get("vo") or "").strip() or " "
-    vo_path = tmp_dir / f"vo_{idx:02d}.mp3"
-    await synthesize(vo_text, vo_path)
+    Scenes are cut at their boundaries and encoded side by side: each one has
+    its own ffmpeg process with identical encoder settings (so the stream copy
+    joins them losslessly), fed by a thread whose Pillow warps release the GIL.
+    """
+    fps = profile.fps
+    cache = get_segment_cache()
+    frames = [scene_frames(s.duration, fps) for s in scenes]
+    total, written = sum(frames), 0
+    stats = {"segments_cached": 0, "segments_encoded": 0, "frames_rendered": 0, "frames_reused": 0}
+    parallel = segment_parallel(len(scenes))
+    threads = encoder_threads(parallel)
+    lock = threading.Lock()
+    failed = threading.Event()
+
+    def advance(n: int) -> None:
+        nonlocal written
+        with lock:
+            before, written = written, written + n
+            # Progress (and with it the cancel check) once per second of video, from whichever thread
+            if written // fps != before // fps or written == total:
+                report("encoding", 0.3 + 0.7 * written / total)
+
+    def encode(s: SceneInputs, n: int) -> Path:
+        try:
+            return _encode_one(s, n)
+        except BaseException:
+            failed.set()  # stop the sibling encoders early
+            raise
+
+    def _encode_one(s: SceneInputs, n: int) -> Path:
+        if failed.is_set():
+            raise _SegmentAborted()
+        frame = scene_frame(s)
+        key = segment_key(frame, s.motion, s.anim, s.duration, n, fps, profile.supersample, profile.preset, profile.crf)
+        path = cache.get(key)
+        if path is not None:
+            with lock:
+                stats["segments_cached"] += 1
+            advance(n)
+            return path
+
+        tmp = cache.tmp_path(key)
+        plan = _motion_plan(frame, s.motion, s.anim, s.duration, profile)
+        writer = FFmpegWriter(
+            tmp, profile.width, profile.height, fps, preset=profile.preset,
+            threads=threads, extra_args=_x264_args(profile),
+        )
+        try:
+            with writer, span("segment", scene=s.idx, frames=n):
+                for _ in _pipe_frames(plan.render_many(np.arange(n) / fps), writer):
+                    if failed.is_set():
+                        raise _SegmentAborted()
+                    advance(1)
+            path = cache.put(key, tmp, evict=False)
+        finally:
+            tmp.unlink(missing_ok=True)
+        count("frames_encoded", n)
+        with lock:
+            stats["segments_encoded"] += 1
+            stats["frames_rendered"] += plan.rendered
+            stats["frames_reused"] += plan.reused
+        return path
+
+    with ThreadPoolExecutor(parallel, thread_name_prefix="segment") as seg_pool:
+        futures = [seg_pool.submit(encode, s, n) for s, n in zip(scenes, frames)]
+    # Every encoder has stopped here; surface the error that stopped the others (e.g. JobCancelled)
+    errors = [e for e in (f.exception() for f in futures) if e is not None]
+    if errors:
+        raise next((e for e in errors if not isinstance(e, _SegmentAborted)), errors[0])
+    paths = [f.result() for f in futures]
+
+    soundtrack = _write_soundtrack(scenes, frames, fps, tmp_dir / "soundtrack.wav")
+    with span("concat"):
+        concat_segments(paths, soundtrack, out_path, tmp_dir / "segments.txt")
+    cache.evict(keep=paths)
+    count("segment_cache_hits", stats["segments_cached"])
+    count("segment_cache_misses", stats["segments_encoded"])
+    stats.update(segment_parallel=parallel, encode_threads=threads)
+    return stats
 
-    audio = AudioFileClip(str(vo_path))
 
-    # Duration matching
-    if audio.duration and audio.duration > dur:
-        audio = audio.subclip(0, dur)
-        clip = ImageClip(str(img_path)).set_duration(dur)
-    else:
-        safe_dur = float(audio.duration) if audio.duration else dur
-        clip = ImageClip(str(img_path)).set_duration(safe_dur)
+# -----------------------------
+# Encode progress (MoviePy -> job progress)
+# -----------------------------
+class _EncodeProgress(ProgressBarLogger):
+    """
+    Forwards MoviePy's frame counter to a job progress callback.
+    Encoding covers the [start, 1.0] slice of overall progress.
+    """
 
-    clip = apply_scene_motion(clip, motion, clip.duration)
-    clip = apply_text_animation_timing(clip, anim)
+    def __init__(self, progress: ProgressFn, start: float):
+        super().__init__()
+        self._progress = progress
+        self._start = start
 
-    return clip.set_audio(audio)
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if bar != "t" or attr != "index":
+            return
+        total = self.bars[bar].get("total") or 0
+        if total:
+            frac = min(value / total, 1.0)
+            self._progress("encoding", self._start + (1.0 - self._start) * frac)
 
 
 # -----------------------------
 # Main entry: make_ad_video
 # -----------------------------
-async def make_ad_video(meta: Dict[str, Any], out_path: Path) -> None:
+async def make_ad_video(
+    meta: Dict[str, Any],
+    out_path: Path,
+    progress: Optional[ProgressFn] = None,
+) -> Dict[str, float]:
+    """
+    Render the ad for `meta` into out_path and return per-stage timings in seconds.
+    Size, frame rate and encoder settings follow meta["profile"] (see profiles.py).
+    """
+    report: ProgressFn = progress or (lambda stage, fraction: None)
+    profile = get_profile(meta.get("profile"))
+    # MoviePy composes every scene clip up front, so only the piped engines can defer frames
+    low_memory = settings.LOW_MEMORY and settings.RENDER_ENGINE in ("ffmpeg", "segments")
+    voice = voice_for(meta.get("language"))
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_dir = out_path.parent / "tmp"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
 
-    ad = generate_ad_json(meta)
+    report("script", 0.0)
+    with span("script"):
+        ad = generate_ad_json(meta)
+    timings["script"] = time.perf_counter() - started
     scenes = ad.get("scenes", [])
     if not scenes:
         raise ValueError("No scenes generated. Check script_engine.py")
 
-    clips: List[ImageClip] = []
-    for i, scene in enumerate(scenes):
-        clips.append(await make_scene(scene, i, tmp_dir))
-
-    final = concatenate_videoclips(clips, method="compose")
-
-    final.write_videofile(
-        str(out_path),
-        fps=30,
-        codec="libx264",
-        audio_codec="aac",
-        threads=2,
-    )
+    # ✅ Each job gets its own scratch dir (voiceovers, soundtrack, live file)
+    with job_scratch(out_path.stem) as tmp_dir, ThreadPoolExecutor(settings.FRAME_THREADS) as pool:
+        # Voiceovers + timing take the first 15% of a job, frames the next 15%, encoding the rest
+        tts_limit = asyncio.Semaphore(settings.TTS_CONCURRENCY)
+        scene_timings: List[Dict[str, float]] = [{} for _ in scenes]
+        done = 0
+
+        async def vo_job(i: int, scene: Dict[str, Any]) -> np.ndarray:
+            nonlocal done
+            pcm, scene_timings[i]["tts"] = await voiceover(
+                scene.get("vo"), tmp_dir / f"vo_{i:02d}.mp3", tts_limit, pool, voice, i,
+            )
+            done += 1
+            report("voiceover", 0.15 * done / len(scenes))
+            return pcm
+
+        # ✅ Lines are measured and the timeline solved before any frame is drawn
+        report("voiceover", 0.0)
+        t0 = time.perf_counter()
+        async with tts_session():
+            pcms = list(await asyncio.gather(*(vo_job(i, scene) for i, scene in enumerate(scenes))))
+            with span("timing"):
+                plan = await fit_timing(ad, pcms, tmp_dir, tts_limit, pool, voice)
+        timings["voiceover"] = time.perf_counter() - t0
+        timings.update(speech_tempo=plan.tempo, short_lines=len(plan.short_lines), vo_overflow=plan.overflow_sec)
+
+        done = 0
+
+        async def scene_job(i: int, scene: Dict[str, Any]) -> SceneInputs:
+            nonlocal done
+            inputs = await prepare_scene(
+                scene, i, tmp_dir, tts_limit, pool, scene_timings[i], profile, low_memory, voice, pcms[i],
+            )
+            done += 1
+            report("scenes", 0.15 + 0.15 * done / len(scenes))
+            return inputs
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(
+            *(scene_job(i, scene) for i, scene in enumerate(scenes)),
+            return_exceptions=True,
+        )
+        timings["scenes"] = time.perf_counter() - t0
+
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+        prepared: List[SceneInputs] = list(results)
+
+        for key in ("tts", "frame", "assemble"):
+            timings[f"{key}_max"] = max(t.get(key, 0.0) for t in scene_timings)
+            timings[f"{key}_total"] = sum(t.get(key, 0.0) for t in scene_timings)
+
+        # Encode inside scratch, then move into place so /download never sees a partial file
+        tmp_out = tmp_dir / out_path.name
+        report("encoding", 0.3)
+        t0 = time.perf_counter()
+        with span("encode", engine=settings.RENDER_ENGINE, profile=profile.name):
+            if settings.RENDER_ENGINE == "segments":
+                timings.update(_encode_segments(prepared, tmp_out, tmp_dir, report, profile))
+            elif settings.RENDER_ENGINE == "ffmpeg":
+                timings.update(_encode_ffmpeg(prepared, tmp_out, tmp_dir, report, profile))
+            else:
+                _encode_moviepy(prepared, tmp_out, tmp_dir, report, quiet=progress is not None, profile=profile)
+        timings["encode"] = time.perf_counter() - t0
+
+        shutil.move(str(tmp_out), str(out_path))
+
+    timings["total"] = time.perf_counter() - started
+    report("done", 1.0)
+    return {k: round(v, 4) for k, v in timings.items()}
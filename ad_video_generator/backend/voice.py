@@ -1,9 +1,320 @@
+from __future__ import annotations
+
+import array
+import asyncio
+import base64
+import hashlib
+import io
+import math
+import os
+import wave
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from pathlib import Path
-import edge_tts
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Type
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.metrics import count
+from ad_video_generator.backend.tts_cache import TTSCache
+
+DEFAULT_VOICE = "hi-IN-MadhurNeural"
+
+# AdRequest.language -> edge-tts voice (AD_TTS_VOICES overrides)
+VOICES: Dict[str, str] = {
+    "hinglish": "hi-IN-MadhurNeural",
+    "hindi": "hi-IN-MadhurNeural",
+    "english": "en-IN-PrabhatNeural",
+}
+
+
+def voice_for(language: Optional[str]) -> str:
+    """Voice for an AdRequest language; unknown languages get DEFAULT_VOICE."""
+    key = (language or "Hinglish").strip().lower()
+    return settings.TTS_VOICES.get(key) or VOICES.get(key, DEFAULT_VOICE)
+
+
+# -----------------------------
+# Offline engine
+# -----------------------------
+def offline_wav(text: str, voice: str = DEFAULT_VOICE) -> bytes:
+    """
+    Deterministic local stand-in for edge-tts (no network).
+    A quiet tone whose length follows the word count, as WAV data.
+    """
+    rate = 22050
+    words = max(len(text.split()), 1)
+    duration = 0.4 + 0.32 * words
+    # Pitch depends on the voice so different voices stay distinguishable
+    freq = 180 + int(hashlib.md5(voice.encode("utf-8")).hexdigest()[:2], 16)
+
+    n = int(rate * duration)
+    samples = array.array("h", (int(1800 * math.sin(2 * math.pi * freq * i / rate)) for i in range(n)))
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+# -----------------------------
+# Providers
+# -----------------------------
+class TTSProvider(ABC):
+    """
+    One TTS engine behind per-provider limits.
+
+    Subclasses implement _synth(); synthesize() wraps it in the process-wide
+    concurrency limit, a per-attempt timeout and retries with exponential
+    backoff. Connection-holding providers open them lazily and release them
+    in close() (see session()).
+    """
+
+    name = "base"
+    version = "base-1"      # part of the TTS cache key: bump when output changes
+    timeout = 30.0          # seconds per attempt
+    retries = 2
+    concurrency = 8         # lines in flight per process
+    backoff = 0.5           # seconds before the first retry, doubled after each
+
+    def __init__(self, timeout: float = 0, retries: int = -1, concurrency: int = 0):
+        if timeout > 0:
+            self.timeout = float(timeout)
+        if retries >= 0:
+            self.retries = retries
+        if concurrency > 0:
+            self.concurrency = concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._limit: Optional[asyncio.Semaphore] = None
+
+    def _bind(self) -> None:
+        # Render workers run each job in a fresh event loop (asyncio.run); loop-bound state follows it
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._limit = asyncio.Semaphore(self.concurrency)
+            self._reset()
+
+    def _reset(self) -> None:
+        """Drop state tied to a previous event loop."""
+
+    @abstractmethod
+    async def _synth(self, text: str, out_path: Path, voice: str) -> None:
+        """Write the audio for one line to `out_path`."""
+
+    async def synthesize(self, text: str, out_path: Path, voice: str = DEFAULT_VOICE) -> None:
+        self._bind()
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._limit:
+                    await asyncio.wait_for(self._synth(text, out_path, voice), self.timeout)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    raise RuntimeError(f"TTS ({self.name}) failed after {attempt + 1} attempt(s): {e!r}") from e
+                count("tts_retries")
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def close(self) -> None:
+        """Release connections held for the current session."""
+
+    def warm(self) -> None:
+        """Load the client library up front (render workers call this at spawn)."""
+
+
+class EdgeProvider(TTSProvider):
+    """
+    Microsoft Edge read-aloud voices via edge-tts (needs network).
+    edge-tts opens one websocket per line and closes any connector it is given,
+    so lines share the limits but not connections.
+    """
+
+    name = "edge"
+    version = "edge-tts-7.0"
+
+    async def _synth(self, text: str, out_path: Path, voice: str) -> None:
+        import edge_tts  # only needed when the edge backend is selected
+
+        communicate = edge_tts.Communicate(
+            text, voice=voice, connect_timeout=int(self.timeout), receive_timeout=int(self.timeout),
+        )
+        await communicate.save(str(out_path))
+
+    def warm(self) -> None:
+        import edge_tts  # noqa: F401
+
+
+class OfflineProvider(TTSProvider):
+    """In-process offline engine: renders and load tests without any network."""
+
+    name = "offline"
+    version = "offline-1"
+    timeout = 10.0
+    retries = 0
+    concurrency = os.cpu_count() or 4
+
+    async def _synth(self, text: str, out_path: Path, voice: str) -> None:
+        out_path.write_bytes(offline_wav(text, voice))
+
+
+class HTTPProvider(TTSProvider):
+    """
+    Self-hosted TTS server (e.g. tts_server.py) over one keep-alive session.
+
+    Lines requested within `batch_window` seconds of each other (a job's scenes
+    ask at the same time) go out as a single /synthesize/batch call.
+    """
+
+    name = "http"
+    timeout = 15.0
+    concurrency = 16
+    batch_window = 0.01
+    batch_max = 16
+
+    def __init__(self, url: str, **limits: Any):
+        super().__init__(**limits)
+        self.url = url
+        self.version = f"http-1:{url}"
+        self._session: Any = None
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sends: Set[asyncio.Task] = set()
+
+    def _reset(self) -> None:
+        self._session = None
+        self._pending = []
+        self._timer = None
+        self._sends = set()
+
+    def _client(self) -> Any:
+        import aiohttp  # installed with edge-tts
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _synth(self, text: str, out_path: Path, voice: str) -> None:
+        fut = self._loop.create_future()
+        self._pending.append((text, voice, fut))
+        if len(self._pending) >= self.batch_max:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self.batch_window, self._flush)
+        out_path.write_bytes(await fut)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._send(batch))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _send(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        try:
+            client = self._client()
+            if len(batch) == 1:
+                text, voice, _ = batch[0]
+                async with client.post(f"{self.url}/synthesize", json={"text": text, "voice": voice}) as resp:
+                    resp.raise_for_status()
+                    audio = [await resp.read()]
+            else:
+                lines = [{"text": text, "voice": voice} for text, voice, _ in batch]
+                async with client.post(f"{self.url}/synthesize/batch", json={"lines": lines}) as resp:
+                    resp.raise_for_status()
+                    audio = [base64.b64decode(a) for a in (await resp.json())["audio"]]
+            count("tts_requests")
+        except Exception as e:
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, _, fut), data in zip(batch, audio):
+            if not fut.done():  # the line may have timed out meanwhile
+                fut.set_result(data)
+
+    def warm(self) -> None:
+        import aiohttp  # noqa: F401
+
+    async def close(self) -> None:
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+PROVIDERS: Dict[str, Type[TTSProvider]] = {
+    "edge": EdgeProvider,
+    "offline": OfflineProvider,
+    "http": HTTPProvider,
+}
+
+
+# -----------------------------
+# Cached entry point
+# -----------------------------
+_provider: Optional[TTSProvider] = None
+_cache: Optional[TTSCache] = None
+
+
+def get_provider() -> TTSProvider:
+    """Process-wide provider for the configured backend."""
+    global _provider
+    if _provider is None:
+        backend = settings.TTS_BACKEND if settings.TTS_BACKEND in PROVIDERS else "edge"
+        limits = dict(
+            timeout=settings.TTS_TIMEOUT_SEC,
+            retries=settings.TTS_RETRIES,
+            concurrency=settings.TTS_MAX_INFLIGHT,
+        )
+        if backend == "http":
+            _provider = HTTPProvider(settings.TTS_URL, **limits)
+        else:
+            _provider = PROVIDERS[backend](**limits)
+    return _provider
+
+
+def get_cache() -> TTSCache:
+    """Process-wide TTS cache for the configured backend."""
+    global _cache
+    if _cache is None:
+        provider = get_provider()
+        _cache = TTSCache(
+            root=settings.TTS_CACHE_DIR,
+            synth=provider.synthesize,
+            engine_version=provider.version,
+            max_bytes=settings.TTS_CACHE_BYTES,
+        )
+    return _cache
+
+
+@asynccontextmanager
+async def session() -> AsyncIterator[TTSProvider]:
+    """
+    Scope for one render job: its lines reuse the provider's connections,
+    which are released when the job ends.
+    """
+    provider = get_provider()
+    try:
+        yield provider
+    finally:
+        await provider.close()
+
 
-async def synthesize(text: str, out_path: Path, voice: str = "hi-IN-MadhurNeural"):
+async def synthesize(text: str, out_path: Path, voice: str = DEFAULT_VOICE):
     """
-    Async TTS that works inside FastAPI/uvicorn event loop.
+    Write the voiceover for `text` to out_path, served from the TTS cache when possible.
     """
-    communicate = edge_tts.Communicate(text, voice=voice)
-    await communicate.save(str(out_path))
\ No newline at end of file
+    cache = get_cache()
+    if settings.TTS_CACHE_BYTES <= 0:
+        await cache.synth(text, out_path, voice)
+        return
+    await cache.synthesize(text, out_path, voice)
@@ -0,0 +1,103 @@
+"""
+Render-worker warm-up: pay a process's first-job costs when it spawns.
+
+A fresh render process imports MoviePy/NumPy/Pillow, locates ffmpeg, searches
+for fonts, builds gradient backgrounds, loads the TTS client and starts x264
+for the first time. warm_worker() does all of that (plus a tiny encode) from
+the pool initializer, so a job never lands on a cold worker and /ready can
+tell when the pool is worth routing traffic to.
+
+Every step is best-effort: a pool initializer that raises breaks the whole
+pool, so failures are recorded in the report and the worker starts anyway.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+WARMUP_FRAMES = 8
+WARMUP_LINES = ["WARM UP", "Brighter skin in a week"]
+
+
+def _imports() -> None:
+    from ad_video_generator.backend import video_maker  # noqa: F401  MoviePy, proglog, the pipeline
+
+
+def _ffmpeg() -> None:
+    from ad_video_generator.backend.encoder import ffmpeg_binary
+
+    ffmpeg_binary()
+
+
+def _assets() -> None:
+    """Backgrounds, fonts and text layers at every profile's size."""
+    from ad_video_generator.backend.audio import SFX, sfx
+    from ad_video_generator.backend.frames import build_frame
+    from ad_video_generator.backend.profiles import PROFILES
+
+    for profile in PROFILES.values():
+        build_frame(WARMUP_LINES, badge="SALE", profile=profile)
+    for name in SFX:
+        sfx(name)
+
+
+def _tts() -> None:
+    from ad_video_generator.backend.voice import get_cache, get_provider
+
+    get_provider().warm()
+    get_cache()
+
+
+def _render() -> None:
+    """A few preview-size frames with a mixed soundtrack through ffmpeg (x264 + AAC)."""
+    from ad_video_generator.backend.audio import mix_soundtrack, write_audio
+    from ad_video_generator.backend.encoder import FFmpegWriter
+    from ad_video_generator.backend.frames import build_frame
+    from ad_video_generator.backend.motion import MotionPlan
+    from ad_video_generator.backend.profiles import get_profile
+    from ad_video_generator.backend.scratch import job_scratch
+
+    profile = get_profile("preview")
+    frame = build_frame(WARMUP_LINES, profile=profile)
+    plan = MotionPlan(frame, "Slow push-in", "pop_in", WARMUP_FRAMES / profile.fps, profile.supersample, profile.scale)
+    silence = np.zeros((1, 2), dtype=np.int16)
+
+    with job_scratch("warmup") as tmp_dir:
+        audio_path = tmp_dir / "warmup.m4a"
+        write_audio(mix_soundtrack([silence], [WARMUP_FRAMES], profile.fps, ["soft_pop"]), audio_path)
+        with FFmpegWriter(
+            tmp_dir / "warmup.mp4", profile.width, profile.height, profile.fps,
+            audio_path=audio_path, preset=profile.preset, threads=1,
+        ) as writer:
+            for i in range(WARMUP_FRAMES):
+                writer.write(plan.render(i / profile.fps))
+
+
+STEPS: Dict[str, Callable[[], None]] = {
+    "imports": _imports,
+    "ffmpeg": _ffmpeg,
+    "assets": _assets,
+    "tts": _tts,
+    "render": _render,
+}
+
+
+def warm_worker() -> Dict[str, Any]:
+    """
+    Run every warm-up step once and report what it cost:
+    {"seconds": {step: s, ..., "total": s}, "errors": {step: message}}.
+    """
+    seconds: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    started = time.perf_counter()
+    for name, step in STEPS.items():
+        t0 = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            errors[name] = str(e) or e.__class__.__name__
+        seconds[name] = round(time.perf_counter() - t0, 4)
+    seconds["total"] = round(time.perf_counter() - started, 4)
+    return {"seconds": seconds, "errors": errors}
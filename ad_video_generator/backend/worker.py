@@ -0,0 +1,197 @@
+"""
+Render worker for farm mode: leases jobs from the shared job store, renders
+them in a local process pool and publishes the videos to the object store.
+
+    AD_JOB_STORE=/shared/jobs.db AD_OBJECT_STORE_DIR=/shared/outputs \\
+        python -m ad_video_generator.backend.worker --slots 4
+
+Run one per render machine. SIGTERM/SIGINT hand running jobs back to the queue
+so another worker picks them up; a worker that is killed outright loses its
+jobs once their lease (AD_JOB_LEASE_SEC) runs out.
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.job_store import JobStore, node_id
+from ad_video_generator.backend.jobs import (
+    WARM_KEY, JobCancelled, _init_worker, _render_job, cancel_key, prewarm, warm_workers,
+)
+from ad_video_generator.backend.object_store import ObjectStore, get_object_store, output_key
+from ad_video_generator.backend.scratch import scratch_root
+
+
+class RenderWorker:
+    """
+    One farm node. Each poll it heartbeats every running job (progress, lease,
+    cancel requests), collects finished renders and claims new jobs while
+    slots are free.
+    """
+
+    def __init__(self, store: JobStore, objects: ObjectStore, slots: int, poll_sec: float = 1.0):
+        self.store = store
+        self.objects = objects
+        self.slots = slots
+        self.poll_sec = poll_sec
+        self.id = node_id()
+        self._stop = threading.Event()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._shared: Any = None
+        self._running: Dict[str, Future] = {}
+        self._paths: Dict[str, Path] = {}  # job_id -> file the current attempt renders to
+        self._lost: set = set()  # jobs whose lease went to another worker
+        self._warm = False
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ---- pool ----
+    def _start_pool(self) -> None:
+        ctx = mp.get_context("spawn")
+        if self._manager is None:
+            self._manager = ctx.Manager()
+            self._shared = self._manager.dict()
+        for key in [k for k in self._shared.keys() if k.startswith(WARM_KEY)]:
+            self._shared.pop(key, None)
+        self._warm = False
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.slots, mp_context=ctx, initializer=_init_worker, initargs=(self.slots, self._shared),
+        )
+        prewarm(self._pool, self.slots)
+
+    def _check_warm(self) -> bool:
+        """True once every pool process has warmed up; the worker registers (takes jobs) only then."""
+        if not self._warm:
+            warm = warm_workers(self._shared)
+            if len(warm) >= self.slots:
+                self._warm = True
+                took = max(w["seconds"]["total"] for w in warm)
+                print(f"[worker {self.id}] warm ({took:.1f} s)", flush=True)
+        return self._warm
+
+    def _render_path(self, job_id: str, attempt: int) -> str:
+        """
+        Scratch file of one attempt, unique per worker and attempt: a worker that
+        lost its lease may still be writing (or deleting) its own file while
+        another one on this host renders the job again.
+        """
+        path = scratch_root() / "farm" / f"ad_{job_id}.{self.id}.{attempt}.mp4"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return str(path)
+
+    def _cancel_local(self, job_id: str) -> None:
+        self._shared[cancel_key(job_id)] = True
+
+    # ---- loop ----
+    def _heartbeat(self) -> None:
+        for job_id in list(self._running):
+            if job_id in self._lost:
+                continue
+            state = self._shared.get(job_id) or {}
+            flag = self.store.heartbeat(job_id, self.id, state.get("stage", "starting"), state.get("progress", 0.0))
+            if flag is None:
+                # Lease expired (e.g. a long GC/IO stall) and the job moved on: stop rendering it
+                self._lost.add(job_id)
+                self._cancel_local(job_id)
+            elif flag:
+                self._cancel_local(job_id)
+
+    def _collect(self) -> None:
+        for job_id, fut in list(self._running.items()):
+            if not fut.done():
+                continue
+            del self._running[job_id]
+            self._shared.pop(job_id, None)
+            self._shared.pop(cancel_key(job_id), None)
+            src = self._paths.pop(job_id)
+            if job_id in self._lost:
+                self._lost.discard(job_id)
+                src.unlink(missing_ok=True)
+                continue
+
+            err = fut.exception()
+            if err is None:
+                self.objects.put(output_key(job_id), src)
+                self.store.finish(job_id, self.id, fut.result() or {})
+            elif isinstance(err, JobCancelled):
+                self.store.cancelled(job_id, self.id)
+            elif isinstance(err, BrokenProcessPool):
+                # The render process died (OOM kill, segfault): retry elsewhere, counting the attempt
+                self.store.release(job_id, self.id, error="render process crashed")
+            else:
+                self.store.fail(job_id, self.id, str(err) or err.__class__.__name__)
+            src.unlink(missing_ok=True)
+
+        if self._pool is not None and getattr(self._pool, "_broken", False) and not self._running:
+            self._pool.shutdown(wait=False)
+            self._start_pool()
+
+    def _claim(self) -> None:
+        if getattr(self._pool, "_broken", False):
+            return
+        while len(self._running) < self.slots and not self._stop.is_set():
+            row = self.store.claim(self.id, path_for=self._render_path)
+            if row is None:
+                return
+            job_id = row["id"]
+            self._paths[job_id] = Path(row["render_path"])
+            self._shared[job_id] = {"stage": "starting", "progress": 0.0}
+            self._running[job_id] = self._pool.submit(
+                _render_job, job_id, row["meta"], row["render_path"], self._shared
+            )
+            print(f"[worker {self.id}] rendering {job_id} (attempt {row['attempts']})", flush=True)
+
+    def run(self) -> None:
+        self._start_pool()
+        print(f"[worker {self.id}] {self.slots} slot(s) on {self.store.path}", flush=True)
+        try:
+            while not self._stop.is_set():
+                warm = self._check_warm()
+                if warm:
+                    self.store.register(self.id, self.slots)
+                self._heartbeat()
+                self._collect()
+                if warm:
+                    self._claim()
+                self._stop.wait(self.poll_sec)
+        finally:
+            # Hand unfinished jobs back uncounted, then let the renders stop at their next progress report
+            for job_id in list(self._running):
+                if job_id not in self._lost:
+                    self.store.release(job_id, self.id)
+                self._cancel_local(job_id)
+            self.store.unregister(self.id)
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+            for path in self._paths.values():
+                path.unlink(missing_ok=True)
+            if self._manager is not None:
+                self._manager.shutdown()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Render worker for a multi-node farm (needs AD_JOB_STORE).")
+    ap.add_argument("--slots", type=int, default=settings.RENDER_WORKERS, help="jobs rendered at once")
+    ap.add_argument("--store", default=settings.JOB_STORE, help="job store database (default: AD_JOB_STORE)")
+    args = ap.parse_args()
+    if not args.store:
+        ap.error("no job store: set AD_JOB_STORE or pass --store")
+
+    store = JobStore(args.store, lease_sec=settings.JOB_LEASE_SEC, max_attempts=settings.JOB_MAX_ATTEMPTS)
+    worker = RenderWorker(store, get_object_store(), slots=max(1, args.slots), poll_sec=settings.WORKER_POLL_SEC)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: worker.stop())
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
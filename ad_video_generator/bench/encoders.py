@@ -0,0 +1,69 @@
+"""
+Encode-engine benchmark: frames/sec of the MoviePy and ffmpeg engines on the
+same prepared scenes (offline TTS, so no network is needed).
+
+    python -m ad_video_generator.bench.encoders [--duration 15]
+"""
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("AD_TTS_BACKEND", "offline")
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend import video_maker as vm
+from ad_video_generator.backend.script_engine import generate_ad_json
+
+ENGINES = {
+    "moviepy": lambda scenes, out, tmp: vm._encode_moviepy(scenes, out, tmp, lambda *_: None, quiet=True),
+    "ffmpeg": lambda scenes, out, tmp: vm._encode_ffmpeg(scenes, out, tmp, lambda *_: None),
+}
+
+
+async def _prepare(meta: Dict[str, Any], tmp_dir: Path) -> List[vm.SceneInputs]:
+    scenes = generate_ad_json(meta)["scenes"]
+    return list(await asyncio.gather(*(vm.prepare_scene(s, i, tmp_dir) for i, s in enumerate(scenes))))
+
+
+def run(duration: int = 15) -> Dict[str, Any]:
+    meta = {"brand": "GlowCare", "product": "Vitamin C Serum", "duration_sec": duration,
+            "benefits": ["Brighter skin", "Lightweight", "Visible glow"]}
+    results: Dict[str, Any] = {"duration_sec": duration, "fps": settings.FPS, "engines": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        scenes = asyncio.run(_prepare(meta, tmp_dir))
+        frames = len(np.arange(0, sum(s.duration for s in scenes), 1.0 / settings.FPS))
+        for name, encode in ENGINES.items():
+            out = tmp_dir / f"bench_{name}.mp4"
+            t0 = time.perf_counter()
+            encode(scenes, out, tmp_dir)
+            wall = time.perf_counter() - t0
+            results["engines"][name] = {
+                "frames": frames,
+                "wall_sec": round(wall, 3),
+                "frames_per_sec": round(frames / wall, 2),
+                "bytes": out.stat().st_size,
+            }
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--duration", type=int, default=15)
+    args = ap.parse_args()
+    print(json.dumps(run(args.duration), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+Reproducible render benchmark: end-to-end make_ad_video on fixed AdRequest
+fixtures, cold-start costs (API import, worker warm-up, first job on a cold vs
+a warmed worker) and microbenchmarks of the hot helpers, compared with a baseline.
+
+    python -m ad_video_generator.bench.suite [--quick] [--engine ffmpeg] [--out results.json]
+    python -m ad_video_generator.bench.suite --save-baseline            # record bench/baseline.json
+    python -m ad_video_generator.bench.suite --baseline bench/baseline.json --tolerance 0.15
+
+Everything runs offline: voiceovers come from the deterministic offline TTS
+backend and all caches point at a throwaway directory, so every run starts
+cold. Each fixture renders in a fresh process, which makes peak RSS and CPU
+time per fixture meaningful. Exit status 1 means a regression vs the baseline.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+
+# ✅ Must happen before any backend import: settings are read at import time
+os.environ["AD_TTS_BACKEND"] = "offline"
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+LANGUAGES = ("Hinglish", "Hindi", "English")
+DURATIONS = (15, 30)
+
+# Lower is better for these; anything else is informational
+TIME_METRICS = ("wall_sec", "ms_per_call")
+
+# Calls faster than this are timer noise, not regressions
+NOISE_FLOOR_MS = 0.05
+
+# Modules the API process must not import at startup (they belong to render workers)
+HEAVY_MODULES = ("numpy", "PIL", "moviepy")
+
+
+# -----------------------------
+# Fixtures
+# -----------------------------
+def fixtures() -> Dict[str, Dict[str, Any]]:
+    """Fixed AdRequests: 15s and 30s templates in every language."""
+    from ad_video_generator.backend.models import AdRequest
+
+    out = {}
+    for duration in DURATIONS:
+        for language in LANGUAGES:
+            req = AdRequest(
+                brand="GlowCare",
+                product="Vitamin C Face Serum",
+                benefits=["Brighter skin", "Lightweight", "Visible glow"],
+                offer="Flat 30% Off",
+                language=language,
+                duration_sec=duration,
+                hook="hook_a",
+            )
+            out[f"{duration}s_{language.lower()}"] = req.model_dump()
+    return out
+
+
+# -----------------------------
+# Resource accounting
+# -----------------------------
+def _usage() -> Dict[str, float]:
+    """CPU seconds and peak RSS (MB) of this process and its finished children (ffmpeg)."""
+    import resource
+
+    me = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    unit = 1 if sys.platform == "darwin" else 1024  # ru_maxrss: bytes on macOS, KiB on Linux
+    return {
+        "cpu_sec": me.ru_utime + me.ru_stime + kids.ru_utime + kids.ru_stime,
+        "peak_rss_mb": me.ru_maxrss * unit / 2**20,
+        "child_peak_rss_mb": kids.ru_maxrss * unit / 2**20,
+    }
+
+
+def _render_fixture(meta: Dict[str, Any], out_dir: str) -> Dict[str, Any]:
+    """Runs in a fresh process: one full make_ad_video call."""
+    from ad_video_generator.backend.encoder import set_concurrent_jobs
+    from ad_video_generator.backend.metrics import trace_job
+    from ad_video_generator.backend.video_maker import make_ad_video
+
+    set_concurrent_jobs(1)  # fixtures render one at a time: the job gets every core
+
+    out_path = Path(out_dir) / f"bench_{os.getpid()}.mp4"
+    before = _usage()
+    t0 = time.perf_counter()
+    with trace_job("bench") as trace:
+        timings = asyncio.run(make_ad_video(meta, out_path, progress=lambda *_: None))
+    wall = time.perf_counter() - t0
+    after = _usage()
+
+    frames = trace.counters.get("frames_encoded", 0)
+    cpu = after["cpu_sec"] - before["cpu_sec"]
+    return {
+        "wall_sec": round(wall, 3),
+        "frames": frames,
+        "frames_per_sec": round(frames / wall, 2) if wall else 0.0,
+        "cpu_sec": round(cpu, 3),
+        "cpu_util": round(cpu / wall, 2) if wall else 0.0,  # 1.0 = one core busy the whole time
+        "peak_rss_mb": round(after["peak_rss_mb"], 1),
+        "ffmpeg_peak_rss_mb": round(after["child_peak_rss_mb"], 1),
+        "bytes": out_path.stat().st_size,
+        "stages": trace.stage_totals(),
+        "timings": timings,
+    }
+
+
+def _isolated(fn: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def run_pipeline(names: Optional[List[str]] = None, profile: str = "final") -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    root = Path(tempfile.mkdtemp(prefix="ad_bench_"))
+    try:
+        for name, meta in fixtures().items():
+            if names and name not in names:
+                continue
+            # Fresh caches per fixture; the spawned process reads them from its environment
+            os.environ["AD_TTS_CACHE_DIR"] = str(root / name / "tts")
+            os.environ["AD_SEGMENT_CACHE_DIR"] = str(root / name / "segments")
+            results[name] = _isolated(_render_fixture, dict(meta, profile=profile), str(root))
+            print(f"  {name}: {results[name]['wall_sec']} s", file=sys.stderr)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+# -----------------------------
+# Cold start
+# -----------------------------
+_API_IMPORT = """
+import json, sys, time
+t0 = time.perf_counter()
+import ad_video_generator.backend.main
+print(json.dumps({"import_sec": time.perf_counter() - t0, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _api_import() -> Dict[str, Any]:
+    """Fresh interpreter importing the API app: what a new API replica pays before serving."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", _API_IMPORT], env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - t0
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        "wall_sec": round(out["import_sec"], 3),
+        "process_sec": round(wall, 3),  # interpreter startup included
+        "heavy_modules": out["heavy"],
+    }
+
+
+def _first_job(meta: Dict[str, Any], out_dir: str, warm: bool) -> Dict[str, Any]:
+    """Runs in a fresh process: optional warm-up (as the render pool does), then one job."""
+    t0 = time.perf_counter()
+    from ad_video_generator.backend.warmup import warm_worker
+
+    report = warm_worker() if warm else None
+    t1 = time.perf_counter()
+    from ad_video_generator.backend.encoder import set_concurrent_jobs
+    from ad_video_generator.backend.video_maker import make_ad_video
+
+    set_concurrent_jobs(1)
+    asyncio.run(make_ad_video(meta, Path(out_dir) / f"cold_{os.getpid()}.mp4", progress=lambda *_: None))
+    return {
+        "warmup_sec": round(t1 - t0, 3),
+        "warmup_steps": report["seconds"] if report else None,
+        "job_sec": round(time.perf_counter() - t1, 3),
+    }
+
+
+def run_cold_start(profile: str = "preview") -> Dict[str, Any]:
+    results: Dict[str, Any] = {"api_import": _api_import()}
+    root = Path(tempfile.mkdtemp(prefix="ad_bench_"))
+    meta = dict(fixtures()["15s_english"], profile=profile)
+    try:
+        for warm in (False, True):
+            os.environ["AD_TTS_CACHE_DIR"] = str(root / f"tts_{warm}")
+            os.environ["AD_SEGMENT_CACHE_DIR"] = str(root / f"segments_{warm}")
+            probe = _isolated(_first_job, meta, str(root), warm)
+            if warm:
+                results["worker_warmup"] = {"wall_sec": probe["warmup_sec"], "steps": probe["warmup_steps"]}
+                results["first_job_warm"] = {"wall_sec": probe["job_sec"]}
+            else:
+                results["first_job_cold"] = {"wall_sec": probe["job_sec"]}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    for name, r in results.items():
+        print(f"  {name}: {r['wall_sec']} s", file=sys.stderr)
+    return results
+
+
+# -----------------------------
+# Microbenchmarks
+# -----------------------------
+def _per_call(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Median milliseconds per call over `repeat` calls (setup runs untimed before each)."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {"ms_per_call": round(1000 * statistics.median(samples), 3), "calls": repeat}
+
+
+def run_micro(repeat: int = 20) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="ad_bench_") as cache:
+        os.environ["AD_TTS_CACHE_DIR"] = cache
+        return _micro(repeat)
+
+
+def _micro(repeat: int) -> Dict[str, Any]:
+    import numpy as np
+    from PIL import ImageDraw
+
+    from ad_video_generator.backend import assets, layout, settings
+    from ad_video_generator.backend import frames as fr
+    from ad_video_generator.backend import video_maker as vm
+    from ad_video_generator.backend.motion import MotionPlan
+    from ad_video_generator.backend.script_engine import generate_ad_json
+
+    lines = ["RESULT:", "Brighter skin in a week with no sticky feel"]
+    text = " ".join(lines)
+    frame = fr.build_frame(lines, badge="SALE")
+    font = fr.load_font(74)
+    draw = ImageDraw.Draw(fr.make_gradient_bg())
+    results: Dict[str, Any] = {}
+
+    results["make_gradient_bg_cold"] = _per_call(fr.make_gradient_bg, repeat, setup=assets.gradient_bg.cache_clear)
+    results["make_gradient_bg"] = _per_call(fr.make_gradient_bg, repeat)
+    results["wrap_text_cold"] = _per_call(lambda: fr.wrap_text(draw, text, font, fr.W - 140), repeat, setup=layout.clear_caches)
+    results["wrap_text"] = _per_call(lambda: fr.wrap_text(draw, text, font, fr.W - 140), repeat)
+    results["build_frame"] = _per_call(lambda: fr.build_frame(lines, badge="SALE"), repeat)
+    results["zoom_frame"] = _per_call(lambda: vm.zoom_frame(frame, 1.04), repeat)
+
+    plan = MotionPlan(frame, "Zoom + shake on beat", "cta_bounce", 3.0, settings.MOTION_SUPERSAMPLE)
+    plan._src()
+    times = iter(np.arange(10_000) / settings.FPS)
+    results["motion_plan_render"] = _per_call(lambda: plan.render(float(next(times))), repeat * 5)
+    results["generate_ad_json"] = _per_call(lambda: generate_ad_json(fixtures()["15s_english"]), repeat)
+
+    # Encode step alone: prepared scenes of the 15s fixture through the ffmpeg engine
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        meta = fixtures()["15s_english"]
+        scenes = generate_ad_json(meta)["scenes"]
+
+        async def prepare():
+            return await asyncio.gather(*(vm.prepare_scene(s, i, tmp_dir) for i, s in enumerate(scenes)))
+
+        prepared = list(asyncio.run(prepare()))
+        frames = sum(int(round(s.duration * settings.FPS)) for s in prepared)
+        t0 = time.perf_counter()
+        vm._encode_ffmpeg(prepared, tmp_dir / "encode.mp4", tmp_dir, lambda *_: None)
+        wall = time.perf_counter() - t0
+    results["encode_15s"] = {"wall_sec": round(wall, 3), "frames": frames, "frames_per_sec": round(frames / wall, 2)}
+    return results
+
+
+# -----------------------------
+# Baseline comparison
+# -----------------------------
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Time metrics that got slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for section in ("pipeline", "cold_start", "micro"):
+        for name, cur in (current.get(section) or {}).items():
+            base = (baseline.get(section) or {}).get(name)
+            if not base:
+                continue
+            for metric in TIME_METRICS:
+                if metric in cur and base.get(metric):
+                    if metric == "ms_per_call" and base[metric] < NOISE_FLOOR_MS:
+                        continue
+                    ratio = cur[metric] / base[metric]
+                    if ratio > 1 + tolerance:
+                        regressions.append({
+                            "case": f"{section}.{name}",
+                            "metric": metric,
+                            "baseline": base[metric],
+                            "current": cur[metric],
+                            "ratio": round(ratio, 2),
+                        })
+    return regressions
+
+
+def environment() -> Dict[str, Any]:
+    from ad_video_generator.backend import settings
+    from ad_video_generator.backend.encoder import available_cores
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "available_cores": available_cores(),
+        "engine": settings.RENDER_ENGINE,
+        "fps": settings.FPS,
+        "encode_threads": settings.ENCODE_THREADS or "auto",
+        "segment_parallel": settings.SEGMENT_PARALLEL or "auto",
+        "supersample": settings.MOTION_SUPERSAMPLE,
+        "low_memory": settings.LOW_MEMORY,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--engine", choices=("moviepy", "ffmpeg", "segments"), help="AD_RENDER_ENGINE for this run")
+    ap.add_argument("--low-memory", action="store_true", help="AD_LOW_MEMORY=1 for this run")
+    ap.add_argument("--profile", default="final", help="render profile for the pipeline fixtures")
+    ap.add_argument("--quick", action="store_true", help="15s fixtures only, preview profile")
+    ap.add_argument("--only", nargs="*", help="fixture names to run (e.g. 15s_english)")
+    ap.add_argument("--skip-pipeline", action="store_true")
+    ap.add_argument("--skip-cold-start", action="store_true")
+    ap.add_argument("--skip-micro", action="store_true")
+    ap.add_argument("--repeat", type=int, default=20, help="calls per microbenchmark")
+    ap.add_argument("--out", help="write results JSON here (default: stdout)")
+    ap.add_argument("--baseline", nargs="?", const=str(BASELINE_PATH), help="compare with this baseline JSON")
+    ap.add_argument("--save-baseline", nargs="?", const=str(BASELINE_PATH), help="store results as the baseline")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before failing (0.15 = 15%%)")
+    args = ap.parse_args()
+
+    if args.engine:
+        os.environ["AD_RENDER_ENGINE"] = args.engine  # inherited by the spawned fixture processes
+    if args.low_memory:
+        os.environ["AD_LOW_MEMORY"] = "1"
+    names = args.only or ([f"15s_{lang.lower()}" for lang in LANGUAGES] if args.quick else None)
+    profile = "preview" if args.quick else args.profile
+
+    results: Dict[str, Any] = {"profile": profile}
+    if not args.skip_pipeline:
+        print("pipeline fixtures:", file=sys.stderr)
+        results["pipeline"] = run_pipeline(names, profile)
+    if not args.skip_cold_start:
+        print("cold start:", file=sys.stderr)
+        results["cold_start"] = run_cold_start(profile)
+    if not args.skip_micro:
+        results["micro"] = run_micro(args.repeat)  # first backend import in this process
+    results["environment"] = environment()
+
+    failed = False
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        results["regressions"] = regressions
+        failed = bool(regressions)
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(text + "\n", encoding="utf-8")
+        print(f"baseline saved to {args.save_baseline}", file=sys.stderr)
+    if failed:
+        for r in results["regressions"]:
+            print(f"REGRESSION {r['case']} {r['metric']}: {r['baseline']} -> {r['current']} (x{r['ratio']})", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
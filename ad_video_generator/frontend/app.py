@@ -1,3 +1,6 @@
+import base64
+import time
+
 import streamlit as st
 import requests
 
@@ -5,6 +8,19 @@ API = "http://127.0.0.1:8000"
 
 st.title("Text-to-Ad Video Generator (MVP)")
 
+
+# ✅ Templates, hooks and profiles come from the backend (templates can be added without a frontend change)
+@st.cache_data(ttl=60)
+def load_options():
+    return requests.get(API + "/templates", timeout=5).json()
+
+
+try:
+    options = load_options()
+except requests.RequestException as e:
+    st.error(f"Backend unavailable: {e}")
+    st.stop()
+
 brand = st.text_input("Brand Name", "GlowCare")
 product = st.text_input("Product", "Vitamin C Face Serum")
 benefits = st.text_area("Benefits (one per line)", "Brighter skin\nLightweight\nVisible glow")
@@ -13,31 +29,71 @@ offer = st.text_input("Offer (optional)", "Flat 30% Off")
 cta = st.text_input("CTA", "Order Now")
 tone = st.selectbox("Tone", ["Relatable, punchy", "Premium", "Funny", "Emotional", "GenZ"])
 language = st.selectbox("Language", ["Hinglish", "Hindi", "English"])
-duration = st.selectbox("Duration (seconds)", [15, 30])
+duration = st.selectbox("Duration (seconds)", [15, 20, 30, 45, 60])
+template = st.selectbox("Script template", ["auto"] + [t["id"] for t in options["templates"]])
+hook = st.selectbox("Hook", ["auto"] + options["hooks"])
+profile = st.selectbox("Render profile", options["profiles"], index=options["profiles"].index("final"))
 
-if st.button("Generate Ad Video"):
-    payload = {
-        "brand": brand,
-        "product": product,
-        "benefits": [b.strip() for b in benefits.splitlines() if b.strip()],
-        "audience": audience,
-        "offer": offer if offer.strip() else None,
-        "cta": cta,
-        "tone": tone,
-        "language": language,
-        "duration_sec": duration
-    }
+payload = {
+    "brand": brand,
+    "product": product,
+    "benefits": [b.strip() for b in benefits.splitlines() if b.strip()],
+    "audience": audience,
+    "offer": offer if offer.strip() else None,
+    "cta": cta,
+    "tone": tone,
+    "language": language,
+    "duration_sec": duration,
+    "profile": profile,
+    "template": None if template == "auto" else template,
+    "hook": None if hook == "auto" else hook,
+}
 
+# ✅ Storyboard stills redraw on every edit (no TTS, no encoding) before committing to a render
+if st.checkbox("Live storyboard preview", value=True):
+    try:
+        pr = requests.post(API + "/preview", json=payload, params={"format": "json", "width": 200}, timeout=5)
+    except requests.RequestException as e:
+        st.info(f"Preview unavailable: {e}")
+    else:
+        if pr.ok:
+            board = pr.json()
+            cols = st.columns(max(1, len(board["scenes"])))
+            for col, scene in zip(cols, board["scenes"]):
+                col.image(base64.b64decode(scene["thumbnail"].split(",", 1)[1]))
+                col.caption(f"{scene['t_start']:.1f}-{scene['t_end']:.1f}s · {scene['vo']}")
+        else:
+            st.info(f"Preview unavailable ({pr.status_code}).")
+
+if st.button("Generate Ad Video"):
     r = requests.post(API + "/generate", json=payload)
 
     st.write("Status:", r.status_code)
     st.write("Raw response (first 2000 chars):")
     st.code(r.text[:2000])
 
-    if r.ok and (r.text.strip().startswith("{") or r.text.strip().startswith("[")):
+    if r.status_code == 429:
+        st.warning("Render queue is busy. Please try again in a few seconds.")
+    elif r.ok and (r.text.strip().startswith("{") or r.text.strip().startswith("[")):
         data = r.json()
         st.json(data)
 
+        # ✅ Rendering happens in the background: poll the job until it finishes
+        if "status_url" in data:
+            if "live_url" in data:
+                st.markdown(f"[Watch while it renders]({API + data['live_url']})")
+            bar = st.progress(0.0, text="Queued")
+            while True:
+                job = requests.get(API + data["status_url"]).json()
+                bar.progress(min(float(job.get("progress", 0.0)), 1.0), text=job.get("stage", ""))
+                if job.get("status") in ("done", "failed", "cancelled"):
+                    break
+                time.sleep(1)
+
+            if job.get("status") != "done":
+                st.error(f"Render {job.get('status')}: {job.get('error') or ''}")
+                st.stop()
+
         # ✅ Play video via backend URL (recommended)
         if "download_url" in data:
             st.success("Video created!")
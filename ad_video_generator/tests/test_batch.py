@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ad_video_generator.backend import main
+from ad_video_generator.backend.batch import run_batch
+from ad_video_generator.backend.jobs import Job, JobStatus
+from ad_video_generator.backend.models import AdRequest
+from ad_video_generator.backend.render_cache import RenderCache
+
+
+class FakeQueue:
+    """JobQueue stand-in whose renders finish at once; like JobQueue it shares jobs by key."""
+
+    workers = 2
+
+    def __init__(self, on_done: Callable[[Job], None]):
+        self.on_done = on_done
+        self.jobs: Dict[str, Job] = {}
+        self.keys: List[Optional[str]] = []
+
+    def submit(self, meta: Dict[str, Any], out_dir: Path, key: Optional[str] = None) -> Job:
+        self.keys.append(key)
+        for job in self.jobs.values():
+            if key is not None and job.key == key:
+                return job
+        job_id = uuid.uuid4().hex[:8]
+        out_path = out_dir / f"ad_{job_id}.mp4"
+        out_path.write_bytes(b"\0" * 100)
+        job = Job(id=job_id, meta=meta, out_path=out_path, key=key, status=JobStatus.DONE, stage="done")
+        self.jobs[job_id] = job
+        self.on_done(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+
+def _run(queue: FakeQueue, items, out_dir: Path, renders: Optional[RenderCache]):
+    async def collect():
+        return [row async for row in run_batch(queue, items, out_dir, renders=renders, poll_sec=0)]
+
+    return asyncio.run(collect())
+
+
+def test_batch_with_cache_off_is_not_keyed_or_recorded(tmp_path, monkeypatch):
+    cache = RenderCache(tmp_path / "renders.json", max_bytes=0, max_age_sec=0)
+    monkeypatch.setattr(main, "renders", cache)
+    queue = FakeQueue(main._on_job_done)
+    item = AdRequest(brand="GlowCare", product="Serum", benefits=["Bright"]).model_dump()
+
+    rows = _run(queue, [item, dict(item)], tmp_path, renders=None)  # what /generate/batch passes with AD_RENDER_CACHE=0
+
+    assert queue.keys == [None, None]
+    assert len(queue.jobs) == 2  # identical items are not deduplicated either
+    assert rows[-1]["summary"]["done"] == 2
+    assert cache.stats()["entries"] == 0
+    assert not cache.index_path.exists()
+
+
+def test_batch_with_cache_on_records_and_shares_renders(tmp_path, monkeypatch):
+    cache = RenderCache(tmp_path / "renders.json", max_bytes=0, max_age_sec=0)
+    monkeypatch.setattr(main, "renders", cache)
+    queue = FakeQueue(main._on_job_done)
+    item = AdRequest(brand="GlowCare", product="Serum", benefits=["Bright"]).model_dump()
+
+    _run(queue, [item, dict(item)], tmp_path, renders=cache)
+    rows = _run(queue, [item], tmp_path, renders=cache)
+
+    assert len(queue.jobs) == 1
+    assert cache.stats()["entries"] == 1
+    assert rows[0]["cached"] is True
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import sqlite3
+
+from ad_video_generator.backend.job_store import JobStore
+
+
+def _path_for(worker: str):
+    return lambda job_id, attempt: f"/scratch/ad_{job_id}.{worker}.{attempt}.mp4"
+
+
+def test_each_lease_records_its_own_render_path(tmp_path):
+    store = JobStore(tmp_path / "jobs.db", lease_sec=0)
+    store.register("w", 1)
+    job_id = store.submit({"product": "Serum"}, key=None, origin="api", max_queue=5)["id"]
+
+    first = store.claim("w1", path_for=_path_for("w1"))
+    second = store.claim("w2", path_for=_path_for("w2"))  # lease_sec=0: the first lease has run out
+
+    assert first["id"] == second["id"] == job_id
+    assert first["render_path"] == f"/scratch/ad_{job_id}.w1.1.mp4"
+    assert second["render_path"] == f"/scratch/ad_{job_id}.w2.2.mp4"
+    assert store.finish(job_id, "w1", {}) is False  # the old attempt no longer holds the job
+    assert store.finish(job_id, "w2", {}) is True
+    assert store.get(job_id)["render_path"] is None
+
+
+def test_older_database_gets_the_new_columns(tmp_path):
+    path = tmp_path / "jobs.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, key TEXT, meta TEXT NOT NULL, status TEXT NOT NULL, "
+        "stage TEXT NOT NULL, progress REAL NOT NULL DEFAULT 0, error TEXT, result TEXT, origin TEXT, "
+        "worker TEXT, lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0, cancel INTEGER NOT NULL DEFAULT 0, "
+        "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+    )
+    conn.commit()
+    conn.close()
+
+    store = JobStore(path)
+    store.register("w", 1)
+    store.submit({"product": "Serum"}, key=None, origin="api", max_queue=5)
+
+    assert store.claim("w", path_for=_path_for("w"))["render_path"].endswith(".w.1.mp4")
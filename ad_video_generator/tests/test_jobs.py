@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from ad_video_generator.backend.jobs import Job, JobQueue, JobStatus, cancel_key
+
+
+def _queue_with_render(job_id: str = "j1"):
+    """A JobQueue whose shared dict (normally a Manager dict fed by the pool) is a plain dict."""
+    queue = JobQueue(workers=1, max_queue=1)
+    queue._shared = {job_id: {"stage": "frames", "progress": 0.4, "started_at": 1.0}}
+    queue._jobs[job_id] = Job(id=job_id, meta={}, out_path=Path("ad_j1.mp4"))
+    return queue
+
+
+def test_progress_reports_are_synced():
+    queue = _queue_with_render()
+
+    job = queue.get("j1")
+
+    assert (job.status, job.stage, job.progress) == (JobStatus.RENDERING, "frames", 0.4)
+
+
+def test_cancelling_survives_later_progress_reports():
+    queue = _queue_with_render()
+
+    queue.cancel("j1")
+    queue._shared["j1"] = {"stage": "encode", "progress": 0.8, "started_at": 1.0}  # render not stopped yet
+    job = queue.get("j1")
+
+    assert queue._shared[cancel_key("j1")] is True
+    assert job.stage == "cancelling"
+    assert job.progress == 0.8
+    assert queue.stats()["rendering"] == 1
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import sys
+import threading
+
+from ad_video_generator.backend.metrics import MetricsRegistry, Trace
+
+THREADS = 8
+PER_THREAD = 2000
+
+
+def _hammer(fn) -> None:
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        threads = [threading.Thread(target=fn) for _ in range(THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_concurrent_observes_are_not_lost():
+    trace = Trace("j1")
+
+    def scene():
+        for i in range(PER_THREAD):
+            trace.observe("frame_effect", 0.001)
+            trace.observe(f"scene_{i % 3}", 0.002)
+            trace.count("frames_encoded")
+
+    _hammer(scene)
+    data = trace.to_dict()
+
+    assert data["histograms"]["frame_effect"]["count"] == THREADS * PER_THREAD
+    assert sum(data["histograms"][f"scene_{i}"]["count"] for i in range(3)) == THREADS * PER_THREAD
+    assert data["counters"]["frames_encoded"] == THREADS * PER_THREAD
+
+
+def test_concurrent_jobs_are_all_recorded():
+    registry = MetricsRegistry()
+    result = {"timings": {"total": 2.0}, "trace": {"stages": {"tts": 0.5, "encode": 1.0}}}
+
+    _hammer(lambda: [registry.record_job("done", result) for _ in range(200)])
+    text = registry.render()
+
+    assert f'ad_jobs_total{{status="done"}} {THREADS * 200}' in text
+    assert f'ad_stage_seconds_count{{stage="tts"}} {THREADS * 200}' in text
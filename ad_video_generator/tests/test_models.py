@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from ad_video_generator.backend import templates
+from ad_video_generator.backend.models import AdRequest, VariantSpec
+from ad_video_generator.backend.templates import TEMPLATE_DIR, TemplateRegistry
+
+
+@pytest.fixture
+def hook_d(tmp_path, monkeypatch):
+    """Registry with an extra template dir (as AD_TEMPLATE_DIRS) that defines hook_d."""
+    common = json.loads((TEMPLATE_DIR / "common.json").read_text(encoding="utf-8"))
+    extra = dict(common["hooks"][0], id="hook_d")
+    (tmp_path / "common.json").write_text(json.dumps({"hooks": [extra]}), encoding="utf-8")
+    registry = TemplateRegistry([TEMPLATE_DIR, tmp_path])
+    monkeypatch.setattr(templates, "_registry", registry)
+    return registry
+
+
+def test_hooks_from_template_dirs_are_accepted(hook_d):
+    req = AdRequest(product="Serum", hook="hook_d")
+
+    assert hook_d.generate(req.model_dump())["chosen_hook"] == "hook_d"
+    assert VariantSpec(products=[req]).hooks == ["hook_a", "hook_b", "hook_c", "hook_d"]
+    assert VariantSpec(products=[req], hooks=["hook_d"]).hooks == ["hook_d"]
+
+
+def test_unknown_hooks_are_rejected():
+    with pytest.raises(ValidationError):
+        AdRequest(hook="hook_z")
+    with pytest.raises(ValidationError):
+        VariantSpec(products=[AdRequest()], hooks=["hook_a", "hook_z"])
+
+
+def test_profiles_come_from_profiles_py():
+    assert AdRequest(profile=" Preview ").profile == "preview"
+    with pytest.raises(ValidationError):
+        AdRequest(profile="huge")
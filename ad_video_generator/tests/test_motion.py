@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from ad_video_generator.backend.motion import STATIC_CAMERAS, MotionPlan
+from ad_video_generator.backend.templates import get_registry
+
+FPS = 15
+
+
+def _frame() -> np.ndarray:
+    return np.random.default_rng(0).integers(0, 255, (192, 108, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("duration", [15, 30])
+def test_generated_scripts_reach_the_static_fast_path(duration):
+    script = get_registry().generate({"product": "Serum", "benefits": ["Bright"], "duration_sec": duration})
+    held = [s for s in script["scenes"] if any(word in s["camera"].lower() for word in STATIC_CAMERAS)]
+    assert held, "no template scene uses a static camera"
+
+    for scene in held:
+        dur = scene["t_end"] - scene["t_start"]
+        plan = MotionPlan(_frame(), scene["camera"], scene["text_animation"], dur, supersample=2, px=0.1)
+        frames = list(plan.render_many(np.arange(int(dur * FPS)) / FPS))
+
+        assert plan.reused > 0
+        assert frames[-1] is plan.frame  # after the text animation the hold is the still itself
+
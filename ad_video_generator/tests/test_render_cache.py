@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from ad_video_generator.backend import settings
+from ad_video_generator.backend.fonts import resolve_font_path
+from ad_video_generator.backend.models import AdRequest
+from ad_video_generator.backend.render_cache import RenderCache, normalize_request, render_key
+
+
+def _meta(**overrides):
+    return AdRequest(brand="GlowCare", product="Serum", benefits=["Bright", "Light"], **overrides).model_dump()
+
+
+# -----------------------------
+# render_key
+# -----------------------------
+def test_equivalent_requests_share_a_key():
+    a = _meta(offer="", tone="Premium", language="English")
+    b = dict(a, brand="  GlowCare ", benefits=["Bright", "  ", " Light"], offer=None, tone="premium", language="english")
+
+    assert normalize_request(a) == normalize_request(b)
+    assert render_key(a) == render_key(b)
+
+
+@pytest.mark.parametrize("field, value", [
+    ("product", "Cream"),
+    ("benefits", ["Bright"]),
+    ("offer", "10% off"),
+    ("duration_sec", 30),
+    ("hook", "hook_b"),
+    ("profile", "preview"),
+    ("template", "story"),
+])
+def test_request_fields_change_the_key(field, value):
+    base = _meta()
+
+    assert render_key(base) != render_key(dict(base, **{field: value}))
+
+
+@pytest.mark.parametrize("name, value", [
+    ("FPS", 24),
+    ("MOTION_SUPERSAMPLE", 1),
+    ("TTS_BACKEND", "offline-other"),
+    ("RENDER_ENGINE", "segments"),
+    ("TTS_VOICES", {"hinglish": "hi-IN-SwaraNeural"}),
+    ("SFX_VOLUME", 0),
+    ("MAX_SPEECH_TEMPO", 1.5),
+])
+def test_output_settings_change_the_key(monkeypatch, name, value):
+    meta = _meta()
+    before = render_key(meta)
+
+    monkeypatch.setattr(settings, name, value)
+
+    assert render_key(meta) != before
+
+
+@pytest.fixture
+def fresh_font(monkeypatch):
+    """Re-resolve the font after the test changes font settings (it is looked up once per process)."""
+    resolve_font_path.cache_clear()
+    yield
+    monkeypatch.undo()
+    resolve_font_path.cache_clear()
+
+
+def test_font_dirs_change_the_key(tmp_path, monkeypatch, fresh_font):
+    meta = _meta()
+    before = render_key(meta)
+    (tmp_path / "arialbd.ttf").write_bytes(b"")  # first choice in FONT_FILES
+
+    monkeypatch.setattr(settings, "FONT_DIRS", [str(tmp_path)])
+    resolve_font_path.cache_clear()
+
+    assert resolve_font_path() == str(tmp_path / "arialbd.ttf")
+    assert render_key(meta) != before
+
+
+def test_font_path_changes_the_key(tmp_path, monkeypatch, fresh_font):
+    meta = _meta()
+    before = render_key(meta)
+    font = tmp_path / "Brand.ttf"
+    font.write_bytes(b"")
+
+    monkeypatch.setattr(settings, "FONT_PATH", str(font))
+    resolve_font_path.cache_clear()
+
+    assert render_key(meta) != before
+
+
+def test_tts_url_only_matters_for_the_http_backend(monkeypatch):
+    meta = _meta()
+    monkeypatch.setattr(settings, "TTS_BACKEND", "offline")
+    before = render_key(meta)
+    monkeypatch.setattr(settings, "TTS_URL", "http://tts.internal:9000")
+    assert render_key(meta) == before
+
+    monkeypatch.setattr(settings, "TTS_BACKEND", "http")
+    http_key = render_key(meta)
+    monkeypatch.setattr(settings, "TTS_URL", "http://other:9000")
+    assert render_key(meta) != http_key
+
+
+# -----------------------------
+# RenderCache
+# -----------------------------
+def _video(tmp_path, name, size=100):
+    path = tmp_path / f"{name}.mp4"
+    path.write_bytes(b"\0" * size)
+    return path
+
+
+def _index(cache):
+    return json.loads(cache.index_path.read_text(encoding="utf-8"))
+
+
+def test_hit_updates_memory_only_until_evict(tmp_path):
+    cache = RenderCache(tmp_path / "renders.json", max_bytes=0, max_age_sec=0)
+    cache.record("k", "job1", _video(tmp_path, "a"))
+    written = _index(cache)["k"]["last_used"]
+
+    hit = cache.lookup("k")
+
+    assert hit["job_id"] == "job1"
+    assert _index(cache)["k"]["last_used"] == written  # no index write on the hot path
+    cache.evict()
+    assert _index(cache)["k"]["last_used"] == hit["last_used"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_missing_video_is_a_miss(tmp_path):
+    cache = RenderCache(tmp_path / "renders.json", max_bytes=0, max_age_sec=0)
+    video = _video(tmp_path, "a")
+    cache.record("k", "job1", video)
+    video.unlink()
+
+    assert cache.lookup("k") is None
+    cache.flush()
+    assert "k" not in _index(cache)
+    assert cache.stats()["misses"] == 1
+
+
+def test_evict_drops_least_recently_used_over_size(tmp_path):
+    cache = RenderCache(tmp_path / "renders.json", max_bytes=250, max_age_sec=0)
+    for name in ("a", "b", "c"):
+        cache.record(name, name, _video(tmp_path, name))
+    cache._entries["a"]["last_used"] = 1.0
+    cache._entries["b"]["last_used"] = 2.0
+    cache._entries["c"]["last_used"] = 3.0
+
+    assert cache.evict() == 1
+    assert not (tmp_path / "a.mp4").exists()
+    assert set(_index(cache)) == {"b", "c"}
+
+
+def test_evict_drops_expired(tmp_path):
+    cache = RenderCache(tmp_path / "renders.json", max_bytes=0, max_age_sec=60)
+    cache.record("old", "old", _video(tmp_path, "old"))
+    created = cache._entries["old"]["created"]
+
+    assert cache.evict(now=created + 30) == 0
+    assert cache.evict(now=created + 61) == 1
+    assert _index(cache) == {}
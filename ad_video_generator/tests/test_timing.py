@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+
+from ad_video_generator.backend.timing import MIN_SCENE_SEC, VO_TAIL_SEC, TimingPlan, fit_durations, plan_timing
+
+NOMINAL = [2.5, 3.5, 3.5, 3.5, 2.0]  # the 15 s "short" template
+
+
+def _floors_hold(plan: TimingPlan, speech):
+    return all(d + 1e-6 >= max(MIN_SCENE_SEC, s / plan.tempo + VO_TAIL_SEC) for d, s in zip(plan.durations, speech))
+
+
+def test_short_lines_keep_the_script_pacing():
+    speech = [1.0, 1.5, 1.2, 1.4, 1.0]
+
+    plan = plan_timing(NOMINAL, speech, 15.0)
+
+    assert plan.fits
+    assert plan.durations == pytest.approx(NOMINAL)
+    assert plan.timeline()[-1][1] == pytest.approx(15.0)
+
+
+def test_spare_time_is_spread_proportionally():
+    out = fit_durations([1.0, 3.0], [1.0, 1.0], 8.0)
+
+    assert out == pytest.approx([2.0, 6.0])
+
+
+def test_long_line_borrows_time_from_the_others():
+    speech = [1.0, 5.0, 1.0, 1.0, 1.0]
+
+    plan = plan_timing(NOMINAL, speech, 15.0)
+
+    assert plan.fits
+    assert sum(plan.durations) == pytest.approx(15.0)
+    assert plan.durations[1] >= 5.0 + VO_TAIL_SEC - 1e-6
+    assert _floors_hold(plan, speech)
+
+
+def test_shorter_variants_before_speed_up():
+    speech = [3.0, 4.0, 4.0, 3.0, 2.0]   # 16 s of speech (+1 s of tails) in 15 s
+    short = {1: 1.5, 2: 3.5}
+
+    plan = plan_timing(NOMINAL, speech, 15.0, short=short)
+
+    assert plan.tempo == 1.0
+    assert plan.short_lines == [1]       # the biggest saving alone is enough
+    assert sum(plan.durations) == pytest.approx(15.0)
+
+
+def test_uniform_speed_up_within_the_limit():
+    speech = [3.0, 4.0, 4.0, 4.0, 2.0]
+
+    plan = plan_timing(NOMINAL, speech, 15.0, max_tempo=1.5)
+
+    assert 1.0 < plan.tempo <= 1.5
+    assert plan.overflow_sec == 0.0
+    assert sum(plan.durations) == pytest.approx(15.0)
+    assert _floors_hold(plan, speech)
+    # Rounded up to the next 1%: one step slower would not fit
+    assert fit_durations(NOMINAL, [max(MIN_SCENE_SEC, s / (plan.tempo - 0.01) + VO_TAIL_SEC) for s in speech], 15.0) is None
+
+
+def test_overflow_when_nothing_fits():
+    speech = [10.0] * 5
+
+    plan = plan_timing(NOMINAL, speech, 15.0, max_tempo=1.25)
+
+    assert plan.tempo == 1.25
+    assert plan.overflow_sec > 0
+    assert not plan.fits
+    assert sum(plan.durations) == pytest.approx(15.0)
+
+
+def test_minimum_scene_length():
+    plan = plan_timing([0.2, 9.8], [0.0, 0.0], 10.0)
+
+    assert min(plan.durations) >= MIN_SCENE_SEC - 1e-6
+    assert sum(plan.durations) == pytest.approx(10.0)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from ad_video_generator.backend.tts_cache import TTSCache
+
+ENTRY_BYTES = 1000
+
+
+class FakeSynth:
+    """Offline stand-in for a TTS provider: counts calls, writes ENTRY_BYTES per line."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls: List[str] = []
+
+    async def __call__(self, text: str, out_path: Path, voice: str) -> None:
+        self.calls.append(text)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("tts down")
+        out_path.write_bytes(text.encode("utf-8").ljust(ENTRY_BYTES, b"\0")[:ENTRY_BYTES])
+
+
+def _cache(tmp_path: Path, synth: FakeSynth, max_bytes: int = 1 << 20) -> TTSCache:
+    return TTSCache(root=tmp_path / "tts", synth=synth, engine_version="fake-1", max_bytes=max_bytes)
+
+
+def _age(cache: TTSCache, text: str, mtime: float) -> None:
+    """Pin an entry's last-used time (mtime) so LRU order does not depend on timer resolution."""
+    os.utime(cache.path_for(cache.key(text, "v")), (mtime, mtime))
+
+
+def test_hit_after_miss(tmp_path):
+    synth = FakeSynth()
+    cache = _cache(tmp_path, synth)
+
+    first = asyncio.run(cache.get("hello", "v"))
+    second = asyncio.run(cache.get("hello", "v"))
+
+    assert first == second and first.exists()
+    assert synth.calls == ["hello"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 1, 0)
+    assert stats["entries"] == 1 and stats["bytes"] == ENTRY_BYTES
+
+
+def test_key_depends_on_voice_and_engine(tmp_path):
+    cache = _cache(tmp_path, FakeSynth())
+    other = TTSCache(root=tmp_path / "tts", synth=FakeSynth(), engine_version="fake-2")
+
+    assert cache.key("hi", "a") != cache.key("hi", "b")
+    assert cache.key("hi", "a") != other.key("hi", "a")
+
+
+def test_concurrent_identical_lines_synthesize_once(tmp_path):
+    synth = FakeSynth(delay=0.05)
+    cache = _cache(tmp_path, synth)
+
+    async def run():
+        return await asyncio.gather(*(cache.get("same line", "v") for _ in range(3)))
+
+    paths = asyncio.run(run())
+
+    assert len(set(paths)) == 1
+    assert synth.calls == ["same line"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (0, 1, 2)
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+
+
+def test_failure_reaches_every_waiter_and_is_not_cached(tmp_path):
+    synth = FakeSynth(delay=0.05, fail=True)
+    cache = _cache(tmp_path, synth)
+
+    async def run():
+        return await asyncio.gather(*(cache.get("line", "v") for _ in range(2)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert synth.calls == ["line"]
+    assert cache.stats()["entries"] == 0
+    assert not list((tmp_path / "tts").glob("*/*"))  # no half-written files left behind
+
+
+def test_size_bound_evicts_oldest(tmp_path):
+    synth = FakeSynth()
+    cache = _cache(tmp_path, synth, max_bytes=int(2.5 * ENTRY_BYTES))
+
+    asyncio.run(cache.get("a", "v"))
+    _age(cache, "a", 1_000)
+    asyncio.run(cache.get("b", "v"))
+    _age(cache, "b", 2_000)
+    asyncio.run(cache.get("c", "v"))
+
+    assert not cache.path_for(cache.key("a", "v")).exists()
+    assert cache.path_for(cache.key("b", "v")).exists()
+    assert cache.path_for(cache.key("c", "v")).exists()
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2 and stats["bytes"] == 2 * ENTRY_BYTES
+
+
+def test_recent_use_protects_from_eviction(tmp_path):
+    synth = FakeSynth()
+    cache = _cache(tmp_path, synth, max_bytes=int(2.5 * ENTRY_BYTES))
+
+    asyncio.run(cache.get("a", "v"))
+    _age(cache, "a", 1_000)
+    asyncio.run(cache.get("b", "v"))
+    _age(cache, "b", 2_000)
+    asyncio.run(cache.get("a", "v"))  # hit: "a" becomes the most recently used
+    asyncio.run(cache.get("c", "v"))
+
+    assert cache.path_for(cache.key("a", "v")).exists()
+    assert not cache.path_for(cache.key("b", "v")).exists()
+    assert synth.calls == ["a", "b", "c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_index_survives_restart(tmp_path):
+    asyncio.run(_cache(tmp_path, FakeSynth()).get("kept", "v"))
+
+    synth = FakeSynth()
+    cache = _cache(tmp_path, synth)
+    asyncio.run(cache.get("kept", "v"))
+
+    assert synth.calls == []
+    assert cache.stats()["hits"] == 1
+
+
+def test_synthesize_copies_cached_audio(tmp_path):
+    cache = _cache(tmp_path, FakeSynth())
+    out = tmp_path / "out.mp3"
+
+    asyncio.run(cache.synthesize("copy me", out, "v"))
+
+    assert out.read_bytes() == cache.path_for(cache.key("copy me", "v")).read_bytes()